@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Serve with an ASGI server (e.g. ``uvicorn BMR.asgi:application``) so the async
+payment status stream (memberships.api.streams) holds idle connections on the
+event loop instead of one worker thread each.
 """
 
 import os
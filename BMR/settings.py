@@ -55,6 +55,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,7 +77,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
             'django.contrib.messages.context_processors.messages',
-            'core.context_processors.event_category_menus',
+            'core.context_processors.navigation',
             'BMR.context_processors.google_settings',
         ],
     },
@@ -150,7 +151,20 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # Allow larger uploads so media posts don't trigger 413 errors
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB
+# Uploaded files above this size are spooled to disk instead of held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=2621440, cast=int)  # 2.5 MB
+
+# Chunked event media uploads (events.uploads): part files and the largest accepted chunk
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=str(BASE_DIR / 'uploads_partial'))
+EVENT_MEDIA_CHUNK_SIZE = config('EVENT_MEDIA_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+
+# Media downloads (core.utils.media_delivery): '' serves from Django, 'nginx' sets X-Accel-Redirect
+# (MEDIA_OFFLOAD_PREFIX must be an internal location aliased to MEDIA_ROOT), 'sendfile' sets X-Sendfile
+MEDIA_OFFLOAD = config('MEDIA_OFFLOAD', default='')
+MEDIA_OFFLOAD_PREFIX = config('MEDIA_OFFLOAD_PREFIX', default='/protected-media/')
+# Download counters are buffered in memory and written every N seconds or N hits
+DOWNLOAD_COUNT_FLUSH_INTERVAL = config('DOWNLOAD_COUNT_FLUSH_INTERVAL', default=30, cast=int)
+DOWNLOAD_COUNT_FLUSH_SIZE = config('DOWNLOAD_COUNT_FLUSH_SIZE', default=100, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -181,9 +195,48 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Query profiling (core.middleware.QueryProfilingMiddleware)
+QUERY_PROFILING = config('QUERY_PROFILING', default=True, cast=bool)
+# Share of requests profiled; the others skip the SQL wrapper (the test runner profiles every request)
+QUERY_PROFILING_SAMPLE_RATE = config('QUERY_PROFILING_SAMPLE_RATE', default=1.0 if DEBUG else 0.1, cast=float)
+QUERY_PROFILING_WINDOW = config('QUERY_PROFILING_WINDOW', default=200, cast=int)
+SERVER_TIMING = config('SERVER_TIMING', default=DEBUG, cast=bool)
+# Raise instead of logging when a view exceeds its declared query budget (always on under `manage.py test`)
+QUERY_BUDGET_RAISE = config('QUERY_BUDGET_RAISE', default=False, cast=bool)
+TEST_RUNNER = 'core.utils.test_runner.QueryBudgetTestRunner'
+
+# core.utils.status_registry: other processes pick up Status edits after this many seconds
+STATUS_REGISTRY_TTL = config('STATUS_REGISTRY_TTL', default=300, cast=int)
+
+# Site navigation tree (core.utils.navigation), cached across requests
+NAVIGATION_CACHE_TIMEOUT = config('NAVIGATION_CACHE_TIMEOUT', default=3600, cast=int)
+# Banner / slideshow index (core.utils.menu_items)
+BANNER_INDEX_CACHE_TIMEOUT = config('BANNER_INDEX_CACHE_TIMEOUT', default=3600, cast=int)
+# Event .ics feeds (events.calendar): server-side cache lifetime and client max-age
+EVENT_FEED_CACHE_TIMEOUT = config('EVENT_FEED_CACHE_TIMEOUT', default=86400, cast=int)
+EVENT_FEED_MAX_AGE = config('EVENT_FEED_MAX_AGE', default=300, cast=int)
+# Full-text search (core.utils.search): backend class path; empty uses SQLite FTS5 on SQLite, a LIKE fallback elsewhere
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='')
+# Staff user directory (authentication.utils.directory): cached totals for unsearched listings
+USER_COUNT_CACHE_TIMEOUT = config('USER_COUNT_CACHE_TIMEOUT', default=300, cast=int)
+
 # OneSignal (optional)
 ONESIGNAL_APP_ID = config("ONESIGNAL_APP_ID", default="")
 ONESIGNAL_API_KEY = config("ONESIGNAL_API_KEY", default="")
+ONESIGNAL_API_URL = config("ONESIGNAL_API_URL", default="https://api.onesignal.com/notifications")
+
+# Outbound HTTP to providers (core.utils.http): timeouts in seconds, retries with jittered backoff,
+# circuit opens after N consecutive failures for COOLDOWN seconds
+OUTBOUND_HTTP_CONNECT_TIMEOUT = config('OUTBOUND_HTTP_CONNECT_TIMEOUT', default=3.05, cast=float)
+OUTBOUND_HTTP_READ_TIMEOUT = config('OUTBOUND_HTTP_READ_TIMEOUT', default=10, cast=float)
+OUTBOUND_HTTP_RETRIES = config('OUTBOUND_HTTP_RETRIES', default=2, cast=int)
+OUTBOUND_HTTP_BACKOFF = config('OUTBOUND_HTTP_BACKOFF', default=0.5, cast=float)
+OUTBOUND_HTTP_BREAKER_THRESHOLD = config('OUTBOUND_HTTP_BREAKER_THRESHOLD', default=5, cast=int)
+OUTBOUND_HTTP_BREAKER_COOLDOWN = config('OUTBOUND_HTTP_BREAKER_COOLDOWN', default=30, cast=float)
+
+# Background jobs (core.jobs, run with `manage.py run_jobs`)
+JOB_LOCK_TIMEOUT = config('JOB_LOCK_TIMEOUT', default=600, cast=int)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=30, cast=int)
 
 # JWT Settings
 SIMPLE_JWT = {
@@ -277,8 +330,27 @@ HITPAY_SALT = config('HITPAY_SALT', default='')
 HITPAY_API_KEY = config('HITPAY_API_KEY', default='')
 HITPAY_API_URL = config('HITPAY_API_URL', default='')
 HITPAY_WEBHOOK_URL = config('HITPAY_WEBHOOK_URL', default='https://pretty-badgers-rescue.loca.lt/api/membership/payments/webhooks/hitpay/')
+# Unpaid HitPay payments older than this are cancelled by `manage.py reconcile_hitpay_payments`
+HITPAY_PAYMENT_TTL_HOURS = config('HITPAY_PAYMENT_TTL_HOURS', default=48, cast=float)
+# payment-status polls call HitPay at most once per payment per this many seconds
+HITPAY_REFRESH_INTERVAL = config('HITPAY_REFRESH_INTERVAL', default=5, cast=int)
+# Webhook events left 'processing' longer than this (crashed `process_webhooks` worker) are claimed again
+WEBHOOK_LOCK_TIMEOUT = config('WEBHOOK_LOCK_TIMEOUT', default=600, cast=int)
+# Live payment status stream (memberships.api.streams): DB re-check interval for changes made by other
+# processes, keep-alive interval and maximum connection length, in seconds
+PAYMENT_STREAM_POLL_INTERVAL = config('PAYMENT_STREAM_POLL_INTERVAL', default=2, cast=float)
+PAYMENT_STREAM_HEARTBEAT = config('PAYMENT_STREAM_HEARTBEAT', default=15, cast=float)
+PAYMENT_STREAM_MAX_SECONDS = config('PAYMENT_STREAM_MAX_SECONDS', default=300, cast=float)
 
 FERNET_KEY = config('FERNET_KEY', default='')
+# Key rotation: comma-separated keys, newest (primary) first. Older keys stay readable
+# until `manage.py reencrypt_contact_data` has moved every row onto the primary key.
+FERNET_KEYS = config('FERNET_KEYS', default='')
+# Write the old double base64-encoded format (only while pre-rotation processes still run)
+FERNET_LEGACY_FORMAT = config('FERNET_LEGACY_FORMAT', default=False, cast=bool)
+# HMAC key for searchable NRIC/phone indexes (falls back to SECRET_KEY).
+# Changing it requires `manage.py backfill_blind_indexes --all`.
+BLIND_INDEX_KEY = config('BLIND_INDEX_KEY', default='')
 
 EMAIL_HOST=config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT=config('EMAIL_PORT', default=587)
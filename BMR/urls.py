@@ -12,6 +12,8 @@ url_api = [
     path('api/events/', include('events.api.urls')),
     path('api/donations/', include('donations.api.urls')),
     path('api/membership/', include('memberships.api.routers')),
+    path('api/core/', include('core.api.urls')),
+    path('api/banner/', include('banner.api.urls')),
 ]
 
 urlpatterns = [
@@ -30,6 +32,8 @@ urlpatterns = [
     path('api/events/', include('events.api.urls')),
     path('api/donations/', include('donations.api.urls')),
     path('api/membership/', include('memberships.api.routers')),
+    path('api/core/', include('core.api.urls')),
+    path('api/banner/', include('banner.api.urls')),
     
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -5,6 +5,7 @@ from rest_framework import viewsets, permissions, filters
 from association.models import Association, AssociationPosts
 from association.api.serializers import AssociationSerializer, AssociationPostSerializer
 from core.utils.pagination import StandardResultsSetPagination
+from core.utils.search import FullTextSearchFilter
 
 
 @extend_schema(
@@ -36,9 +37,9 @@ class AssociationPostViewSet(viewsets.ModelViewSet):
     serializer_class = AssociationPostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_published', 'published_by']
-    search_fields = ['title', 'content']
+    search_doc_type = 'association'
     ordering_fields = ['published_at', 'title']
     ordering = ['-published_at']
 
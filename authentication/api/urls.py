@@ -27,7 +27,7 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     # User management endpoints (staff only)
-    path('users/', views.users_list, name='users_list'),
+    path('users/', views.UserListView.as_view(), name='users_list'),
     path('users/create/', views.create_user, name='create_user'),
     path('users/<int:user_id>/', views.user_detail, name='user_detail'),
     path('users/<int:user_id>/update/', views.update_user, name='update_user'),
@@ -1,7 +1,8 @@
 # authentication/views.py
 from django.contrib.auth.models import Group
 from django.contrib.messages import success
-from rest_framework import status, viewsets
+from django.core.paginator import InvalidPage
+from rest_framework import filters, generics, status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from drf_spectacular.utils import extend_schema, OpenApiParameter, extend_schema_view, OpenApiResponse
@@ -9,11 +10,10 @@ from drf_spectacular.types import OpenApiTypes
 from google.auth.transport import requests
 from google.oauth2 import id_token
 from django.conf import settings
-from django.db.models import Q
-from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
@@ -30,9 +30,10 @@ from authentication.api.serializers import (
     StaffUserCreateSerializer
 )
 from authentication.models import RolePermission, Permission
+from authentication.utils import directory
 from authentication.utils.permissions import HasRolePermission
 from core.utils.handle_google_user import handle_google_user
-from core.utils.pagination import StandardResultsSetPagination
+from core.utils.pagination import CachedCountPagination
 from core.utils.responses import ok, fail
 from core.utils.emailer import send_otp_email
 from core.utils.otp import generate_otp, expiry
@@ -421,28 +422,33 @@ def logout(request):
         )
 
 
+class UserDirectoryPagination(CachedCountPagination):
+    page_size = 30
+    page_sizes = (30, 50, 100)
+
+    def get_page_size(self, request):
+        try:
+            per_page = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return per_page if per_page in self.page_sizes else self.page_size
+
+    def get_page_number(self, request, paginator):
+        # Invalid or out-of-range pages fall back to page 1 (as the old users_list did)
+        try:
+            return paginator.validate_number(super().get_page_number(request, paginator))
+        except InvalidPage:
+            return 1
+
+
 @extend_schema(
     tags=["Users"],
     parameters=[
-        OpenApiParameter(
-            name='page',
-            type=OpenApiTypes.INT,
-            location=OpenApiParameter.QUERY,
-            description='Page number',
-            default=1
-        ),
-        OpenApiParameter(
-            name='per_page',
-            type=OpenApiTypes.INT,
-            location=OpenApiParameter.QUERY,
-            description='Items per page (30, 50, 100)',
-            default=30
-        ),
         OpenApiParameter(
             name='search',
             type=OpenApiTypes.STR,
             location=OpenApiParameter.QUERY,
-            description='Search by email, username, first_name, or last_name'
+            description='Start of the email, username, full name or last name'
         ),
         OpenApiParameter(
             name='is_staff',
@@ -456,110 +462,63 @@ def logout(request):
             location=OpenApiParameter.QUERY,
             description='Filter by email verification status'
         ),
-        OpenApiParameter(
-            name='ordering',
-            type=OpenApiTypes.STR,
-            location=OpenApiParameter.QUERY,
-            description='Order by field (id, email, username, first_name, last_name, date_joined). Add - for descending order.',
-            default='-date_joined'
-        )
     ],
-    responses={200: dict},
+    responses={200: UserSerializer(many=True)},
     summary="Get Users List",
-    description="Get paginated list of users with filtering and search functionality"
+    description="Paginated staff user directory (per_page 30, 50 or 100). Search ignores case and accents. "
+                "`ordering`: id, email, username, first_name, last_name, date_joined, is_staff or "
+                "is_email_verified, prefixed with - for descending (default -date_joined)."
 )
-@api_view(['GET'])
-@permission_classes([IsAdminUser])
-def users_list(request):
+class UserListView(generics.ListAPIView):
     """
-    Get paginated list of users with filtering and search
-    Only staff users can access this endpoint
+    Staff-only user list. One COUNT (cached for listings without a search
+    term) and one page query per request.
     """
-    if not request.user.is_staff:
-        return fail(
-            message="Access denied. Staff privileges required.",
-            status=status.HTTP_403_FORBIDDEN
-        )
-
-    # Get query parameters
-    page = request.GET.get('page', 1)
-    per_page = request.GET.get('per_page', 30)
-    search = request.GET.get('search', '')
-    is_staff_filter = request.GET.get('is_staff', '')
-    is_verified_filter = request.GET.get('is_verified', '')
-    ordering = request.GET.get('ordering', '-date_joined')
-
-    # Validate per_page parameter
-    try:
-        per_page = int(per_page)
-        if per_page not in [30, 50, 100]:
-            per_page = 30
-    except (ValueError, TypeError):
-        per_page = 30
-
-    # Validate page parameter
-    try:
-        page = int(page)
-        if page < 1:
-            page = 1
-    except (ValueError, TypeError):
-        page = 1
-
-    # Start with all users
-    users = User.objects.all()
-
-    # Apply search filter
-    if search:
-        users = users.filter(
-            Q(email__icontains=search) |
-            Q(username__icontains=search) |
-            Q(first_name__icontains=search) |
-            Q(last_name__icontains=search)
-        )
-
-    # Apply staff filter
-    if is_staff_filter.lower() in ['true', '1']:
-        users = users.filter(is_staff=True)
-    elif is_staff_filter.lower() in ['false', '0']:
-        users = users.filter(is_staff=False)
-
-    # Apply email verification filter
-    if is_verified_filter.lower() in ['true', '1']:
-        users = users.filter(is_email_verified=True)
-    elif is_verified_filter.lower() in ['false', '0']:
-        users = users.filter(is_email_verified=False)
-
-    # Apply ordering
-    allowed_ordering_fields = ['id', 'email', 'username', 'first_name', 'last_name', 'date_joined', 'is_staff',
-                               'is_email_verified']
-    if ordering.startswith('-'):
-        field = ordering[1:]
-    else:
-        field = ordering
-
-    if field in allowed_ordering_fields:
-        users = users.order_by(ordering)
-    else:
-        users = users.order_by('-date_joined')
-
-    # Pagination
-    paginator = Paginator(users, per_page)
-
-    try:
-        users_page = paginator.page(page)
-    except:
-        users_page = paginator.page(1)
-        page = 1
-
-
-    # Prepare pagination info
-    paginator = StandardResultsSetPagination()
-    paginated_users = paginator.paginate_queryset(users, request)
-
-    # Serialize users
-    serializer = UserSerializer(users_page.object_list, many=True)
-
-    return paginator.get_paginated_response(serializer.data)
+    permission_classes = [IsAdminUser]
+    serializer_class = UserSerializer
+    pagination_class = UserDirectoryPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['id', 'email', 'username', 'first_name', 'last_name', 'date_joined', 'is_staff',
+                       'is_email_verified']
+    ordering = ['-date_joined', '-id']
+
+    def get_queryset(self):
+        users = User.objects.select_related('group')
+        is_staff, is_verified = self._flags()
+        if is_staff is not None:
+            users = users.filter(is_staff=is_staff)
+        if is_verified is not None:
+            users = users.filter(is_email_verified=is_verified)
+        return users
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return directory.search_users(queryset, self._search_term())
+
+    def _search_term(self):
+        return self.request.query_params.get(api_settings.SEARCH_PARAM, '').strip()
+
+    @staticmethod
+    def _flag(value):
+        value = (value or '').lower()
+        if value in ('true', '1'):
+            return True
+        if value in ('false', '0'):
+            return False
+        return None
+
+    def _flags(self):
+        params = self.request.query_params
+        return self._flag(params.get('is_staff')), self._flag(params.get('is_verified'))
+
+    def get_count_cache_key(self):
+        if self._search_term():
+            return None
+        return directory.count_cache_key(*self._flags())
+
+    @property
+    def count_cache_timeout(self):
+        return directory.count_cache_timeout()
 
 
 @extend_schema(
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:35
+
+import unicodedata
+
+from django.db import migrations, models
+
+SEARCH_COLUMNS = ['email_normalized', 'username_normalized', 'name_normalized', 'last_name_normalized']
+
+
+def _normalize(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(value.casefold().split())
+
+
+def backfill_search_columns(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    users = User.objects.only('id', 'email', 'username', 'first_name', 'last_name').order_by('id')
+    batch = []
+    for user in users.iterator(chunk_size=1000):
+        user.email_normalized = _normalize(user.email)
+        user.username_normalized = _normalize(user.username)
+        user.name_normalized = _normalize(f"{user.first_name} {user.last_name}")
+        user.last_name_normalized = _normalize(user.last_name)
+        batch.append(user)
+        if len(batch) == 1000:
+            User.objects.bulk_update(batch, SEARCH_COLUMNS)
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, SEARCH_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_alter_user_group'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='last_name_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='name_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=301),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='username_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined', 'id'], name='authenticat_date_jo_a810b1_idx'),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import unicodedata
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
@@ -24,6 +26,13 @@ class RolePermission(AuditModel):
         return f"{self.group.name} - {self.permission.code}"
 
 
+def normalize_search_text(value):
+    """Casefolded, accent-free, single-spaced form used by the user directory search columns"""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(value.casefold().split())
+
+
 class User(AbstractUser):
     email = models.EmailField(unique=True)
     profile_picture = models.URLField(blank=True, null=True)
@@ -39,9 +48,36 @@ class User(AbstractUser):
 
     group = models.ForeignKey(Group, on_delete=models.CASCADE, blank=True, null=True, related_name='custom_role_users')
 
+    # Normalized copies for indexed prefix search in the user directory (set on save)
+    email_normalized = models.CharField(max_length=254, blank=True, db_index=True, editable=False)
+    username_normalized = models.CharField(max_length=150, blank=True, db_index=True, editable=False)
+    name_normalized = models.CharField(max_length=301, blank=True, db_index=True, editable=False)
+    last_name_normalized = models.CharField(max_length=150, blank=True, db_index=True, editable=False)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    # source fields -> normalized column
+    SEARCH_COLUMNS = {
+        'email_normalized': ('email',),
+        'username_normalized': ('username',),
+        'name_normalized': ('first_name', 'last_name'),
+        'last_name_normalized': ('last_name',),
+    }
+
+    class Meta(AbstractUser.Meta):
+        indexes = [models.Index(fields=['date_joined', 'id'])]
+
+    def save(self, *args, **kwargs):
+        for column, sources in self.SEARCH_COLUMNS.items():
+            setattr(self, column, normalize_search_text(" ".join(getattr(self, name) or "" for name in sources)))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                column for column, sources in self.SEARCH_COLUMNS.items() if set(sources) & set(update_fields)
+            }
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.email
 
@@ -1,3 +1,83 @@
+import importlib
+
+from django.apps import apps
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from authentication.models import User
+
+
+class UserDirectoryTests(TestCase):
+    url = "/api/auth/users/"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.staff = User.objects.create(email="admin@bmr.test", username="admin", is_staff=True)
+        self.zoe = User.objects.create(
+            email="zoe.walker@example.com", username="zwalker", first_name="Zoë", last_name="Álvarez Walker"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]
+
+    def emails(self, **params):
+        return [row["email"] for row in self.get(**params)["results"]]
+
+    def test_prefix_search_ignores_case_and_accents(self):
+        for term in ["ZOE.W", "zwal", "zoe alv", "alvarez", "ÁLV"]:
+            self.assertEqual(self.emails(search=term), ["zoe.walker@example.com"], term)
+        # Prefix, not substring
+        self.assertEqual(self.emails(search="walker"), [])
+        self.assertEqual(self.emails(search="example"), [])
+
+    def test_invalid_page_falls_back_to_first(self):
+        for page in ["99", "0", "abc"]:
+            pagination = self.get(page=page)["pagination"]
+            self.assertEqual(pagination["current_page"], 1, page)
+        self.assertEqual(self.get(per_page=7)["pagination"]["per_page"], 30)
+
+    def test_update_fields_save_refreshes_search_columns(self):
+        self.zoe.last_name = "Chen"
+        self.zoe.save(update_fields=["last_name"])
+        user = User.objects.get(pk=self.zoe.pk)
+        self.assertEqual((user.name_normalized, user.last_name_normalized), ("zoe chen", "chen"))
+        self.assertEqual(self.emails(search="chen"), ["zoe.walker@example.com"])
+
+    def test_count_cache_dropped_on_create_but_not_on_login(self):
+        self.assertEqual(self.get()["pagination"]["total_count"], 2)
+        self.assertEqual(self.get(is_staff="true")["pagination"]["total_count"], 1)
+        # No signal: the cached total stays
+        User.objects.filter(pk=self.zoe.pk).update(is_staff=True)
+        self.assertEqual(self.get(is_staff="true")["pagination"]["total_count"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zoe.save(update_fields=["last_login"])
+        self.assertEqual(self.get(is_staff="true")["pagination"]["total_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create(email="new@bmr.test", username="new")
+        self.assertEqual(self.get()["pagination"]["total_count"], 3)
+        # A searched listing is counted, not cached
+        self.assertEqual(self.get(search="new")["pagination"]["total_count"], 1)
+
+    def test_flag_change_drops_cached_count(self):
+        self.assertEqual(self.get(is_staff="true")["pagination"]["total_count"], 1)
+        self.zoe.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zoe.save(update_fields=["is_staff"])
+        self.assertEqual(self.get(is_staff="true")["pagination"]["total_count"], 2)
 
-# Create your tests here.
+    def test_migration_backfills_search_columns(self):
+        User.objects.update(email_normalized="", username_normalized="", name_normalized="", last_name_normalized="")
+        migration = importlib.import_module("authentication.migrations.0004_user_search_columns")
+        migration.backfill_search_columns(apps, None)
+        user = User.objects.get(pk=self.zoe.pk)
+        self.assertEqual(
+            (user.email_normalized, user.username_normalized, user.name_normalized, user.last_name_normalized),
+            ("zoe.walker@example.com", "zwalker", "zoe alvarez walker", "alvarez walker"),
+        )
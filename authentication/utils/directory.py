@@ -0,0 +1,64 @@
+"""
+Staff user directory (``UserListView``): prefix search on the normalized
+columns of User and cached totals for unfiltered listings.
+
+A search term matches users whose email, username, full name ("first last")
+or last name starts with it, compared after ``normalize_search_text``. Each
+test is a range over an indexed column, so it seeks instead of scanning.
+Totals for listings without a search term (optionally filtered by staff /
+verified flags) are cached and dropped when a user is added, deleted, or
+has one of those flags changed.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+from authentication.models import User, normalize_search_text
+
+# Sorts after every character that can follow the prefix
+PREFIX_END = "\U0010ffff"
+FLAG_VALUES = (None, True, False)
+COUNTED_FLAGS = {"is_staff", "is_email_verified"}
+
+
+def prefix_q(field, prefix):
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + PREFIX_END})
+
+
+def search_users(queryset, term):
+    term = normalize_search_text(term)
+    if not term:
+        return queryset
+    condition = Q()
+    for column in User.SEARCH_COLUMNS:
+        condition |= prefix_q(column, term)
+    return queryset.filter(condition)
+
+
+def count_cache_key(is_staff=None, is_verified=None):
+    return f"users:count:{is_staff}:{is_verified}"
+
+
+def count_cache_timeout():
+    return getattr(settings, "USER_COUNT_CACHE_TIMEOUT", 300)
+
+
+def invalidate_counts():
+    keys = [count_cache_key(staff, verified) for staff in FLAG_VALUES for verified in FLAG_VALUES]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login only; those don't change any count
+    if created or update_fields is None or COUNTED_FLAGS.intersection(update_fields):
+        invalidate_counts()
+
+
+def _user_deleted(sender, instance, **kwargs):
+    invalidate_counts()
+
+
+post_save.connect(_user_saved, sender=User, dispatch_uid="user_directory_counts_save")
+post_delete.connect(_user_deleted, sender=User, dispatch_uid="user_directory_counts_delete")
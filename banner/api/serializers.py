@@ -7,12 +7,32 @@ class BannerBaseSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     model_name = serializers.CharField(read_only=True)
     title = serializers.CharField()
-    cover_image = serializers.ImageField()
+    cover_image = serializers.CharField(allow_null=True)
+    image = serializers.CharField(read_only=True, allow_null=True)
+    thumbnail = serializers.CharField(read_only=True, allow_null=True)
     set_banner = serializers.BooleanField()
     banner_order = serializers.IntegerField()
+    is_active = serializers.BooleanField(read_only=True)
     detail_url = serializers.CharField(read_only=True)
 
 
+class BannerReorderItemSerializer(serializers.Serializer):
+    model = serializers.ChoiceField(choices=["post", "event"])
+    id = serializers.IntegerField()
+    banner_order = serializers.IntegerField(min_value=0)
+    set_banner = serializers.BooleanField(required=False)
+
+
+class BannerReorderSerializer(serializers.Serializer):
+    items = BannerReorderItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        keys = [(item["model"], item["id"]) for item in items]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError("Each banner may appear only once.")
+        return items
+
+
 class PostUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
@@ -22,4 +42,4 @@ class PostUpdateSerializer(serializers.ModelSerializer):
 class EventUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
-        fields = ['set_banner', 'banner_order']
\ No newline at end of file
+        fields = ['set_banner', 'banner_order']
@@ -1,7 +1,7 @@
 from django.urls import path
-from .views import BannerListAPIView, BannerUpdateAPIView
+from .views import BannerListAPIView, BannerReorderAPIView
 
 urlpatterns = [
     path('banners/', BannerListAPIView.as_view(), name='banner-list'),
-    path('banners/<str:model_name>/<int:object_id>/update/', BannerUpdateAPIView.as_view(), name='banner-update'),
+    path('banners/reorder/', BannerReorderAPIView.as_view(), name='banner-reorder'),
 ]
\ No newline at end of file
@@ -1,85 +1,97 @@
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema
-from rest_framework import status, permissions
-from rest_framework.views import APIView
+from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from posts.models import Post
+from authentication.utils.permissions import IsManagementUser
+from core.utils.menu_items import get_banner_index, invalidate_banner_index
+from core.utils.responses import fail, ok
 from events.models import Event
+from posts.models import Post
 
-from posts.api.serializers import PostSerializer
-from events.api.serializers import EventSerializer
-from .serializers import BannerBaseSerializer
-from django.apps import apps
+from .serializers import BannerBaseSerializer, BannerReorderSerializer
 
 MODEL_MAP = {
-    'post': apps.get_model('posts', 'Post'),
-    'event': ('events', 'Event'),
+    'post': Post,
+    'event': Event,
 }
 
+
 @extend_schema(
         tags=["Banner"],
-        responses={201: BannerBaseSerializer},
-        summary="Banner Update"
+        responses={200: BannerBaseSerializer(many=True)},
+        summary="Banner List",
+        description="Posts and events flagged as banners in global banner_order. "
+                    "Served from the cached banner index; send If-None-Match with the ETag to get a 304."
     )
 class BannerListAPIView(APIView):
     def get(self, request, *args, **kwargs):
-        data = []
+        index = get_banner_index()
+        if index["etag"] in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(index["items"])
+        response["ETag"] = index["etag"]
+        response["Cache-Control"] = "no-cache"
+        return response
 
-        for model_class in [Post, Event]:
-            items = model_class.objects.filter(set_banner=True).order_by('banner_order')
 
-            for obj in items:
-                data.append({
-                    'id': obj.id,
-                    'model_name': model_class.__name__,
-                    'title': obj.title,
-                    'cover_image': obj.cover_image.url if obj.cover_image else None,
-                    'set_banner': obj.set_banner,
-                    'banner_order': obj.banner_order,
-                    'detail_url': obj.get_absolute_url() if hasattr(obj, 'get_absolute_url') else None
-                })
-
-        serializer = BannerBaseSerializer(data, many=True)
-        return Response(serializer.data)
-
-
-class BannerUpdateAPIView(APIView):
+@extend_schema(
+        tags=["Banner"],
+        request=BannerReorderSerializer,
+        responses={200: BannerBaseSerializer(many=True)},
+        summary="Banner Bulk Reorder",
+        description="Set banner_order (and optionally set_banner) for many posts/events in one request. "
+                    "Returns the updated banner list."
+    )
+class BannerReorderAPIView(APIView):
     """
-    PATCH /api/banners/<model>/<id>/update/
-    Body: { "banner_order": <int>, "set_banner": <bool> }
+    PATCH /api/banner/banners/reorder/
+    Body: { "items": [{ "model": "post", "id": 1, "banner_order": 1, "set_banner": true }, ...] }
     """
-    permission_classes = [permissions.IsAuthenticated]  # change as needed
-
-    def patch(self, request, model_name, object_id):
-        model_name = model_name.lower()
-        if model_name not in MODEL_MAP:
-            return Response({"detail": "Invalid model"}, status=status.HTTP_400_BAD_REQUEST)
-
-        Model = MODEL_MAP[model_name]
-        instance = get_object_or_404(Model, pk=object_id)
-
-        # Accept only a whitelist of fields
-        allowed_fields = ('banner_order', 'set_banner')
-        data = {k: v for k, v in request.data.items() if k in allowed_fields}
-
-        if not data:
-            return Response({"detail": "No valid fields provided"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # apply changes
-        for field, val in data.items():
-            setattr(instance, field, val)
-        instance.save()
-
-        # Build a small response payload
-        resp = {
-            "id": instance.pk,
-            "model": model_name,
-            "banner_order": getattr(instance, 'banner_order', None),
-            "set_banner": getattr(instance, 'set_banner', None),
-        }
-        return Response(resp, status=status.HTTP_200_OK)
-
-    # Optionally support PUT or POST if you prefer
-    def post(self, request, model_name, object_id):
-        return self.patch(request, model_name, object_id)
\ No newline at end of file
+    permission_classes = [IsManagementUser]
+
+    def patch(self, request):
+        serializer = BannerReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updates = {}
+        for item in serializer.validated_data["items"]:
+            updates.setdefault(item["model"], {})[item["id"]] = item
+
+        now = timezone.now()
+        with transaction.atomic():
+            for model_name, rows in updates.items():
+                Model = MODEL_MAP[model_name]
+                instances = list(
+                    Model.objects.select_for_update()
+                    .filter(pk__in=rows)
+                    .only("id", "banner_order", "set_banner", "modified_at", "modified_by")
+                )
+                missing = set(rows) - {instance.pk for instance in instances}
+                if missing:
+                    transaction.set_rollback(True)
+                    return fail(
+                        message="Invalid banner items",
+                        error=f"{model_name} not found: {sorted(missing)}",
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                for instance in instances:
+                    row = rows[instance.pk]
+                    instance.banner_order = row["banner_order"]
+                    if "set_banner" in row:
+                        instance.set_banner = row["set_banner"]
+                    instance.modified_at = now
+                    instance.modified_by = request.user
+                Model.objects.bulk_update(
+                    instances, ["banner_order", "set_banner", "modified_at", "modified_by"]
+                )
+            # bulk_update sends no post_save, so drop the cached index here
+            invalidate_banner_index()
+
+        return ok(data=get_banner_index()["items"], message="Banners reordered")
+
+    def post(self, request):
+        return self.patch(request)
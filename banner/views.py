@@ -1,33 +1,24 @@
 from django.shortcuts import render
 
-from core.utils.menu_items import get_menu_items
-from posts.models import Post
-from events.models import Event
+from core.utils.menu_items import get_banner_index, get_menu_items
 
-def banner_list(request):
-    banners = []
 
-    # collect from Post
-    for post in Post.objects.filter(set_banner=True).order_by("banner_order"):
-        banners.append({
-            'id': post.id,
-            'title': post.title,
-            'model_name': 'Post',
-            'order_index': post.banner_order,
-            'category_title': 'Post'  # or custom logic
-        })
+def _banner_rows():
+    # Already in global banner order
+    return [
+        {
+            'id': item['id'],
+            'title': item['title'],
+            'model_name': item['model_name'],
+            'order_index': item['banner_order'],
+            'category_title': item['model_name'],
+        }
+        for item in get_banner_index()['items']
+    ]
 
-    # collect from Event
-    for event in Event.objects.filter(set_banner=True).order_by("banner_order"):
-        banners.append({
-            'id': event.id,
-            'title': event.title,
-            'model_name': 'Event',
-            'order_index': event.banner_order,
-            'category_title': 'Event'
-        })
 
-    banners.sort(key=lambda x: x['order_index'])
+def banner_list(request):
+    banners = _banner_rows()
     return render(request, "private/banners/list.html", {'data': banners})
 
 
@@ -38,27 +29,5 @@ def landing_page_view(request):
 
 
 def menu_list(request):
-    menus = []
-
-    # collect from Post
-    for post in Post.objects.filter(set_banner=True).order_by("banner_order"):
-        menus.append({
-            'id': post.id,
-            'title': post.title,
-            'model_name': 'Post',
-            'order_index': post.banner_order,
-            'category_title': 'Post'  # or custom logic
-        })
-
-    # collect from Event
-    for event in Event.objects.filter(set_banner=True).order_by("banner_order"):
-        menus.append({
-            'id': event.id,
-            'title': event.title,
-            'model_name': 'Event',
-            'order_index': event.banner_order,
-            'category_title': 'Event'
-        })
-
-    menus.sort(key=lambda x: x['order_index'])
+    menus = _banner_rows()
     return render(request, "private/banners/list.html", {'data': menus})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Status, MediaModel
+from .models import Status, MediaModel, Sequence, Job
 
 
 @admin.register(Status)
@@ -16,3 +16,16 @@ class MediaModelAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'file_type')
     search_fields = ('title', 'location', 'file_type')
 
+
+@admin.register(Sequence)
+class SequenceAdmin(admin.ModelAdmin):
+    list_display = ('key', 'value', 'modified_at')
+    search_fields = ('key',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('kind', 'last_error')
+    readonly_fields = ('created_at', 'finished_at', 'locked_at')
@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from core.utils.search import DOC_TYPES
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    type = serializers.MultipleChoiceField(choices=DOC_TYPES, required=False)
+    page = serializers.IntegerField(min_value=1, default=1)
+    per_page = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def to_internal_value(self, data):
+        # ?type=post,event as well as ?type=post&type=event
+        if hasattr(data, "getlist"):
+            types = [value for item in data.getlist("type") for value in item.split(",") if value]
+            data = data.copy()
+            data.setlist("type", types)
+        return super().to_internal_value(data)
@@ -0,0 +1,12 @@
+from django.urls import path
+from core.views import media_file
+from .views import NavigationView, ProfilingStatsView, SearchView
+
+app_name = 'core_api'
+
+urlpatterns = [
+    path('navigation/', NavigationView.as_view(), name='navigation'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('media/<int:pk>/file/', media_file, name='media-file'),
+    path('profiling/', ProfilingStatsView.as_view(), name='profiling-stats'),
+]
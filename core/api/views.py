@@ -0,0 +1,107 @@
+from math import ceil
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.views import APIView
+
+from core.utils import profiling
+from core.utils.navigation import get_navigation
+from core.utils.responses import fail, ok
+from core.utils.search import DOC_TYPES, get_backend
+
+from .serializers import SearchQuerySerializer
+
+
+@extend_schema(
+    tags=["Core"],
+    responses={200: dict},
+    summary="Per-endpoint SQL/latency stats",
+    description="Rolling in-process window of SQL count, SQL time, serializer time and render time per endpoint. "
+                "Also returns named counters (e.g. HitPay refreshes saved). "
+                "`enabled` and `sample_rate` show whether requests are being profiled "
+                "(QUERY_PROFILING, QUERY_PROFILING_SAMPLE_RATE). "
+                "DELETE resets both. Stats are per worker process."
+)
+class ProfilingStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        enabled = profiling.profiling_enabled()
+        return ok(
+            data={
+                "enabled": enabled,
+                "sample_rate": profiling.sample_rate() if enabled else 0.0,
+                "window": profiling.stats.window,
+                "endpoints": profiling.stats.summary(),
+                "counters": profiling.counters.snapshot(),
+            },
+            message="Profiling stats" if enabled else "Query profiling is disabled (set QUERY_PROFILING)"
+        )
+
+    def delete(self, request):
+        profiling.stats.reset()
+        profiling.counters.reset()
+        return ok(message="Profiling stats reset")
+
+
+@extend_schema(
+    tags=["Core"],
+    responses={200: dict},
+    summary="Site navigation tree",
+    description="Event categories (with subcategories), post categories and association menu posts. "
+                "Served from the same cached tree as the templates."
+)
+class NavigationView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        return ok(data=get_navigation(), message="Navigation")
+
+
+@extend_schema(
+    tags=["Core"],
+    summary="Search posts, events and association content",
+    description="Full-text search over published content, best matches first. Each hit has its type, object ID, "
+                "public URL, and title and snippet as HTML with the matched terms in <mark> tags.",
+    parameters=[
+        OpenApiParameter(name="q", type=OpenApiTypes.STR, required=True),
+        OpenApiParameter(name="type", type=OpenApiTypes.STR, enum=DOC_TYPES, many=True,
+                         description="Restrict to these content types (repeat or comma-separate)"),
+        OpenApiParameter(name="page", type=OpenApiTypes.INT),
+        OpenApiParameter(name="per_page", type=OpenApiTypes.INT),
+    ],
+    responses={200: dict},
+)
+class SearchView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return fail(error=query.errors, message="Validation error")
+        params = query.validated_data
+        page, per_page = params["page"], params["per_page"]
+        total, hits = get_backend().search(
+            params["q"], doc_types=sorted(params.get("type") or []), limit=per_page, offset=(page - 1) * per_page
+        )
+        total_pages = max(ceil(total / per_page), 1)
+        return ok(
+            data={
+                "query": params["q"],
+                "results": hits,
+                "pagination": {
+                    "current_page": page,
+                    "per_page": per_page,
+                    "total_pages": total_pages,
+                    "total_count": total,
+                    "has_next": page < total_pages,
+                    "has_previous": page > 1,
+                    "next_page": page + 1 if page < total_pages else None,
+                    "previous_page": page - 1 if page > 1 else None,
+                },
+            },
+            message="Search results"
+        )
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Connects the navigation/banner cache invalidation, image derivative and search index receivers,
+        # and registers the image derivatives job handler
+        from core.utils import images, menu_items, navigation, search  # noqa: F401
@@ -1,8 +1,13 @@
-from events.models import EventCategory
+from django.utils.functional import SimpleLazyObject
 
+from core.utils.navigation import get_navigation
 
-def event_category_menus(request):
-    """Expose active event categories to all templates."""
+
+def navigation(request):
+    """Expose the cached navigation tree to all templates (no queries per render)."""
+    tree = SimpleLazyObject(get_navigation)
     return {
-        "event_category_menus": EventCategory.objects.filter(is_active=True).order_by("title")
+        "navigation": tree,
+        # Kept for existing templates: active event categories ({{ category.title }}, .title_others)
+        "event_category_menus": SimpleLazyObject(lambda: tree["event_categories"]),
     }
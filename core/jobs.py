@@ -0,0 +1,133 @@
+"""
+Database-backed job queue.
+
+Handlers are registered per ``kind`` with ``@job("kind")`` in an app's
+``jobs.py`` (auto-discovered by the worker) or in a module its ``ready()``
+imports (e.g. core.utils.images). ``enqueue`` only inserts a row,
+so it can run inside the caller's transaction and the job is committed or
+rolled back with it.
+"""
+import logging
+import random
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_discovered = False
+
+
+def job(kind):
+    """Register ``func(payload)`` as the handler for ``kind``"""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind):
+    global _discovered
+    if not _discovered:
+        autodiscover_modules("jobs")
+        _discovered = True
+    return _handlers.get(kind)
+
+
+def enqueue(kind, payload=None, *, delay=None, max_attempts=None):
+    values = {"kind": kind, "payload": payload or {}}
+    if delay:
+        values["run_after"] = timezone.now() + timedelta(seconds=delay)
+    if max_attempts:
+        values["max_attempts"] = max_attempts
+    return Job.objects.create(**values)
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, in seconds"""
+    base = getattr(settings, "JOB_RETRY_BACKOFF", 30)
+    cap = getattr(settings, "JOB_RETRY_MAX_BACKOFF", 3600)
+    return random.uniform(0.5, 1.0) * min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+def claim_jobs(limit, kinds=None):
+    """
+    Claim up to ``limit`` due jobs with a conditional UPDATE per row, so two
+    workers never run the same job. Jobs left running longer than
+    JOB_LOCK_TIMEOUT (crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "JOB_LOCK_TIMEOUT", 600))
+    qs = Job.objects.filter(
+        Q(status="pending", run_after__lte=now) | Q(status="running", locked_at__lt=stale)
+    )
+    if kinds:
+        qs = qs.filter(kind__in=kinds)
+
+    claimed = []
+    for candidate in qs.order_by("run_after", "pk")[:limit]:
+        won = Job.objects.filter(
+            pk=candidate.pk, status=candidate.status, locked_at=candidate.locked_at
+        ).update(status="running", locked_at=now, attempts=F("attempts") + 1)
+        if won:
+            candidate.status = "running"
+            candidate.locked_at = now
+            candidate.attempts += 1
+            claimed.append(candidate)
+    return claimed
+
+
+def run_job(item):
+    """Run a claimed job; returns True on success"""
+    handler = get_handler(item.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {item.kind!r}")
+        handler(item.payload)
+    except Exception:
+        item.last_error = traceback.format_exc(limit=5)
+        if handler is None or item.attempts >= item.max_attempts:
+            item.status = "failed"
+            item.finished_at = timezone.now()
+            logger.error("Job %s failed permanently: %s", item, item.last_error)
+        else:
+            item.status = "pending"
+            item.run_after = timezone.now() + timedelta(seconds=retry_delay(item.attempts))
+            logger.warning("Job %s failed (attempt %s), retrying at %s", item, item.attempts, item.run_after)
+        item.locked_at = None
+        item.save(update_fields=["status", "run_after", "locked_at", "last_error", "finished_at"])
+        return False
+
+    item.status = "done"
+    item.locked_at = None
+    item.finished_at = timezone.now()
+    item.save(update_fields=["status", "locked_at", "finished_at"])
+    return True
+
+
+def _run_in_thread(item):
+    try:
+        return run_job(item)
+    finally:
+        close_old_connections()
+
+
+def run_pending(limit=50, kinds=None, workers=1):
+    """Claim and run one batch, on ``workers`` threads; returns (succeeded, failed)"""
+    claimed = claim_jobs(limit, kinds)
+    if workers > 1 and len(claimed) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_in_thread, claimed))
+    else:
+        results = [run_job(item) for item in claimed]
+    succeeded = sum(results)
+    return succeeded, len(results) - succeeded
@@ -0,0 +1,58 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import SearchDocument
+from core.utils.search import SOURCES, get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents (core.SearchDocument) from posts, events and association posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--type", action="append", dest="types",
+                            choices=[doc_type for doc_type, _, _ in SOURCES.values()],
+                            help="Only rebuild this content type (repeatable)")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        for label, (doc_type, _, build) in SOURCES.items():
+            if opts["types"] and doc_type not in opts["types"]:
+                continue
+            model = apps.get_model(label)
+            qs = model.objects.order_by("pk")
+            if label == "events.Event":
+                qs = qs.select_related("category")
+
+            last_pk = 0
+            indexed = 0
+            while True:
+                batch = list(qs.filter(pk__gt=last_pk)[:opts["batch_size"]])
+                if not batch:
+                    break
+                with transaction.atomic():
+                    existing = dict(
+                        SearchDocument.objects.filter(doc_type=doc_type, object_id__in=[obj.pk for obj in batch])
+                        .values_list("object_id", "pk")
+                    )
+                    documents = [
+                        SearchDocument(pk=existing.get(obj.pk), doc_type=doc_type, object_id=obj.pk,
+                                       modified_at=obj.modified_at, **build(obj))
+                        for obj in batch
+                    ]
+                    fields = ["title", "body", "url", "is_public", "modified_at"]
+                    SearchDocument.objects.bulk_update([doc for doc in documents if doc.pk], fields)
+                    SearchDocument.objects.bulk_create([doc for doc in documents if not doc.pk])
+                indexed += len(batch)
+                last_pk = batch[-1].pk
+
+            stale, _ = SearchDocument.objects.filter(doc_type=doc_type).exclude(
+                object_id__in=model.objects.values("pk")
+            ).delete()
+            self.stdout.write(f"{doc_type}: indexed {indexed}, removed {stale} stale")
+
+        get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jobs import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (core.models.Job). Loops until interrupted unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process due jobs once and exit")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--kind", action="append", dest="kinds", help="Only run this job kind (repeatable)")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Run each batch on this many threads (e.g. image derivatives)")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1 or opts["workers"] < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+
+        try:
+            while True:
+                succeeded, failed = run_pending(opts["batch_size"], opts["kinds"], opts["workers"])
+                if succeeded or failed:
+                    self.stdout.write(f"Ran {succeeded + failed} jobs ({failed} failed)")
+                if opts["once"]:
+                    if succeeded + failed < opts["batch_size"]:
+                        break
+                    continue
+                if not (succeeded or failed):
+                    time.sleep(opts["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
@@ -1,6 +1,16 @@
+import logging
 import threading
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 
+from core.utils import profiling
+
+logger = logging.getLogger(__name__)
+
 _local  = threading.local()
 
 def get_current_user():
@@ -13,3 +23,69 @@ class CurrentUserMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
         _local .user = None
         return response
+
+
+class QueryProfilingMiddleware:
+    """
+    Counts SQL queries and times each request, adds a Server-Timing header,
+    feeds the rolling stats served by /api/core/profiling/ and checks the
+    view's declared query budget (see core.utils.profiling).
+    Works in both sync (WSGI) and async (ASGI) chains.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _wrap_connections(stack, profile):
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(profile.sql_wrapper))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not profiling.should_profile():
+            return self.get_response(request)
+
+        profile = profiling.start_profile()
+        try:
+            with ExitStack() as stack:
+                self._wrap_connections(stack, profile)
+                response = self.get_response(request)
+        finally:
+            profiling.end_profile()
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not profiling.should_profile():
+            return await self.get_response(request)
+
+        profile = profiling.start_profile()
+        try:
+            with ExitStack() as stack:
+                self._wrap_connections(stack, profile)
+                response = await self.get_response(request)
+        finally:
+            profiling.end_profile()
+        return self._finish(request, response, profile)
+
+    def _finish(self, request, response, profile):
+        match = getattr(request, "resolver_match", None)
+        endpoint = f"{request.method} {match.route if match else request.path}"
+        budget = profiling.resolve_query_budget(request)
+        profiling.stats.record(endpoint, profile, budget)
+
+        if getattr(settings, "SERVER_TIMING", False):
+            response["Server-Timing"] = profile.server_timing()
+
+        if budget is not None and profile.sql_count > budget:
+            message = f"{endpoint} ran {profile.sql_count} queries (budget {budget})"
+            if getattr(settings, "QUERY_BUDGET_RAISE", False):
+                raise profiling.QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
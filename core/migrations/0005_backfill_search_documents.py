@@ -0,0 +1,90 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:10
+
+from django.db import migrations
+from django.urls import NoReverseMatch, reverse
+
+from core.utils.search import strip_html
+
+BATCH_SIZE = 500
+
+
+def _url(name, arg):
+    if not arg:
+        return ""
+    try:
+        return reverse(name, args=[str(arg)])
+    except NoReverseMatch:
+        return ""
+
+
+# Same documents as core.utils.search.SOURCES, built from the historical models
+def _post_document(post):
+    return {
+        "title": post.title,
+        "body": strip_html(post.short_description, post.description),
+        "url": _url("article_details", post.pk),
+        "is_public": post.is_active and post.is_published,
+    }
+
+
+def _event_document(event):
+    return {
+        "title": event.title,
+        "body": strip_html(event.short_description, event.description, event.location),
+        "url": _url("event_details", event.category.title_others if event.category_id else None),
+        "is_public": event.is_active and event.is_published,
+    }
+
+
+def _association_document(post):
+    return {
+        "title": post.title,
+        "body": strip_html(post.content),
+        "url": _url("association_post_details", post.title_others),
+        "is_public": post.is_active,
+    }
+
+
+SOURCES = [
+    ("posts", "Post", "post", _post_document),
+    ("events", "Event", "event", _event_document),
+    ("association", "AssociationPosts", "association", _association_document),
+]
+
+
+def backfill_search_documents(apps, schema_editor):
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    for app_label, model_name, doc_type, build in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        qs = model.objects.order_by("pk")
+        if doc_type == "event":
+            qs = qs.select_related("category")
+        indexed = set(SearchDocument.objects.filter(doc_type=doc_type).values_list("object_id", flat=True))
+        batch = []
+        for obj in qs.iterator(chunk_size=BATCH_SIZE):
+            if obj.pk in indexed:
+                continue
+            batch.append(SearchDocument(doc_type=doc_type, object_id=obj.pk, modified_at=obj.modified_at, **build(obj)))
+            if len(batch) == BATCH_SIZE:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+
+    if schema_editor.connection.vendor == "sqlite":
+        # The insert trigger already fed the index; rebuild once so it matches the documents exactly
+        schema_editor.execute("INSERT INTO search_index(search_index) VALUES ('rebuild')")
+        schema_editor.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_search_document"),
+        ("posts", "0003_image_variants"),
+        ("events", "0007_image_variants"),
+        ("association", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
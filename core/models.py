@@ -1,9 +1,102 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+import copy
 import uuid
 from django.conf import settings
+from django.utils import timezone
 
 
-class AuditModel(models.Model):
+class FieldTrackerMixin:
+    """
+    Remembers the column values an instance was loaded (or last saved) with,
+    so ``has_changed``/``previous`` need no query, and ``save()`` without
+    ``update_fields`` only writes the dirty columns (plus auto_now ones).
+    Set ``narrow_update_fields = False`` on a model to always write every column.
+    """
+    narrow_update_fields = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    @staticmethod
+    def _tracked_value(value):
+        if isinstance(value, FieldFile):
+            return value.name
+        if isinstance(value, (dict, list)):
+            # JSON values are usually mutated in place
+            return copy.deepcopy(value)
+        return value
+
+    def _take_snapshot(self, fields=None):
+        snapshot = self.__dict__.setdefault("_field_snapshot", {})
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            snapshot[field.attname] = self._tracked_value(getattr(self, field.attname))
+
+    def _is_dirty(self, field, snapshot):
+        # A field missing from the snapshot was deferred at load time and has been assigned since
+        return field.attname not in snapshot or self._tracked_value(getattr(self, field.attname)) != snapshot[field.attname]
+
+    def has_changed(self, name):
+        """True if ``name`` differs from its loaded value (always True for unsaved instances)"""
+        snapshot = self.__dict__.get("_field_snapshot")
+        if snapshot is None:
+            return True
+        field = self._meta.get_field(name)
+        if field.attname in self.get_deferred_fields():
+            return False
+        return self._is_dirty(field, snapshot)
+
+    def previous(self, name):
+        """Loaded value of ``name`` (the ``_id`` value for foreign keys), or None if unknown"""
+        field = self._meta.get_field(name)
+        return self.__dict__.get("_field_snapshot", {}).get(field.attname)
+
+    def changed_fields(self):
+        snapshot = self.__dict__.get("_field_snapshot")
+        if snapshot is None:
+            return [field.name for field in self._meta.concrete_fields]
+        deferred = self.get_deferred_fields()
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname not in deferred and self._is_dirty(field, snapshot)
+        ]
+
+    def _narrowed_update_fields(self):
+        snapshot = self.__dict__.get("_field_snapshot")
+        if not self.narrow_update_fields or snapshot is None or self._state.adding:
+            return None
+        if self._meta.pk.attname not in snapshot or self.has_changed(self._meta.pk.name):
+            return None
+        dirty = self.changed_fields()
+        dirty += [
+            field.name for field in self._meta.concrete_fields
+            if getattr(field, "auto_now", False) and field.name not in dirty
+        ]
+        return dirty
+
+    def save(self, *args, **kwargs):
+        if not args and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            narrowed = self._narrowed_update_fields()
+            if narrowed is not None:
+                kwargs["update_fields"] = narrowed
+        super().save(*args, **kwargs)
+        self._take_snapshot(kwargs.get("update_fields"))
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._take_snapshot(fields)
+
+
+class AuditModel(FieldTrackerMixin, models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(blank=True, null=True, auto_now_add=True)
@@ -28,7 +121,7 @@ class AuditModel(models.Model):
 
     def save(self, *args, **kwargs):
         user = kwargs.pop('user', None)
-        if user and not self.created_by:
+        if user and not self.created_by_id:
             self.created_by = user
         if user:
             self.modified_by = user
@@ -74,4 +167,98 @@ class MediaModel(AuditModel):
     downloaded_count = models.IntegerField(default=0)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class Sequence(models.Model):
+    """
+    Named gap-free counters (e.g. one per receipt prefix/year).
+    Values are allocated with an atomic UPDATE inside the caller's transaction,
+    so concurrent writers queue on the row instead of racing, and a rollback
+    gives the numbers back.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+    @classmethod
+    def next_value(cls, key, count=1, initial=None):
+        """
+        Allocate ``count`` consecutive values and return the last one
+        (the block is ``last - count + 1 .. last``).
+        ``initial`` is a callable returning the current high-water mark; it is
+        only consulted when the counter row is first created.
+        """
+        if count < 1:
+            raise ValueError("count must be positive")
+
+        with transaction.atomic():
+            for _ in range(2):
+                if cls.objects.filter(key=key).update(value=F("value") + count):
+                    return cls.objects.values_list("value", flat=True).get(key=key)
+                start = initial() if initial else 0
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(key=key, value=start + count)
+                    return start + count
+                except IntegrityError:
+                    # Another writer created the row first; retry the update
+                    continue
+        raise IntegrityError(f"Could not allocate sequence value for {key}")
+
+
+class Job(models.Model):
+    """
+    Durable background job (see ``core.jobs``), picked up by ``manage.py run_jobs``.
+    Failed attempts are rescheduled with backoff until ``max_attempts``.
+    """
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    kind = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable row per post, event or association post (see ``core.utils.search``),
+    holding its HTML-stripped text. On SQLite the ``search_index`` FTS5 table
+    mirrors title/body through triggers.
+    """
+    doc_type = models.CharField(max_length=30)
+    object_id = models.PositiveBigIntegerField()
+    title = models.TextField()
+    body = models.TextField(blank=True)
+    url = models.CharField(max_length=500, blank=True)
+    is_public = models.BooleanField(default=False)
+    modified_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["doc_type", "object_id"], name="core_searchdocument_unique_object"),
+        ]
+        indexes = [models.Index(fields=["is_public", "doc_type"])]
+
+    def __str__(self):
+        return f"{self.doc_type} #{self.object_id}: {self.title}"
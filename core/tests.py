@@ -1,3 +1,426 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+import requests
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from core.jobs import run_pending
+from core.models import MediaModel, SearchDocument, Sequence, Status
+from core.utils import profiling
+from core.utils.download_counts import download_counter
+from core.utils.http import CircuitOpenError, OutboundClient
+from core.utils.images import FORMATS, variant_specs
+from core.utils.search import get_backend
+from core.utils.status_registry import StatusRegistry
+from association.models import AssociationPosts
+from events.models import Event
+from posts.models import Post
+from memberships.api.views import MembershipViewSet
+
+
+class QueryBudgetTests(TestCase):
+    url = "/api/membership/"
+
+    def setUp(self):
+        staff = User.objects.create(email="staff@example.com", username="staff", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(staff)
+
+    def test_runner_enables_profiling_and_raising(self):
+        self.assertTrue(settings.QUERY_PROFILING)
+        self.assertTrue(settings.QUERY_BUDGET_RAISE)
+
+    def test_within_budget(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_over_budget_fails(self):
+        with mock.patch.object(MembershipViewSet, "query_budgets", {"list": 0}):
+            with self.assertRaises(profiling.QueryBudgetExceeded):
+                self.client.get(self.url)
+
+
+class ProfilingStatsTests(TestCase):
+    url = "/api/core/profiling/"
+
+    def setUp(self):
+        profiling.stats.reset()
+        self.addCleanup(profiling.stats.reset)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email="staff@example.com", username="staff", is_staff=True))
+
+    def endpoints(self):
+        return {row["endpoint"] for row in self.client.get(self.url).data["data"]["endpoints"]}
+
+    def test_profiled_requests_reported(self):
+        self.client.get("/api/membership/")
+        data = self.client.get(self.url).data["data"]
+        self.assertEqual((data["enabled"], data["sample_rate"]), (True, 1.0))
+        self.assertIn("GET api/membership/$", self.endpoints())
+
+    def test_unsampled_requests_skipped(self):
+        with override_settings(QUERY_PROFILING_SAMPLE_RATE=0.0):
+            self.client.get("/api/membership/")
+        self.assertNotIn("GET api/membership/$", self.endpoints())
+
+    @override_settings(QUERY_PROFILING=False)
+    def test_disabled_profiling_reported(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.data["data"]["enabled"])
+        self.assertIn("disabled", response.data["message"])
+
+
+class SequenceConcurrencyTests(SimpleTestCase):
+    """
+    Runs on its own file-backed SQLite database: worker threads on the
+    shared-cache in-memory test database fail with "table is locked"
+    instead of waiting for the write lock.
+    """
+    databases = {DEFAULT_DB_ALIAS}
+    workers = 8
+    per_worker = 25
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        # Connections opened by the worker threads read the patched settings
+        patcher = mock.patch.dict(connections.settings[DEFAULT_DB_ALIAS],
+                                  NAME=os.path.join(directory, "sequence.sqlite3"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        setup = connections.create_connection(DEFAULT_DB_ALIAS)
+        with setup.schema_editor() as editor:
+            editor.create_model(Sequence)
+        setup.close()
+
+    def test_concurrent_allocation_has_no_duplicates(self):
+        start = threading.Barrier(self.workers)
+        values, errors = [], []
+
+        def allocate():
+            try:
+                start.wait()
+                for _ in range(self.per_worker):
+                    values.append(Sequence.next_value("test-seq"))
+            except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(values), self.workers * self.per_worker)
+        self.assertEqual(len(set(values)), len(values))
+        self.assertFalse(Sequence.objects.filter(key="test-seq").exists())  # the test database was not used
+
+
+def http_response(status):
+    response = requests.Response()
+    response.status_code = status
+    return response
+
+
+class OutboundClientTests(SimpleTestCase):
+    url = "https://provider.test/api"
+
+    def make_client(self, *responses, **options):
+        options.setdefault("retries", 2)
+        client = OutboundClient("test", backoff=0, **options)
+        patcher = mock.patch.object(client.session, "request", side_effect=list(responses))
+        self.addCleanup(patcher.stop)
+        client.sent = patcher.start()
+        return client
+
+    def test_idempotent_request_retried_on_retryable_status(self):
+        client = self.make_client(http_response(503), http_response(200))
+        self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertEqual(client.sent.call_count, 2)
+
+    def test_post_not_retried_on_retryable_status(self):
+        client = self.make_client(http_response(503), http_response(200))
+        self.assertEqual(client.post(self.url).status_code, 503)
+        self.assertEqual(client.sent.call_count, 1)
+
+    def test_post_not_retried_after_connection_dropped(self):
+        client = self.make_client(requests.ConnectionError("Connection aborted"), http_response(200))
+        with self.assertRaises(requests.ConnectionError):
+            client.post(self.url)
+        self.assertEqual(client.sent.call_count, 1)
+
+    def test_post_retried_when_connect_failed(self):
+        client = self.make_client(requests.ConnectTimeout("connect timed out"), http_response(201))
+        self.assertEqual(client.post(self.url).status_code, 201)
+        self.assertEqual(client.sent.call_count, 2)
+
+    def test_post_retried_when_opted_in(self):
+        client = self.make_client(requests.ConnectionError("Connection aborted"), http_response(201))
+        self.assertEqual(client.post(self.url, retry=True).status_code, 201)
+        self.assertEqual(client.sent.call_count, 2)
+
+    def test_breaker_opens_after_threshold(self):
+        client = self.make_client(*[http_response(500)] * 2, retries=0, breaker_threshold=2,
+                                  breaker_cooldown=60)
+        client.get(self.url)
+        client.get(self.url)
+        self.assertEqual(client.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            client.get(self.url)
+        self.assertEqual(client.sent.call_count, 2)
+
+    def test_half_open_trial_released_after_unexpected_error(self):
+        client = self.make_client(http_response(500), ValueError("bad"), http_response(200), retries=0,
+                                  breaker_threshold=1, breaker_cooldown=0.01)
+        client.get(self.url)
+        time.sleep(0.02)
+        with self.assertRaises(ValueError):
+            client.get(self.url)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        self.assertEqual(client.breaker.state, "closed")
+
+
+class StatusRegistryTests(TestCase):
+    def test_miss_reloads_before_failing(self):
+        registry = StatusRegistry()
+        self.assertEqual(registry.children("none"), [])  # loads the cache
+        # bulk_create sends no signal, like a status added by another process
+        Status.objects.bulk_create([Status(status_code="99", internal_status="New", external_status="New")])
+        created = Status.objects.get(status_code="99")
+        self.assertEqual(registry.code_for_id(created.pk), "99")
+        self.assertEqual(registry.get("99").pk, created.pk)
+
+    def test_unknown_id_raises(self):
+        registry = StatusRegistry()
+        self.assertIsNone(registry.code_for_id(None))
+        with self.assertRaises(Status.DoesNotExist):
+            registry.code_for_id(987654)
+
+
+def image_upload(name, size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class ImageDerivativesTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def save_image(self, event, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            event.cover_image = image
+            event.save()
+        run_pending()
+        event.refresh_from_db()
+        return event.cover_image_variants
+
+    @staticmethod
+    def variant_files(variants):
+        return [entry[ext] for variant, entry in variants.items() if variant != "source" for ext in FORMATS]
+
+    def test_derivatives_generated(self):
+        event = Event(title="Talk", title_others="talk")
+        variants = self.save_image(event, image_upload("a.jpg"))
+        self.assertEqual(variants["source"], event.cover_image.name)
+        self.assertEqual(set(variants) - {"source"}, set(variant_specs()))
+        self.assertLessEqual(max(variants["thumb"]["width"], variants["thumb"]["height"]), 320)
+        for name in self.variant_files(variants):
+            self.assertTrue(default_storage.exists(name), name)
+
+    def test_replaced_and_removed_images_clean_up_derivatives(self):
+        event = Event(title="Talk", title_others="talk")
+        first = self.save_image(event, image_upload("a.jpg"))
+        second = self.save_image(event, image_upload("b.jpg"))
+        self.assertNotEqual(first["source"], second["source"])
+        for name in self.variant_files(first):
+            self.assertFalse(default_storage.exists(name), name)
+
+        self.assertEqual(self.save_image(event, None), {})
+        for name in self.variant_files(second):
+            self.assertFalse(default_storage.exists(name), name)
+
+
+@override_settings(DOWNLOAD_COUNT_FLUSH_SIZE=1000, DOWNLOAD_COUNT_FLUSH_INTERVAL=3600)
+class MediaDeliveryTests(TestCase):
+    data = bytes(range(256)) * 8
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        download_counter.flush()
+        self.media = MediaModel(title="Clip", location="Hall")
+        self.media.file.save("clip.mp4", ContentFile(self.data))
+        self.url = f"/api/core/media/{self.media.pk}/file/"
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_download(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(body, self.data)
+
+    def test_range(self):
+        response, body = self.get(HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(body, self.data[100:200])
+
+        response, body = self.get(HTTP_RANGE="bytes=-10")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.data[-10:])
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(HTTP_RANGE=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_not_modified(self):
+        response, _ = self.get()
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=last_modified)[0].status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"')[0].status_code, 200)
+
+    def test_missing_file_is_404(self):
+        default_storage.delete(self.media.file.name)
+        self.assertEqual(self.get()[0].status_code, 404)
+
+    def test_downloads_counted_once_and_flushed(self):
+        etag = self.get()[0]["ETag"]
+        self.get(HTTP_RANGE="bytes=0-99")
+        # Seeks and revalidations are not downloads
+        self.get(HTTP_RANGE="bytes=500-599")
+        self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(download_counter.pending(self.media), 2)
+        self.assertEqual(MediaModel.objects.get(pk=self.media.pk).downloaded_count, 0)
+
+        self.assertEqual(download_counter.flush(), 1)
+        self.assertEqual(download_counter.pending(self.media), 0)
+        self.assertEqual(MediaModel.objects.get(pk=self.media.pk).downloaded_count, 2)
+
+
+class SearchTestsMixin:
+    backend = None
+
+    def setUp(self):
+        settings_override = override_settings(SEARCH_BACKEND=self.backend)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_backend.cache_clear()
+        self.addCleanup(get_backend.cache_clear)
+
+        self.post = Post.objects.create(
+            title="Annual gathering", title_others="annual-gathering", is_published=True,
+            description="<p>Join us for the <b>lantern</b> festival &amp; dinner</p>",
+        )
+        self.event = Event.objects.create(
+            title="Lantern walk", title_others="lantern-walk", is_published=True, description="<p>Evening walk</p>"
+        )
+        self.association = AssociationPosts.objects.create(title="About us", content="<p>Lantern makers</p>")
+        self.user = User.objects.create(email="staff@example.com", username="staff")
+
+    def search(self, **params):
+        response = self.client.get("/api/core/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def hit_types(self, **params):
+        return sorted(hit["doc_type"] for hit in self.search(**params)["results"])
+
+    def test_saved_content_indexed_without_html(self):
+        document = SearchDocument.objects.get(doc_type="post", object_id=self.post.pk)
+        self.assertEqual(document.body, "Join us for the lantern festival & dinner")
+        self.assertEqual(self.hit_types(q="lantern"), ["association", "event", "post"])
+
+    def test_matches_highlighted(self):
+        hit = next(hit for hit in self.search(q="lantern")["results"] if hit["doc_type"] == "event")
+        self.assertEqual(hit["title"], "<mark>Lantern</mark> walk")
+        hit = next(hit for hit in self.search(q="festival")["results"] if hit["doc_type"] == "post")
+        # Stored text is escaped on output; only the markers become tags
+        self.assertIn("<mark>festival</mark> &amp; dinner", hit["snippet"])
+
+    def test_edit_unpublish_and_delete_update_index(self):
+        self.post.title = "Spring gathering"
+        self.post.save()
+        self.assertEqual(self.search(q="spring")["results"][0]["object_id"], self.post.pk)
+        self.post.is_published = False
+        self.post.save()
+        self.assertEqual(self.search(q="spring")["results"], [])
+        self.post.delete()
+        self.assertFalse(SearchDocument.objects.filter(doc_type="post", object_id=self.post.pk).exists())
+
+    def test_fts_syntax_in_input_is_quoted(self):
+        for query in ['lantern"', "lantern*", "(lantern", "-lantern"]:
+            self.assertIn("post", self.hit_types(q=query), query)
+        # Operators and column filters are plain terms: FTS syntax would match the post
+        self.assertEqual(self.search(q="festival OR nothing")["results"], [])
+        self.assertEqual(self.search(q="body:festival")["results"], [])
+        self.assertEqual(self.search(q="NEAR(lantern festival)")["results"], [])
+        self.assertEqual(self.search(q='"*()')["results"], [])
+
+    def test_type_filter(self):
+        self.assertEqual(self.hit_types(q="lantern", type="event,association"), ["association", "event"])
+        self.assertEqual(self.hit_types(q="lantern", type=["post", "event"]), ["event", "post"])
+        response = self.client.get("/api/core/search/", {"q": "lantern", "type": "banner"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pagination(self):
+        first = self.search(q="lantern", per_page=2)
+        self.assertEqual(len(first["results"]), 2)
+        self.assertEqual((first["pagination"]["total_count"], first["pagination"]["next_page"]), (3, 2))
+        second = self.search(q="lantern", per_page=2, page=2)
+        self.assertEqual(len(second["results"]), 1)
+        seen = {(hit["doc_type"], hit["object_id"]) for hit in first["results"] + second["results"]}
+        self.assertEqual(len(seen), 3)
+
+    def test_list_endpoints_search_param(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        Post.objects.create(title="Other", title_others="other", description="Nothing here")
+        for url, expected in [
+            ("/api/posts/", self.post.pk),
+            ("/api/events/events/", self.event.pk),
+            ("/api/association/posts/", self.association.pk),
+        ]:
+            response = client.get(url, {"search": "lantern"})
+            self.assertEqual(response.status_code, 200, url)
+            # The events list uses DRF's default pagination envelope
+            results = response.data.get("data", response.data)["results"]
+            self.assertEqual([row["id"] for row in results], [expected], url)
+
+
+class SQLiteFTS5SearchTests(SearchTestsMixin, TestCase):
+    backend = "core.utils.search.SQLiteFTS5Backend"
+
+
+class BasicSearchTests(SearchTestsMixin, TestCase):
+    backend = "core.utils.search.BasicSearchBackend"
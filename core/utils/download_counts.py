@@ -0,0 +1,86 @@
+"""
+Buffered download counters.
+
+``record_download`` only increments an in-process counter. The buffer is
+written out with one ``F()`` UPDATE per (model, increment) group when it is
+DOWNLOAD_COUNT_FLUSH_INTERVAL seconds old or holds DOWNLOAD_COUNT_FLUSH_SIZE
+hits, and at interpreter exit, so a popular file costs one write per
+interval instead of one per hit. Hits buffered in a process that is killed
+are lost; counts are approximate by design.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadCounter:
+    def __init__(self, field="downloaded_count"):
+        self.field = field
+        self._lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def record(self, instance):
+        with self._lock:
+            self._hits[(instance._meta.label, instance.pk)] += 1
+            self._pending += 1
+            due = (
+                self._pending >= getattr(settings, "DOWNLOAD_COUNT_FLUSH_SIZE", 100)
+                or time.monotonic() - self._last_flush >= getattr(settings, "DOWNLOAD_COUNT_FLUSH_INTERVAL", 30)
+            )
+        if due:
+            self.flush()
+
+    def pending(self, instance):
+        """Hits for ``instance`` not yet written (to show live counts)"""
+        with self._lock:
+            return self._hits.get((instance._meta.label, instance.pk), 0)
+
+    def flush(self):
+        """Write buffered hits; returns the number of UPDATE statements run"""
+        with self._lock:
+            hits, self._hits = self._hits, defaultdict(int)
+            self._pending = 0
+            self._last_flush = time.monotonic()
+        if not hits:
+            return 0
+
+        # {label: {increment: [pk, ...]}} -> one UPDATE per model and increment
+        grouped = defaultdict(lambda: defaultdict(list))
+        for (label, pk), count in hits.items():
+            grouped[label][count].append(pk)
+
+        updates = 0
+        for label, by_count in grouped.items():
+            model = apps.get_model(label)
+            for count, pks in by_count.items():
+                try:
+                    model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + count})
+                    updates += 1
+                except Exception:
+                    logger.exception("Could not flush %s download counts for %s", label, pks)
+        return updates
+
+
+download_counter = DownloadCounter()
+
+
+def record_download(instance):
+    download_counter.record(instance)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        download_counter.flush()
+    except Exception:
+        logger.exception("Could not flush download counts at exit")
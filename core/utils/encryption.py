@@ -1,18 +1,68 @@
 # core/utils/encryption.py
-from cryptography.fernet import Fernet
+from functools import lru_cache
+import hashlib
+import hmac
+import re
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
 from django.conf import settings
 import base64
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Every Fernet token starts with the 0x80 version byte, i.e. "gA" once base64
+# encoded. Legacy values were base64-encoded a second time ("Z0FBQUFB...").
+COMPACT_TOKEN_PREFIX = "gA"
+
+
+def get_encryption_keys():
+    """
+    Get all active keys, primary first.
+    FERNET_KEYS (comma-separated) takes precedence; FERNET_KEY is used when it is empty.
+    """
+    keys = getattr(settings, 'FERNET_KEYS', None) or []
+    if isinstance(keys, str):
+        keys = keys.split(',')
+    keys = [k.strip() for k in keys if k and k.strip()]
+    if not keys:
+        key = getattr(settings, 'FERNET_KEY', None)
+        if not key:
+            raise ValueError("FERNET_KEY not set in settings")
+        keys = [key]
+    return tuple(k.encode() if isinstance(k, str) else k for k in keys)
+
 
 def get_encryption_key():
-    """Get encryption key from settings"""
-    key = getattr(settings, 'FERNET_KEY', None)
-    if not key:
-        raise ValueError("FERNET_KEY not set in settings")
-    return key.encode() if isinstance(key, str) else key
+    """Get the primary encryption key from settings"""
+    return get_encryption_keys()[0]
+
+
+@lru_cache(maxsize=8)
+def _build_fernet(key):
+    return Fernet(key)
+
+
+@lru_cache(maxsize=8)
+def _build_cipher(keys):
+    return MultiFernet([_build_fernet(k) for k in keys])
+
+
+def get_cipher() -> MultiFernet:
+    """Process-wide MultiFernet for the configured keys (built once per key set)"""
+    return _build_cipher(get_encryption_keys())
+
+
+def _to_token(stored: str) -> bytes:
+    """Accept both the compact and the legacy double-encoded storage format"""
+    if stored.startswith(COMPACT_TOKEN_PREFIX):
+        return stored.encode()
+    return base64.urlsafe_b64decode(stored.encode())
+
+
+def _to_stored(token: bytes) -> str:
+    if getattr(settings, 'FERNET_LEGACY_FORMAT', False):
+        return base64.urlsafe_b64encode(token).decode()
+    return token.decode()
 
 
 def encrypt_data(data: str) -> str:
@@ -21,11 +71,7 @@ def encrypt_data(data: str) -> str:
         return ""
 
     try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        encrypted_data = f.encrypt(data.encode())
-        # Return base64 encoded string for storage
-        return base64.urlsafe_b64encode(encrypted_data).decode()
+        return _to_stored(get_cipher().encrypt(data.encode()))
     except Exception as e:
         logger.error(f"Encryption error: {e}")
         raise
@@ -37,17 +83,85 @@ def decrypt_data(encrypted_data: str) -> str:
         return ""
 
     try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        # Decode from base64 first
-        decoded_data = base64.urlsafe_b64decode(encrypted_data.encode())
-        decrypted_data = f.decrypt(decoded_data)
-        return decrypted_data.decode()
+        return get_cipher().decrypt(_to_token(encrypted_data)).decode()
+    except Exception as e:
+        logger.error(f"Decryption error: {e}")
+        raise
+
+
+def decrypt_many(encrypted_values) -> list:
+    """Decrypt a batch of values (order preserved)"""
+    encrypted_values = list(encrypted_values)
+    if not any(encrypted_values):
+        return ["" for _ in encrypted_values]
+
+    try:
+        cipher = get_cipher()
+        return [
+            cipher.decrypt(_to_token(value)).decode() if value else ""
+            for value in encrypted_values
+        ]
     except Exception as e:
         logger.error(f"Decryption error: {e}")
         raise
 
 
+def is_current(encrypted_data: str) -> bool:
+    """True if the value is stored in the current format under the primary key"""
+    if not encrypted_data:
+        return True
+    is_compact = encrypted_data.startswith(COMPACT_TOKEN_PREFIX)
+    if is_compact == getattr(settings, 'FERNET_LEGACY_FORMAT', False):
+        return False
+    try:
+        _build_fernet(get_encryption_key()).decrypt(_to_token(encrypted_data))
+    except (InvalidToken, ValueError):
+        return False
+    return True
+
+
+def reencrypt_data(encrypted_data: str) -> str:
+    """Re-encrypt a stored value under the primary key, in the current storage format"""
+    if not encrypted_data:
+        return encrypted_data
+
+    try:
+        return _to_stored(get_cipher().rotate(_to_token(encrypted_data)))
+    except Exception as e:
+        logger.error(f"Re-encryption error: {e}")
+        raise
+
+
+def normalize_nric(value: str) -> str:
+    """Canonical NRIC/FIN form used for blind indexing (e.g. ' s1234567a ' -> 'S1234567A')"""
+    return re.sub(r"\s+", "", value or "").upper()
+
+
+def normalize_phone(value: str) -> str:
+    """Canonical phone form used for blind indexing (digits only)"""
+    return re.sub(r"\D", "", value or "")
+
+
+def blind_index(value: str, kind: str) -> str:
+    """
+    Keyed HMAC-SHA256 of an already normalized value, for exact-match lookups on
+    encrypted columns. ``kind`` separates the NRIC and phone index domains.
+    """
+    if not value:
+        return ""
+    key = getattr(settings, 'BLIND_INDEX_KEY', '') or settings.SECRET_KEY
+    key = key.encode() if isinstance(key, str) else key
+    return hmac.new(key, f"{kind}:{value}".encode(), hashlib.sha256).hexdigest()
+
+
+def nric_blind_index(value: str) -> str:
+    return blind_index(normalize_nric(value), "nric")
+
+
+def phone_blind_index(value: str) -> str:
+    return blind_index(normalize_phone(value), "phone")
+
+
 def mask_phone_number(phone: str) -> str:
     """Mask phone number for display (e.g., +659***4567)"""
     if not phone:
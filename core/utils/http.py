@@ -0,0 +1,184 @@
+"""
+Shared outbound HTTP client for third-party providers (HitPay, OneSignal, ...).
+
+One pooled keep-alive ``requests.Session`` per named service, a default
+(connect, read) timeout on every call, retries with exponential backoff and
+full jitter, and a per-service circuit breaker so a provider that is down
+fails fast instead of tying up worker threads.
+"""
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without calling the provider while its circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: after ``threshold`` failures the circuit
+    opens for ``cooldown`` seconds, then lets a single trial call through
+    (half-open); success closes it again, failure re-opens it. A trial that
+    ends without either verdict hands its slot back through ``release``.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_thread = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and self._trial_thread is None:
+                self._trial_thread = threading.get_ident()
+                return True
+            return False
+
+    def release(self):
+        """Free the half-open trial slot if this thread holds it"""
+        with self._lock:
+            if self._trial_thread == threading.get_ident():
+                self._trial_thread = None
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_thread = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_thread = None
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+def _never_sent(exc):
+    """True when the connection failed before any part of the request went out"""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    # NewConnectionError (refused, DNS failure) subclasses ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class OutboundClient:
+    def __init__(self, name, *, timeout=None, retries=None, backoff=None, max_backoff=None,
+                 breaker_threshold=None, breaker_cooldown=None, pool_size=None):
+        self.name = name
+        self.timeout = timeout or (
+            getattr(settings, "OUTBOUND_HTTP_CONNECT_TIMEOUT", 3.05),
+            getattr(settings, "OUTBOUND_HTTP_READ_TIMEOUT", 10),
+        )
+        self.retries = getattr(settings, "OUTBOUND_HTTP_RETRIES", 2) if retries is None else retries
+        self.backoff = getattr(settings, "OUTBOUND_HTTP_BACKOFF", 0.5) if backoff is None else backoff
+        self.max_backoff = max_backoff or getattr(settings, "OUTBOUND_HTTP_MAX_BACKOFF", 8.0)
+        self.breaker = CircuitBreaker(
+            threshold=breaker_threshold or getattr(settings, "OUTBOUND_HTTP_BREAKER_THRESHOLD", 5),
+            cooldown=breaker_cooldown or getattr(settings, "OUTBOUND_HTTP_BREAKER_COOLDOWN", 30.0),
+        )
+        pool_size = pool_size or getattr(settings, "OUTBOUND_HTTP_POOL_SIZE", 10)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _sleep_before_retry(self, attempt):
+        # Full jitter: uniform(0, min(cap, base * 2**attempt))
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))))
+
+    def request(self, method, url, *, retry=None, **kwargs):
+        """
+        Send a request and return the response (raise_for_status is left to the caller).
+        Failures to connect are always retried (nothing reached the provider);
+        dropped connections, read timeouts and retryable status codes only for
+        idempotent methods unless ``retry=True`` (e.g. the payload carries an
+        idempotency key).
+        """
+        method = method.upper()
+        retry_unsafe = method in IDEMPOTENT_METHODS if retry is None else retry
+        kwargs.setdefault("timeout", self.timeout)
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.name}: circuit open, skipping {method} {url}")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError as exc:
+                # ConnectTimeout is a ConnectionError; ReadTimeout is not
+                self.breaker.record_failure()
+                error, can_retry = exc, retry_unsafe or _never_sent(exc)
+            except requests.Timeout as exc:
+                self.breaker.record_failure()
+                error, can_retry = exc, retry_unsafe
+            else:
+                if response.status_code >= 500 or response.status_code == 429:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or not retry_unsafe or attempt >= self.retries:
+                    return response
+                error, can_retry = None, True
+            finally:
+                # Any other exception must not leave a half-open trial claimed forever
+                self.breaker.release()
+
+            if not can_retry or attempt >= self.retries:
+                raise error
+            logger.info("%s: retrying %s %s (attempt %s): %s", self.name, method, url, attempt + 1,
+                        error or f"HTTP {response.status_code}")
+            self._sleep_before_retry(attempt)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name, **options):
+    """Process-wide client for ``name`` (options only apply on first use)"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = OutboundClient(name, **options)
+    return client
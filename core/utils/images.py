@@ -0,0 +1,213 @@
+"""
+Resized image derivatives (thumbnails and WebP/JPEG variants).
+
+Every model image field listed in IMAGE_FIELDS has a ``<field>_variants``
+JSONField. When the image changes, a ``images.derivatives`` job is queued
+(core.jobs, run by ``manage.py run_jobs``); the worker decodes the original
+once, applies its EXIF orientation, renders each size in IMAGE_VARIANTS as
+WebP and JPEG without metadata, and records the storage names. Serializers
+expose them through ``ImageVariantsField``. Rows created with bulk_create
+send no signals; call ``queue_derivatives`` for them.
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from core.jobs import enqueue, job
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_JOB = "images.derivatives"
+
+# model label -> image field; each model has a matching "<field>_variants" JSONField
+IMAGE_FIELDS = {
+    "posts.Post": "cover_image",
+    "events.Event": "cover_image",
+    "events.EventMedia": "media_file",
+    "memberships.Membership": "profile_picture",
+}
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+
+DEFAULT_VARIANTS = {
+    "thumb": {"size": (320, 320), "crop": True},
+    "medium": {"size": (960, 960)},
+    "large": {"size": (1920, 1920)},
+}
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def variant_specs():
+    return getattr(settings, "IMAGE_VARIANTS", DEFAULT_VARIANTS)
+
+
+def is_image_name(name):
+    return posixpath.splitext(name or "")[1].lower() in IMAGE_EXTENSIONS
+
+
+def variant_name(source, variant, ext):
+    root, _ = posixpath.splitext(source)
+    return f"derivatives/{root}/{variant}.{ext}"
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == "JPEG":
+        if image.mode != "RGB":
+            # JPEG has no alpha: flatten onto white
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+            image = background
+        image.save(buffer, "JPEG", quality=getattr(settings, "IMAGE_JPEG_QUALITY", 82), optimize=True,
+                   progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=getattr(settings, "IMAGE_WEBP_QUALITY", 80), method=4)
+    # No exif/icc arguments are passed, so no metadata is written
+    return buffer.getvalue()
+
+
+def render_variants(field_file):
+    """Render every variant of ``field_file``; returns {variant: {fmt: (bytes), "width", "height"}}"""
+    specs = variant_specs()
+    largest = max(max(spec["size"]) for spec in specs.values())
+    with field_file.open("rb") as handle:
+        with Image.open(handle) as original:
+            # JPEG: decode at a reduced scale when the original is much larger than needed
+            original.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or "A" in image.getbands() else "RGB")
+
+    rendered = {}
+    for variant, spec in specs.items():
+        width, height = spec["size"]
+        if spec.get("crop"):
+            resized = ImageOps.fit(image, (min(width, image.width), min(height, image.height)), Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((width, height), Image.LANCZOS)
+        rendered[variant] = {
+            "width": resized.width,
+            "height": resized.height,
+            **{ext: _encode(resized, fmt) for ext, fmt in FORMATS.items()},
+        }
+    return rendered
+
+
+@job(DERIVATIVES_JOB)
+def generate_derivatives(payload):
+    """Job handler: render and store the variants of one image, if it is still the current one"""
+    model = apps.get_model(payload["model"])
+    field = payload["field"]
+    variants_field = f"{field}_variants"
+    obj = model.objects.filter(pk=payload["pk"]).only("pk", field, variants_field).first()
+    field_file = getattr(obj, field, None) if obj else None
+    if not field_file or field_file.name != payload["source"]:
+        return  # deleted or replaced since the job was queued; the newer save queued its own job
+
+    try:
+        rendered = render_variants(field_file)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        # Not retried: the file itself is unusable
+        logger.warning("No derivatives for %s %s (%s): %s", payload["model"], obj.pk, field_file.name, exc)
+        return
+
+    storage = field_file.storage
+    previous = getattr(obj, variants_field) or {}
+    variants = {"source": field_file.name}
+    for variant, data in rendered.items():
+        entry = {"width": data["width"], "height": data["height"]}
+        for ext in FORMATS:
+            name = variant_name(field_file.name, variant, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            entry[ext] = storage.save(name, ContentFile(data[ext]))
+        variants[variant] = entry
+
+    # Only record them if the image still hasn't changed
+    updated = model.objects.filter(pk=obj.pk, **{field: field_file.name}).update(**{variants_field: variants})
+    if updated and previous.get("source") and previous["source"] != field_file.name:
+        _delete_variants(storage, previous)
+    if updated and payload["model"] in ("posts.Post", "events.Event"):
+        from core.utils.menu_items import invalidate_banner_index
+        invalidate_banner_index()
+
+
+def _delete_variants(storage, variants):
+    for variant, entry in variants.items():
+        if variant == "source":
+            continue
+        for ext in FORMATS:
+            if entry.get(ext):
+                storage.delete(entry[ext])
+
+
+def queue_derivatives(instances, field):
+    """Queue derivative jobs (after commit) for instances whose ``field`` holds an image"""
+    payloads = [
+        {"model": instance._meta.label, "pk": instance.pk, "field": field, "source": getattr(instance, field).name}
+        for instance in instances
+        if instance.pk and getattr(instance, field) and is_image_name(getattr(instance, field).name)
+    ]
+    if payloads:
+        transaction.on_commit(lambda: [enqueue(DERIVATIVES_JOB, payload) for payload in payloads])
+
+
+def variant_urls(instance, field):
+    """{variant: {"webp": url, "jpeg": url, "width", "height"}} for the current image, or {} if not ready"""
+    field_file = getattr(instance, field)
+    variants = getattr(instance, f"{field}_variants", None) or {}
+    if not field_file or variants.get("source") != field_file.name:
+        return {}
+    storage = field_file.storage
+    return {
+        variant: {
+            "width": entry["width"],
+            "height": entry["height"],
+            **{ext: storage.url(entry[ext]) for ext in FORMATS if entry.get(ext)},
+        }
+        for variant, entry in variants.items()
+        if variant != "source"
+    }
+
+
+class ImageVariantsField(serializers.Field):
+    """Read-only map of derivative URLs for an image field: ``ImageVariantsField(image_field="cover_image")``"""
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs["read_only"] = True
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return variant_urls(instance, self.image_field)
+
+
+def _image_saved(sender, instance, created, update_fields=None, **kwargs):
+    field = IMAGE_FIELDS[sender._meta.label]
+    if update_fields is not None and field not in update_fields:
+        return
+    if not created and not instance.has_changed(field):
+        return
+    if getattr(instance, field):
+        queue_derivatives([instance], field)
+    elif getattr(instance, f"{field}_variants"):
+        # Image removed: drop its derivatives too
+        previous = getattr(instance, f"{field}_variants")
+        sender.objects.filter(pk=instance.pk).update(**{f"{field}_variants": {}})
+        storage = sender._meta.get_field(field).storage
+        transaction.on_commit(lambda: _delete_variants(storage, previous))
+
+
+for _label in IMAGE_FIELDS:
+    post_save.connect(_image_saved, sender=_label, dispatch_uid=f"image_derivatives_{_label}")
@@ -0,0 +1,145 @@
+"""
+File delivery for media downloads and audio/video seeking.
+
+``serve_file`` answers conditional requests (ETag / Last-Modified) with 304,
+serves single byte ranges with 206 and streams bodies in blocks. With
+MEDIA_OFFLOAD set it only sets X-Accel-Redirect (nginx) or X-Sendfile
+(Apache/lighttpd) and lets the web server send the bytes and handle ranges:
+
+    # nginx
+    location /protected-media/ { internal; alias /path/to/media/; }
+
+Files in non-local storage are redirected to their storage URL.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, StreamingHttpResponse,
+)
+from django.utils.http import http_date, parse_http_date_safe
+
+BLOCK_SIZE = 64 * 1024
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(stat):
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(mtime) <= since
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single ``bytes=`` range, None to send the
+    whole file (no/unsupported/multi range), or False if unsatisfiable.
+    """
+    match = RANGE.match((header or "").strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        while length > 0:
+            block = handle.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve_file(request, field_file, *, download_name=None, as_attachment=False, on_download=None):
+    """
+    Response for ``field_file`` honouring conditional and Range requests.
+    ``on_download()`` is called when the body is sent from its first byte
+    (a full download or the first range of a player), not for 304s or seeks.
+    """
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        if on_download:
+            on_download()
+        return HttpResponseRedirect(field_file.url)
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # Row still points at a file that is gone from storage
+        raise Http404("File not found")
+    etag = _etag(stat)
+    headers = {"ETag": etag, "Last-Modified": http_date(stat.st_mtime), "Accept-Ranges": "bytes"}
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    size = stat.st_size
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if if_range is None or if_range.strip() in (etag, headers["Last-Modified"]):
+        byte_range = parse_range(request.headers.get("Range"), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    if on_download and (byte_range is None or byte_range[0] == 0):
+        on_download()
+
+    filename = download_name or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    disposition = "attachment" if as_attachment else "inline"
+    headers["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+
+    offload = getattr(settings, "MEDIA_OFFLOAD", "")
+    if offload:
+        response = HttpResponse(content_type=content_type)
+        if offload == "nginx":
+            prefix = getattr(settings, "MEDIA_OFFLOAD_PREFIX", "/protected-media/")
+            response["X-Accel-Redirect"] = prefix + quote(field_file.name)
+        else:
+            response["X-Sendfile"] = path
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    if byte_range is None:
+        try:
+            handle = open(path, "rb")
+        except OSError:
+            raise Http404("File not found")
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_iter_range(path, start, end - start + 1), status=206,
+                                         content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -1,20 +1,110 @@
-from posts.models import Post
-from events.models import Event
+"""
+Banner / slideshow index shared by the home page, the private banner list and
+the banner API.
 
-def get_menu_items():
-    menu_items = []
-    model_classes = [Post, Event]
-
-    for model_class in model_classes:
-        model_name = model_class.__name__
-        objects = model_class.objects.filter(set_banner=True, is_active=True)
-
-        for obj in objects:
-            menu_items.append({
-                'title': obj.title,
-                'model_name': model_name,
-                'image': obj.cover_image.url if obj.cover_image else None,
-                'url': obj.get_absolute_url()
+Posts and events flagged ``set_banner`` are merged into one list ordered by
+``banner_order`` (then model, id), with image and detail URLs resolved once
+when the index is built. The index lives in the Django cache together with an
+ETag and is dropped whenever a banner-relevant field of a Post or Event
+changes; writers that bypass signals (``bulk_update``) call
+``invalidate_banner_index`` themselves.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+
+CACHE_KEY = "banners:index"
+BANNER_FIELDS = ("title", "cover_image", "set_banner", "banner_order", "is_active")
+
+
+def _banner_models():
+    from events.models import Event
+    from posts.models import Post
+    return (Post, Event)
+
+
+def _variant_url(storage, row, variant):
+    variants = row["cover_image_variants"] or {}
+    if not row["cover_image"] or variants.get("source") != row["cover_image"]:
+        return None
+    name = (variants.get(variant) or {}).get("webp")
+    return storage.url(name) if name else None
+
+
+def build_banner_index():
+    """Build the ordered banner index from the database (one query per model)"""
+    items = []
+    for model in _banner_models():
+        storage = model._meta.get_field("cover_image").storage
+        rows = model.objects.filter(set_banner=True).values("id", "cover_image_variants", *BANNER_FIELDS)
+        for row in rows:
+            cover = storage.url(row["cover_image"]) if row["cover_image"] else None
+            items.append({
+                "id": row["id"],
+                "model_name": model.__name__,
+                "title": row["title"],
+                "cover_image": cover,
+                # Resized copies once the derivatives job has run (core.utils.images)
+                "image": _variant_url(storage, row, "large") or cover,
+                "thumbnail": _variant_url(storage, row, "thumb") or cover,
+                "set_banner": row["set_banner"],
+                "banner_order": row["banner_order"],
+                "is_active": row["is_active"],
+                "detail_url": reverse("article_details", args=[str(row["id"])]),
             })
+    items.sort(key=lambda item: (item["banner_order"], item["model_name"], item["id"]))
+    etag = hashlib.sha1(json.dumps(items, sort_keys=True).encode()).hexdigest()
+    return {"etag": f'"{etag}"', "items": items}
+
+
+def get_banner_index():
+    """Cached ``{"etag": ..., "items": [...]}``; rebuilt on first use after an invalidation"""
+    index = cache.get(CACHE_KEY)
+    if index is None:
+        index = build_banner_index()
+        cache.set(CACHE_KEY, index, timeout=getattr(settings, "BANNER_INDEX_CACHE_TIMEOUT", 3600))
+    return index
+
+
+def invalidate_banner_index():
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def get_menu_items():
+    """Active banners for the public slideshow, in global banner order"""
+    return [
+        {
+            "title": item["title"],
+            "model_name": item["model_name"],
+            "image": item["image"],
+            "thumbnail": item["thumbnail"],
+            "url": item["detail_url"],
+        }
+        for item in get_banner_index()["items"]
+        if item["is_active"]
+    ]
+
+
+def _banner_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        if instance.set_banner:
+            invalidate_banner_index()
+        return
+    fields = BANNER_FIELDS if update_fields is None else set(BANNER_FIELDS) & set(update_fields)
+    if any(instance.has_changed(field) for field in fields):
+        invalidate_banner_index()
+
+
+def _banner_deleted(sender, instance, **kwargs):
+    if instance.set_banner:
+        invalidate_banner_index()
+
 
-    return menu_items
+for _model in ("posts.Post", "events.Event"):
+    post_save.connect(_banner_saved, sender=_model, dispatch_uid=f"banner_index_save_{_model}")
+    post_delete.connect(_banner_deleted, sender=_model, dispatch_uid=f"banner_index_delete_{_model}")
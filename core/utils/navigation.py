@@ -0,0 +1,95 @@
+"""
+Site navigation tree shared by every public page and the navigation API.
+
+The tree (event categories with their subcategories, post categories and
+association menu posts) is built with three queries and kept in the Django
+cache, so rendering a page costs no navigation queries. Saves and deletes of
+the menu models drop the cached tree after the transaction commits; with a
+per-process cache (LocMemCache) other processes pick up changes after
+NAVIGATION_CACHE_TIMEOUT seconds.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+from django.urls import NoReverseMatch, reverse
+
+CACHE_KEY = "navigation:tree"
+MENU_MODELS = (
+    "events.EventCategory",
+    "events.EventSubCategory",
+    "posts.PostCategory",
+    "association.AssociationPosts",
+)
+
+
+def _url(name, slug):
+    if not slug:
+        return None
+    try:
+        return reverse(name, args=[slug])
+    except NoReverseMatch:
+        return None
+
+
+def build_navigation():
+    """Build the navigation tree from the database (plain dicts, safe to cache and serialize)"""
+    from association.models import AssociationPosts
+    from events.models import EventCategory, EventSubCategory
+    from posts.models import PostCategory
+
+    subcategories = EventSubCategory.objects.filter(is_active=True, is_menu=True).order_by("title")
+    categories = (
+        EventCategory.objects.filter(is_active=True)
+        .order_by("title")
+        .only("id", "title", "title_others")
+        .prefetch_related(Prefetch("event_sub_category", queryset=subcategories.only(
+            "id", "title", "title_others", "event_category_id"
+        )))
+    )
+    return {
+        "event_categories": [
+            {
+                "id": category.id,
+                "title": category.title,
+                "title_others": category.title_others,
+                "url": _url("event_details", category.title_others),
+                "subcategories": [
+                    {"id": sub.id, "title": sub.title, "title_others": sub.title_others}
+                    for sub in category.event_sub_category.all()
+                ],
+            }
+            for category in categories
+        ],
+        "post_categories": list(
+            PostCategory.objects.filter(is_active=True, is_menu=True)
+            .order_by("title")
+            .values("id", "title", "title_others")
+        ),
+        "association_posts": [
+            {**post, "url": _url("association_post_details", post["title_others"])}
+            for post in AssociationPosts.objects.filter(is_active=True, is_menu=True)
+            .order_by("id")
+            .values("id", "title", "title_others")
+        ],
+    }
+
+
+def get_navigation():
+    """Cached navigation tree; rebuilt on first use after an invalidation"""
+    tree = cache.get(CACHE_KEY)
+    if tree is None:
+        tree = build_navigation()
+        cache.set(CACHE_KEY, tree, timeout=getattr(settings, "NAVIGATION_CACHE_TIMEOUT", 3600))
+    return tree
+
+
+def invalidate_navigation(**kwargs):
+    # After commit, so a concurrent render can't re-cache the pre-change tree
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+for _model in MENU_MODELS:
+    post_save.connect(invalidate_navigation, sender=_model, dispatch_uid=f"navigation_save_{_model}")
+    post_delete.connect(invalidate_navigation, sender=_model, dispatch_uid=f"navigation_delete_{_model}")
@@ -1,3 +1,15 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework import filters
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError as APIValidationError
 from rest_framework.pagination import PageNumberPagination
 from core.utils.responses import ok
 
@@ -30,3 +42,219 @@ class StandardResultsSetPagination(PageNumberPagination):
             message="Data retrieved successfully"
         )
 
+
+
+class CursorResultsSetPagination(StandardResultsSetPagination):
+    """
+    Keyset pagination on ``(created_at, id)`` for high-volume lists.
+    Usage: pagination_class = CursorResultsSetPagination
+
+    Pages are fetched with ``created_at <= X AND (created_at < X OR id < Y)``,
+    which seeks an index on (created_at, id) instead of counting and
+    skipping rows, so page 1000 costs the same as page 1. The response uses
+    the standard envelope; ``pagination`` carries ``next_cursor`` /
+    ``previous_cursor`` (pass back as ``?cursor=``) and ``total_count`` only
+    when asked for with ``?include_count=true``.
+
+    Keyset mode is opt-in: pass ``?cursor=`` (empty for the first page).
+    Other requests keep the page-number behaviour and response of
+    StandardResultsSetPagination. Views may set ``cursor_ordering``
+    (default newest first); rows without ``created_at`` come last. On views
+    with an OrderingFilter, a single ``?ordering=`` field replaces the key
+    (the id tie-breaker follows its direction); several fields are rejected.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.use_cursor = self.cursor_query_param in params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.per_page = self.get_page_size(request)
+        (key, key_desc), (tie, tie_desc) = [
+            (name.lstrip('-'), name.startswith('-'))
+            for name in self.get_cursor_ordering(request, queryset, view)
+        ]
+        self.fields = (key, tie)
+        self.key_term = f"{'-' if key_desc else ''}{key}"
+        reverse, position = self.decode_cursor(request, queryset.model)
+
+        self.total_count = None
+        if params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.total_count = queryset.order_by().count()
+
+        rows = []
+        for segment in self._segments(queryset, key, key_desc, tie, tie_desc, reverse, position):
+            rows += list(segment[:self.per_page + 1 - len(rows)])
+            if len(rows) > self.per_page:
+                break
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.next_cursor = self.encode_cursor(False, rows[-1]) if self.has_next and rows else None
+        self.previous_cursor = self.encode_cursor(True, rows[0]) if self.has_previous and rows else None
+        return rows
+
+    def get_cursor_ordering(self, request, queryset, view):
+        """(key, tie) ordering terms: the requested ``?ordering=`` if any, else the view's or the default"""
+        default = tuple(getattr(view, 'cursor_ordering', self.ordering))
+        backend = next(
+            (backend() for backend in getattr(view, 'filter_backends', ())
+             if issubclass(backend, filters.OrderingFilter)),
+            None,
+        )
+        param = request.query_params.get(backend.ordering_param, '') if backend else ''
+        requested = [term.strip() for term in param.split(',') if term.strip()]
+        terms = backend.remove_invalid_fields(queryset, requested, view, request) if requested else []
+        if not terms:
+            return default
+        if len(terms) > 1:
+            raise APIValidationError({backend.ordering_param: 'Cursor pagination orders by a single field.'})
+        tie = default[1].lstrip('-')
+        return terms[0], f'-{tie}' if terms[0].startswith('-') else tie
+
+    def _segments(self, queryset, key, key_desc, tie, tie_desc, reverse, position):
+        """
+        Querysets to read in turn for the page after ``position`` (before it
+        when ``reverse``): rows with a ``key`` value, then rows without one,
+        which sort last.
+        """
+        def ordered(qs, by_key):
+            terms = [(key, key_desc)] if by_key else []
+            terms.append((tie, tie_desc))
+            return qs.order_by(*[
+                F(name).asc() if desc == reverse else F(name).desc()
+                for name, desc in terms
+            ])
+
+        def after(name, desc, value, inclusive=False):
+            lookup = 'gt' if desc == reverse else 'lt'
+            return Q(**{f'{name}__{lookup}{"e" if inclusive else ""}': value})
+
+        with_key = ordered(queryset.filter(**{f'{key}__isnull': False}), True)
+        if queryset.model._meta.get_field(key).null:
+            without_key = ordered(queryset.filter(**{f'{key}__isnull': True}), False)
+        else:
+            without_key = queryset.none()
+
+        if position is None:
+            return [without_key, with_key] if reverse else [with_key, without_key]
+        if position[0] is None:
+            rest = without_key.filter(after(tie, tie_desc, position[1]))
+            return [rest, with_key] if reverse else [rest]
+        value, tie_value = position
+        rest = with_key.filter(
+            after(key, key_desc, value, inclusive=True),
+            after(key, key_desc, value) | after(tie, tie_desc, tie_value),
+        )
+        return [rest] if reverse else [rest, without_key]
+
+    def encode_cursor(self, reverse, obj):
+        # isoformat() keeps microseconds (DjangoJSONEncoder would round datetimes to milliseconds)
+        values = [getattr(obj, name) for name in self.fields]
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        payload = json.dumps({'r': int(reverse), 'k': self.key_term, 'p': values}, cls=DjangoJSONEncoder,
+                             separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """(reverse, position) from ?cursor=, or (False, None) for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            if payload.get('k', self.key_term) != self.key_term:
+                # Issued for a different ?ordering= field
+                raise ValueError
+            key_value, tie_value = payload['p']
+            position = (
+                None if key_value is None else model._meta.get_field(self.fields[0]).to_python(key_value),
+                model._meta.get_field(self.fields[1]).to_python(tie_value),
+            )
+            return bool(payload['r']), position
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Keyset mode: empty for the first page, then next_cursor / previous_cursor',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to true to include total_count in keyset mode',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return ok(
+            data={
+                'results': data,
+                'pagination': {
+                    'per_page': self.per_page,
+                    'total_count': self.total_count,
+                    'has_next': self.has_next,
+                    'has_previous': self.has_previous,
+                    'next_cursor': self.next_cursor,
+                    'previous_cursor': self.previous_cursor,
+                },
+            },
+            message="Data retrieved successfully"
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Django paginator taking its total from the cache under ``cache_key`` (when given)"""
+
+    def __init__(self, object_list, per_page, cache_key=None, timeout=300, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        if not self.cache_key:
+            return super().count
+        total = cache.get(self.cache_key)
+        if total is None:
+            total = super().count
+            cache.set(self.cache_key, total, timeout=self.timeout)
+        return total
+
+
+class CachedCountPagination(StandardResultsSetPagination):
+    """
+    Page-number pagination whose total count is cached when the view offers
+    a key: ``view.get_count_cache_key()`` returns a key (e.g. for unfiltered
+    listings) or None to count as usual. The view owns invalidation;
+    ``view.count_cache_timeout`` sets the lifetime.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_cache_key = view.get_count_cache_key() if hasattr(view, 'get_count_cache_key') else None
+        self.count_cache_timeout = getattr(view, 'count_cache_timeout', 300)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        # Called by PageNumberPagination in place of the paginator class
+        return CachedCountPaginator(object_list, per_page, cache_key=self.count_cache_key,
+                                    timeout=self.count_cache_timeout)
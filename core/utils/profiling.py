@@ -0,0 +1,240 @@
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.conf import settings
+
+# Context-local rather than thread-local: under ASGI many requests share the event loop thread
+_local = Local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised (when QUERY_BUDGET_RAISE is on, e.g. under the test runner) for over-budget requests"""
+
+
+class RequestProfile:
+    """SQL count/time and per-phase timings collected for a single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.timings = {}
+        self._handler_started = None
+        self._handler_sql_time = 0.0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - started
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def start_handler(self):
+        self._handler_started = time.perf_counter()
+        self._handler_sql_time = self.sql_time
+
+    def stop_handler(self):
+        """Record Python time spent in the view handler outside SQL (mostly serialization)"""
+        if self._handler_started is None:
+            return
+        elapsed = time.perf_counter() - self._handler_started
+        sql = self.sql_time - self._handler_sql_time
+        self.timings["serialize"] = max(elapsed - sql, 0.0)
+        self._handler_started = None
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value (durations in ms)"""
+        parts = [f'sql;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries"']
+        for name in ("serialize", "render"):
+            if name in self.timings:
+                parts.append(f"{name};dur={self.timings[name] * 1000:.1f}")
+        parts.append(f"total;dur={self.total_time * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def profiling_enabled():
+    return getattr(settings, "QUERY_PROFILING", True)
+
+
+def sample_rate():
+    return getattr(settings, "QUERY_PROFILING_SAMPLE_RATE", 1.0)
+
+
+def should_profile():
+    """Whether to profile this request: QUERY_PROFILING on and the request sampled"""
+    if not profiling_enabled():
+        return False
+    rate = sample_rate()
+    return rate >= 1 or random.random() < rate
+
+
+def start_profile():
+    _local.profile = RequestProfile()
+    return _local.profile
+
+
+def current_profile():
+    return getattr(_local, "profile", None)
+
+
+def end_profile():
+    _local.profile = None
+
+
+class ProfilingStats:
+    """Rolling in-process window of request profiles, grouped by endpoint."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._violations = defaultdict(int)
+
+    def record(self, endpoint, profile, budget=None):
+        sample = {
+            "sql_count": profile.sql_count,
+            "sql_ms": profile.sql_time * 1000,
+            "serialize_ms": profile.timings.get("serialize", 0.0) * 1000,
+            "render_ms": profile.timings.get("render", 0.0) * 1000,
+            "total_ms": profile.total_time * 1000,
+        }
+        with self._lock:
+            self._samples[endpoint].append(sample)
+            if budget is not None and profile.sql_count > budget:
+                self._violations[endpoint] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._violations.clear()
+
+    def summary(self):
+        with self._lock:
+            snapshot = {endpoint: list(samples) for endpoint, samples in self._samples.items()}
+            violations = dict(self._violations)
+
+        rows = []
+        for endpoint, samples in snapshot.items():
+            if not samples:
+                continue
+            counts = sorted(s["sql_count"] for s in samples)
+            totals = sorted(s["total_ms"] for s in samples)
+            n = len(samples)
+            rows.append({
+                "endpoint": endpoint,
+                "requests": n,
+                "sql_count_avg": round(sum(counts) / n, 1),
+                "sql_count_max": counts[-1],
+                "sql_ms_avg": round(sum(s["sql_ms"] for s in samples) / n, 2),
+                "serialize_ms_avg": round(sum(s["serialize_ms"] for s in samples) / n, 2),
+                "render_ms_avg": round(sum(s["render_ms"] for s in samples) / n, 2),
+                "total_ms_avg": round(sum(totals) / n, 2),
+                "total_ms_p95": round(totals[min(n - 1, int(n * 0.95))], 2),
+                "budget_violations": violations.get(endpoint, 0),
+            })
+        rows.sort(key=lambda row: row["sql_count_avg"], reverse=True)
+        return rows
+
+
+stats = ProfilingStats(window=getattr(settings, "QUERY_PROFILING_WINDOW", 200))
+
+
+class Counters:
+    """Named in-process counters (e.g. provider calls made vs saved)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = defaultdict(int)
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._values[name] += amount
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(sorted(self._values.items()))
+
+
+counters = Counters()
+
+
+def resolve_query_budget(request):
+    """
+    Read the query budget declared on the resolved view:
+    ``query_budget = 5`` on a view class / function, or
+    ``query_budgets = {"list": 5}`` per ViewSet action.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    func = match.func
+    view_class = getattr(func, "cls", None)
+    actions = getattr(func, "actions", None) or {}
+    action = actions.get(request.method.lower())
+
+    for holder in (func, view_class):
+        if holder is None:
+            continue
+        budgets = getattr(holder, "query_budgets", None) or {}
+        if action and action in budgets:
+            return budgets[action]
+        budget = getattr(holder, "query_budget", None)
+        if budget is not None:
+            return budget
+    return None
+
+
+def query_budget(limit):
+    """Decorator declaring a query budget on a function-based view"""
+    def decorator(view_func):
+        view_func.query_budget = limit
+        return view_func
+    return decorator
+
+
+class ProfiledViewMixin:
+    """
+    DRF view mixin splitting the request profile into handler (serialize) and
+    render time. Budgets are declared with ``query_budget`` / ``query_budgets``
+    and enforced by ``core.middleware.QueryProfilingMiddleware``.
+    """
+    query_budget = None
+    query_budgets = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        profile = current_profile()
+        if profile:
+            profile.start_handler()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        profile = current_profile()
+        if profile:
+            profile.stop_handler()
+            if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                with profile.timed("render"):
+                    response.render()
+        return response
@@ -0,0 +1,321 @@
+"""
+Full-text search over posts, events and association posts.
+
+Each content row has a ``core.SearchDocument`` holding its title and
+HTML-stripped text (Quill markup removed), kept current by the receivers at
+the bottom of this module. The backend named by SEARCH_BACKEND answers
+queries; by default that is SQLite FTS5 (the ``search_index`` table created
+by core migration 0004, ranked with bm25 and highlighted with snippet()), and
+a LIKE-based fallback on other databases. A backend implements ``search``
+(ranked, paginated hits with snippets) and ``matching_ids`` (an expression
+usable in ``pk__in`` for the list filters).
+
+Rows changed with ``update()``/``bulk_create`` send no signals; run
+``manage.py rebuild_search_index`` after such imports.
+"""
+import html
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+MARK_START, MARK_END = "\x02", "\x03"
+MAX_TERMS = 12
+SNIPPET_TOKENS = 24
+
+
+def strip_html(*values):
+    """Plain text of one or more HTML fragments, entities decoded and whitespace collapsed"""
+    text = " ".join(strip_tags(value) for value in values if value)
+    return re.sub(r"\s+", " ", html.unescape(text)).strip()
+
+
+def query_terms(query):
+    return re.findall(r"\w+", query or "")[:MAX_TERMS]
+
+
+def highlight(text):
+    """HTML-escape ``text`` and turn the backend's match markers into <mark> tags"""
+    return html.escape(text or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def _url(name, *args):
+    if not all(args):
+        return ""
+    try:
+        return reverse(name, args=[str(arg) for arg in args])
+    except NoReverseMatch:
+        return ""
+
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+
+def _post_document(post):
+    return {
+        "title": post.title,
+        "body": strip_html(post.short_description, post.description),
+        "url": _url("article_details", post.pk),
+        "is_public": post.is_active and post.is_published,
+    }
+
+
+def _event_document(event):
+    return {
+        "title": event.title,
+        "body": strip_html(event.short_description, event.description, event.location),
+        "url": _url("event_details", event.category.title_others if event.category_id else None),
+        "is_public": event.is_active and event.is_published,
+    }
+
+
+def _association_document(post):
+    return {
+        "title": post.title,
+        "body": strip_html(post.content),
+        "url": _url("association_post_details", post.title_others),
+        "is_public": post.is_active,
+    }
+
+
+# model label -> (doc_type, fields whose change re-indexes the row, document builder)
+SOURCES = {
+    "posts.Post": ("post", {"title", "short_description", "description", "is_active", "is_published"},
+                   _post_document),
+    "events.Event": ("event", {"title", "short_description", "description", "location", "category", "is_active",
+                               "is_published"}, _event_document),
+    "association.AssociationPosts": ("association", {"title", "title_others", "content", "is_active"},
+                                     _association_document),
+}
+DOC_TYPES = [doc_type for doc_type, _, _ in SOURCES.values()]
+
+
+def index_instance(instance):
+    from core.models import SearchDocument
+
+    doc_type, _, build = SOURCES[instance._meta.label]
+    SearchDocument.objects.update_or_create(
+        doc_type=doc_type,
+        object_id=instance.pk,
+        defaults={**build(instance), "modified_at": instance.modified_at},
+    )
+
+
+def remove_instance(instance):
+    from core.models import SearchDocument
+
+    doc_type = SOURCES[instance._meta.label][0]
+    SearchDocument.objects.filter(doc_type=doc_type, object_id=instance.pk).delete()
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class BaseSearchBackend:
+    def search(self, query, doc_types=None, public_only=True, limit=10, offset=0):
+        """(total, hits); each hit has doc_type, object_id, title, url, snippet (safe HTML), score"""
+        raise NotImplementedError
+
+    def matching_ids(self, query, doc_type):
+        """Expression for ``queryset.filter(pk__in=...)`` selecting the ``doc_type`` rows matching ``query``"""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Rebuild backend structures from the SearchDocument rows"""
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """FTS5 MATCH over ``search_index``; bm25 ranking with the title weighted over the body"""
+    TITLE_WEIGHT = 10.0
+
+    @staticmethod
+    def to_match(query):
+        # Every term quoted (no FTS syntax from user input), all required, the last one as a prefix
+        terms = ['"%s"' % term for term in query_terms(query)]
+        if not terms:
+            return None
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def _from(self, match, doc_types, public_only):
+        from core.models import SearchDocument
+
+        sql = (
+            f"FROM search_index JOIN {SearchDocument._meta.db_table} d ON d.id = search_index.rowid "
+            "WHERE search_index MATCH %s"
+        )
+        params = [match]
+        if public_only:
+            sql += " AND d.is_public"
+        if doc_types:
+            sql += " AND d.doc_type IN (%s)" % ", ".join(["%s"] * len(doc_types))
+            params += list(doc_types)
+        return sql, params
+
+    def search(self, query, doc_types=None, public_only=True, limit=10, offset=0):
+        match = self.to_match(query)
+        if match is None:
+            return 0, []
+        from_sql, params = self._from(match, doc_types, public_only)
+        rank = f"bm25(search_index, {self.TITLE_WEIGHT}, 1.0)"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) {from_sql}", params)
+            total = cursor.fetchone()[0]
+            if not total or offset >= total:
+                return total, []
+            cursor.execute(
+                f"SELECT d.doc_type, d.object_id, d.url, "
+                f"highlight(search_index, 0, %s, %s), "
+                f"snippet(search_index, 1, %s, %s, '…', {SNIPPET_TOKENS}), {rank} "
+                f"{from_sql} ORDER BY {rank} LIMIT %s OFFSET %s",
+                [MARK_START, MARK_END, MARK_START, MARK_END, *params, limit, offset],
+            )
+            rows = cursor.fetchall()
+        return total, [
+            {
+                "doc_type": doc_type,
+                "object_id": object_id,
+                "title": highlight(title),
+                "url": url,
+                "snippet": highlight(snippet),
+                # bm25 is lower-is-better; flip it so higher means more relevant
+                "score": round(-score, 6),
+            }
+            for doc_type, object_id, url, title, snippet, score in rows
+        ]
+
+    def matching_ids(self, query, doc_type):
+        from core.models import SearchDocument
+
+        match = self.to_match(query)
+        if match is None:
+            return SearchDocument.objects.none().values("object_id")
+        return RawSQL(
+            f"SELECT d.object_id FROM search_index JOIN {SearchDocument._meta.db_table} d "
+            "ON d.id = search_index.rowid WHERE search_index MATCH %s AND d.doc_type = %s",
+            (match, doc_type),
+        )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO search_index(search_index) VALUES ('rebuild')")
+            cursor.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """
+    Fallback for databases without an FTS backend: every term must appear in
+    the stripped title or body (LIKE), title matches rank first. Correct but
+    not index-backed.
+    """
+    SNIPPET_CHARS = 160
+
+    def _filter(self, query, doc_types=None, public_only=True):
+        from core.models import SearchDocument
+
+        terms = query_terms(query)
+        if not terms:
+            return None, terms
+        qs = SearchDocument.objects.all()
+        for term in terms:
+            qs = qs.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        if public_only:
+            qs = qs.filter(is_public=True)
+        if doc_types:
+            qs = qs.filter(doc_type__in=doc_types)
+        return qs, terms
+
+    def _mark(self, text, terms):
+        pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+        return pattern.sub(lambda m: MARK_START + m.group(0) + MARK_END, text)
+
+    def _snippet(self, body, terms):
+        lowered = body.lower()
+        positions = [lowered.find(term.lower()) for term in terms if term.lower() in lowered]
+        start = max(min(positions) - self.SNIPPET_CHARS // 4, 0) if positions else 0
+        text = body[start:start + self.SNIPPET_CHARS]
+        return ("…" if start else "") + text + ("…" if start + self.SNIPPET_CHARS < len(body) else "")
+
+    def search(self, query, doc_types=None, public_only=True, limit=10, offset=0):
+        qs, terms = self._filter(query, doc_types, public_only)
+        if qs is None:
+            return 0, []
+        total = qs.count()
+        title_match = Q()
+        for term in terms:
+            title_match &= Q(title__icontains=term)
+        rows = qs.annotate(
+            in_title=ExpressionWrapper(title_match, output_field=BooleanField())
+        ).order_by("-in_title", "-modified_at")[offset:offset + limit]
+        return total, [
+            {
+                "doc_type": doc.doc_type,
+                "object_id": doc.object_id,
+                "title": highlight(self._mark(doc.title, terms)),
+                "url": doc.url,
+                "snippet": highlight(self._mark(self._snippet(doc.body, terms), terms)),
+                "score": None,
+            }
+            for doc in rows
+        ]
+
+    def matching_ids(self, query, doc_type):
+        from core.models import SearchDocument
+
+        qs, _ = self._filter(query, [doc_type], public_only=False)
+        return (qs if qs is not None else SearchDocument.objects.none()).values("object_id")
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """The SEARCH_BACKEND instance; FTS5 on SQLite, the LIKE fallback elsewhere when unset"""
+    path = getattr(settings, "SEARCH_BACKEND", "")
+    if path:
+        return import_string(path)()
+    return SQLiteFTS5Backend() if connection.vendor == "sqlite" else BasicSearchBackend()
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` through the search index for views that set ``search_doc_type``;
+    other views keep the plain ``search_fields`` behaviour.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        doc_type = getattr(view, "search_doc_type", None)
+        query = request.query_params.get(self.search_param, "").strip()
+        if not doc_type or not query:
+            return super().filter_queryset(request, queryset, view)
+        return queryset.filter(pk__in=get_backend().matching_ids(query, doc_type))
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------------
+
+def _content_saved(sender, instance, created, update_fields=None, **kwargs):
+    fields = SOURCES[sender._meta.label][1]
+    if update_fields is not None and not fields.intersection(update_fields):
+        return
+    if not created and not any(instance.has_changed(field) for field in fields):
+        return
+    index_instance(instance)
+
+
+def _content_deleted(sender, instance, **kwargs):
+    remove_instance(instance)
+
+
+for _label in SOURCES:
+    post_save.connect(_content_saved, sender=_label, dispatch_uid=f"search_index_save_{_label}")
+    post_delete.connect(_content_deleted, sender=_label, dispatch_uid=f"search_index_delete_{_label}")
@@ -0,0 +1,99 @@
+"""
+Process-level cache of the ``core.Status`` table.
+
+Statuses are loaded once (one query) and served from memory by code, id,
+label or parent. Saves/deletes through the ORM invalidate the cache in this
+process; other processes reload after STATUS_REGISTRY_TTL seconds, or at once
+when a lookup misses. Cached instances are shared: treat them as read-only.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from core.models import Status
+
+
+class StatusRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._loaded_at = 0.0
+
+    def invalidate(self, **kwargs):
+        self._data = None
+
+    def _snapshot(self):
+        data = self._data
+        ttl = getattr(settings, "STATUS_REGISTRY_TTL", 300)
+        if data is not None and time.monotonic() - self._loaded_at < ttl:
+            return data
+        with self._lock:
+            if self._data is None or time.monotonic() - self._loaded_at >= ttl:
+                statuses = list(Status.objects.order_by("id"))
+                by_parent = {}
+                for status in statuses:
+                    by_parent.setdefault(status.parent_code, []).append(status)
+                self._data = {
+                    "by_code": {status.status_code: status for status in statuses},
+                    "by_id": {status.pk: status for status in statuses},
+                    "by_parent": by_parent,
+                }
+                self._loaded_at = time.monotonic()
+            return self._data
+
+    def _lookup(self, index, key, description):
+        status = self._snapshot()[index].get(key)
+        if status is None:
+            # Possibly created by another process since the last load
+            self.invalidate()
+            status = self._snapshot()[index].get(key)
+        if status is None:
+            raise Status.DoesNotExist(f"Status with {description} does not exist")
+        return status
+
+    def get(self, code):
+        """Status by code; raises Status.DoesNotExist like ``Status.objects.get``"""
+        return self._lookup("by_code", str(code), f"status_code={code!r}")
+
+    def get_by_id(self, pk):
+        try:
+            key = int(pk)
+        except (TypeError, ValueError):
+            raise Status.DoesNotExist(f"Status with id={pk!r} does not exist") from None
+        return self._lookup("by_id", key, f"id={pk!r}")
+
+    def code_for_id(self, pk):
+        """
+        status_code for a Status id (e.g. ``membership.workflow_status_id``) without a query.
+        None only for a None id; an id that is not in the table raises Status.DoesNotExist.
+        """
+        if pk is None:
+            return None
+        return self.get_by_id(pk).status_code
+
+    def find(self, labels):
+        """First status (by id) whose internal or external label is in ``labels``"""
+        labels = set(labels)
+        for status in self._snapshot()["by_id"].values():
+            if status.internal_status in labels or status.external_status in labels:
+                return status
+        return None
+
+    def children(self, parent_code):
+        return list(self._snapshot()["by_parent"].get(parent_code, ()))
+
+    def ensure(self, code, **defaults):
+        """Cached status for ``code``, creating it with ``defaults`` if it does not exist yet"""
+        try:
+            return self.get(code)
+        except Status.DoesNotExist:
+            status, _ = Status.objects.get_or_create(status_code=str(code), defaults=defaults)
+            return status
+
+
+registry = StatusRegistry()
+
+post_save.connect(registry.invalidate, sender=Status, dispatch_uid="status_registry_save")
+post_delete.connect(registry.invalidate, sender=Status, dispatch_uid="status_registry_delete")
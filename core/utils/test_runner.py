@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """Test runner that turns declared query-budget overruns into test failures."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # Profile every request whatever the environment configures
+        settings.QUERY_PROFILING = True
+        settings.QUERY_PROFILING_SAMPLE_RATE = 1.0
+        settings.QUERY_BUDGET_RAISE = True
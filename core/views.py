@@ -1,3 +1,22 @@
-from django.shortcuts import render
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from core.models import MediaModel
+from core.utils.download_counts import record_download
+from core.utils.media_delivery import serve_file
+
+
+@require_GET
+def media_file(request, pk):
+    """Serve a MediaModel file with Range/conditional support; downloads are counted in batches"""
+    media = get_object_or_404(MediaModel.objects.only("id", "file", "file_name"), pk=pk, is_active=True)
+    if not media.file:
+        raise Http404("No file")
+    return serve_file(
+        request,
+        media.file,
+        download_name=media.file_name or None,
+        as_attachment=request.GET.get("download") == "1",
+        on_download=lambda: record_download(media),
+    )
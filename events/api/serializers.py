@@ -1,7 +1,15 @@
+import re
 from datetime import timedelta
 
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from ..models import EventCategory, EventSubCategory, Event, EventMediaInfo, EventMedia
+from ..models import (
+    EventCategory, EventSubCategory, Event, EventMediaInfo, EventMedia, EventMediaUpload, EventMediaUploadFile
+)
+from core.utils.images import ImageVariantsField, queue_derivatives
+
+from ..uploads import max_chunk_size
 
 
 class EventCategorySerializer(serializers.ModelSerializer):
@@ -48,17 +56,18 @@ class EventSubCategoryListSerializer(EventSubCategorySerializer):
 class EventSerializer(serializers.ModelSerializer):
     category_title = serializers.CharField(source='category.title', read_only=True)
     published_by_email = serializers.CharField(source='published_by.email', read_only=True)
+    cover_image_variants = ImageVariantsField(image_field='cover_image')
 
     class Meta:
         model = Event
         fields = [
             'id', 'title', 'title_others', 'short_description', 'description', 'location',
-            'category', 'category_title', 'cover_image', 'event_dates', 'from_time', 'to_time', 'need_registration',
+            'category', 'category_title', 'cover_image', 'cover_image_variants', 'event_dates', 'from_time', 'to_time', 'need_registration',
             'is_short_course', 'max_seat',
             'is_published', 'published_at', 'created_at', 'is_active', 'published_by_email',
-            'set_banner', 'banner_order'
+            'set_banner', 'banner_order', 'first_event_date', 'last_event_date'
         ]
-        read_only_fields = ['id', 'category_title', 'published_by_email', 'created_at']
+        read_only_fields = ['id', 'category_title', 'published_by_email', 'created_at', 'first_event_date', 'last_event_date']
 
     def update(self, instance, validated_data):
         for attr, value in validated_data.items():
@@ -111,7 +120,33 @@ class EventSerializer(serializers.ModelSerializer):
 
 class EventListSerializer(EventSerializer):
     class Meta(EventSerializer.Meta):
-        fields = ['id', 'title', 'title_others', 'category_title', 'is_published', 'published_at', 'created_at', 'is_active']
+        fields = ['id', 'title', 'title_others', 'category_title', 'is_published', 'published_at', 'created_at', 'is_active',
+                  'first_event_date', 'last_event_date']
+
+class CalendarOccurrenceSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    event_id = serializers.IntegerField()
+    title = serializers.CharField(source='event.title')
+    title_others = serializers.CharField(source='event.title_others')
+    category = serializers.IntegerField(source='event.category_id', allow_null=True)
+    category_title = serializers.CharField(source='event.category.title', default=None)
+    location = serializers.CharField(source='event.location')
+    from_time = serializers.TimeField(source='event.from_time', allow_null=True)
+    to_time = serializers.TimeField(source='event.to_time', allow_null=True)
+
+
+class CalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(input_formats=['%Y-%m-%d'])
+    end = serializers.DateField(input_formats=['%Y-%m-%d'])
+    category = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if data['end'] < data['start']:
+            raise serializers.ValidationError("end must not be before start.")
+        if (data['end'] - data['start']).days > 366:
+            raise serializers.ValidationError("The range may span at most 366 days.")
+        return data
+
 
 class EventMediaInfoSerializer(serializers.ModelSerializer):
     event_title = serializers.CharField(source='event.title', read_only=True)
@@ -127,6 +162,7 @@ class EventMediaInfoSerializer(serializers.ModelSerializer):
 class EventMediaSerializer(serializers.ModelSerializer):
     event_title = serializers.CharField(source='media_info.event.title', read_only=True)
     subcategory_title = serializers.CharField(source='media_info.sub_category.title', read_only=True)
+    media_file_variants = ImageVariantsField(image_field='media_file')
 
     class Meta:
         model = EventMedia
@@ -142,6 +178,7 @@ class EventMediaSerializer(serializers.ModelSerializer):
             'file_type',
             'media_date',
             'media_file',
+            'media_file_variants',
             'embed_url',
             'downloaded_count',
             'created_at',
@@ -216,9 +253,60 @@ class EventMediaUploadSerializer(serializers.Serializer):
 
         # Step 3: bulk insert
         EventMedia.objects.bulk_create(media_objs)
+        queue_derivatives(media_objs, "media_file")
 
         return {
             'media_info_id': media_info.id,
             'created_count': len(media_objs),
             'media_info_created': created
         }
+
+
+class EventMediaUploadFileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EventMediaUploadFile
+        fields = ['index', 'filename', 'size', 'checksum', 'received', 'received_ranges']
+        read_only_fields = ['index', 'received', 'received_ranges']
+        extra_kwargs = {'size': {'min_value': 1}}
+
+    def validate_filename(self, value):
+        # Checked now rather than when the file is stored on completion
+        try:
+            return get_valid_filename(value)
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError("Invalid filename.")
+
+    def validate_checksum(self, value):
+        if value and not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError("Checksum must be a SHA-256 hex digest.")
+        return value.lower()
+
+
+class ChunkedMediaUploadSerializer(serializers.ModelSerializer):
+    """Initiate / describe a chunked media upload session"""
+    files = EventMediaUploadFileSerializer(many=True)
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = EventMediaUpload
+        fields = [
+            'uuid', 'event', 'sub_category', 'media_title', 'media_date', 'media_location',
+            'status', 'chunk_size', 'files', 'created_at', 'completed_at'
+        ]
+        read_only_fields = ['uuid', 'status', 'chunk_size', 'created_at', 'completed_at']
+
+    def get_chunk_size(self, obj):
+        return max_chunk_size()
+
+    def validate_files(self, files):
+        if not files:
+            raise serializers.ValidationError("Provide at least one file.")
+        return files
+
+    def create(self, validated_data):
+        files = validated_data.pop('files')
+        upload = EventMediaUpload.objects.create(**validated_data)
+        EventMediaUploadFile.objects.bulk_create(
+            [EventMediaUploadFile(upload=upload, index=index, **item) for index, item in enumerate(files)]
+        )
+        return upload
@@ -22,7 +22,15 @@ urlpatterns = [
     path('subcategories/<int:pk>/', views.EventSubCategoryRetrieveUpdateDestroyView.as_view(),
          name='sub-category-retrieve-update-destroy'),
 
+    path('calendar/', views.EventCalendarView.as_view(), name='event-calendar'),
     path('event-media-upload/', EventMediaUploadView.as_view(), name='event-media-upload'),
+    path('event-media-uploads/', views.ChunkedMediaUploadView.as_view(), name='event-media-upload-start'),
+    path('event-media-uploads/<uuid:upload_uuid>/', views.ChunkedMediaUploadDetailView.as_view(),
+         name='event-media-upload-detail'),
+    path('event-media-uploads/<uuid:upload_uuid>/files/<int:index>/', views.ChunkedMediaUploadChunkView.as_view(),
+         name='event-media-upload-chunk'),
+    path('event-media-uploads/<uuid:upload_uuid>/complete/', views.ChunkedMediaUploadCompleteView.as_view(),
+         name='event-media-upload-complete'),
     path('event-media-info/', EventMediaInfoView.as_view(), name='event-media-info'),
     path("<int:event_id>/subcategories/", EventSubCategoryByEventView.as_view(), name="event-subcategory-by-event"),
 ]
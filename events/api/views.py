@@ -3,14 +3,25 @@ from rest_framework import status, generics, filters, viewsets
 from rest_framework.generics import ListAPIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
+from rest_framework.permissions import AllowAny, IsAuthenticated, DjangoModelPermissions
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from core.utils import mixins
-from core.utils.pagination import StandardResultsSetPagination
+from core.utils.pagination import CursorResultsSetPagination, StandardResultsSetPagination
 from core.utils.responses import ok, fail
-from ..models import EventCategory, EventSubCategory, Event, EventMedia, EventMediaInfo
+from core.utils.search import FullTextSearchFilter
+from django.shortcuts import get_object_or_404
+
+from ..models import (
+    EventCategory, EventSubCategory, Event, EventMedia, EventMediaInfo, EventMediaUpload, EventOccurrence
+)
+from ..calendar import occurrences_between
+from ..uploads import UploadError, abort_upload, complete_upload, write_chunk
 from .serializers import (
+    CalendarOccurrenceSerializer, CalendarQuerySerializer, ChunkedMediaUploadSerializer,
     EventCategorySerializer,
     EventSubCategorySerializer,
     EventSubCategoryListSerializer, EventListSerializer, EventSerializer, EventMediaUploadSerializer,
@@ -202,14 +213,47 @@ class EventSubCategoryRetrieveUpdateDestroyView(
         tags=["Events"],
         responses={201: EventListSerializer},
         summary="Event CRUD",
-        description="Event CRUD"
+        description="Event CRUD",
+        parameters=[
+            OpenApiParameter(name="filter", type=OpenApiTypes.STR, enum=["all", "upcoming", "completed"],
+                             description="Upcoming: last date today or later; completed: all dates past"),
+            OpenApiParameter(name="date_from", type=OpenApiTypes.DATE,
+                             description="Only events with a date on or after this day (YYYY-MM-DD)"),
+            OpenApiParameter(name="date_to", type=OpenApiTypes.DATE,
+                             description="Only events with a date on or before this day (YYYY-MM-DD)"),
+        ],
     )
 class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all().order_by('-created_at')
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description', 'location']
-    ordering_fields = ['published_at', 'created_at']
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    search_doc_type = 'event'
+    ordering_fields = ['published_at', 'created_at', 'first_event_date', 'last_event_date']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+
+        filter_key = params.get('filter', 'all').lower()
+        today = timezone.localdate()
+        if filter_key == 'upcoming':
+            queryset = queryset.filter(last_event_date__gte=today)
+        elif filter_key == 'completed':
+            queryset = queryset.filter(last_event_date__lt=today)
+
+        # Date range: events with at least one occurrence inside it
+        date_from = parse_date(params.get('date_from') or '')
+        date_to = parse_date(params.get('date_to') or '')
+        if date_from or date_to:
+            occurrences = EventOccurrence.objects.filter(event=OuterRef('pk'))
+            if date_from:
+                occurrences = occurrences.filter(date__gte=date_from)
+            if date_to:
+                occurrences = occurrences.filter(date__lte=date_to)
+            queryset = queryset.filter(Exists(occurrences))
+        return queryset
 
     def get_serializer_class(self):
         return EventListSerializer if self.action == 'list' else EventSerializer
@@ -247,6 +291,38 @@ class EventViewSet(viewsets.ModelViewSet):
             message="Event updated successfully."
         )
 
+@extend_schema(
+    tags=["Events"],
+    summary="Event calendar",
+    description="Occurrences of published events between start and end (inclusive, YYYY-MM-DD, "
+                "at most 366 days), ordered by date and start time. Per-category iCalendar feeds are at "
+                "/events/dhamma_class/<title_others>/calendar.ics.",
+    parameters=[
+        OpenApiParameter(name="start", type=OpenApiTypes.DATE, required=True),
+        OpenApiParameter(name="end", type=OpenApiTypes.DATE, required=True),
+        OpenApiParameter(name="category", type=OpenApiTypes.INT, description="Event category ID"),
+    ],
+    responses={200: CalendarOccurrenceSerializer(many=True)},
+)
+class EventCalendarView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = CalendarQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return fail(error=query.errors, message="Validation error")
+        params = query.validated_data
+        occurrences = occurrences_between(params['start'], params['end'], params.get('category'))
+        return ok(
+            data={
+                'start': query.data['start'],
+                'end': query.data['end'],
+                'occurrences': CalendarOccurrenceSerializer(occurrences, many=True).data,
+            },
+            message="Calendar retrieved successfully"
+        )
+
+
 @extend_schema(
     tags=["Events"],
     summary="Media files for an event",
@@ -260,7 +336,7 @@ class EventMediaInfoView(ListAPIView):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['event__title', 'sub_category__title']
     ordering_fields = ['created_at']
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -348,6 +424,108 @@ class EventMediaUploadView(APIView):
         )
 
 
+def _upload_error(exc):
+    return fail(error=str(exc), message="Upload error", status=exc.status, data={"received": exc.received})
+
+
+def _get_upload(request, upload_uuid, for_update=False):
+    uploads = EventMediaUpload.objects.all()
+    if not request.user.is_staff:
+        uploads = uploads.filter(created_by=request.user)
+    if for_update:
+        uploads = uploads.filter(status=EventMediaUpload.STATUS_UPLOADING)
+    return get_object_or_404(uploads, uuid=upload_uuid)
+
+
+@extend_schema(
+    tags=["Events"],
+    summary="Start a chunked media upload",
+    description="Declare the files (filename, size, optional SHA-256) of a media batch. Then PUT each file's "
+                "bytes to files/<index>/ in chunks of at most chunk_size bytes with a Content-Range header "
+                "(optionally X-Chunk-SHA256), and POST complete/ to create the EventMedia rows. "
+                "GET the session to resume: each file reports the next byte offset it expects (received) "
+                "and the byte ranges stored so far (received_ranges).",
+    request=ChunkedMediaUploadSerializer,
+    responses={201: ChunkedMediaUploadSerializer},
+)
+class ChunkedMediaUploadView(APIView):
+    def post(self, request):
+        serializer = ChunkedMediaUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return fail(error=serializer.errors, message="Validation error")
+        upload = serializer.save(created_by=request.user)
+        return ok(
+            data=ChunkedMediaUploadSerializer(upload).data,
+            message="Upload started.",
+            status=status.HTTP_201_CREATED
+        )
+
+
+@extend_schema(
+    tags=["Events"],
+    summary="Chunked media upload status / abort",
+    responses={200: ChunkedMediaUploadSerializer},
+)
+class ChunkedMediaUploadDetailView(APIView):
+    def get(self, request, upload_uuid):
+        upload = _get_upload(request, upload_uuid)
+        return ok(data=ChunkedMediaUploadSerializer(upload).data, message="")
+
+    def delete(self, request, upload_uuid):
+        upload = _get_upload(request, upload_uuid, for_update=True)
+        abort_upload(upload)
+        return ok(message="Upload aborted.")
+
+
+@extend_schema(
+    tags=["Events"],
+    summary="Upload one chunk of a file",
+    description="Raw bytes (application/octet-stream) with Content-Range: bytes <start>-<end>/<size>. "
+                "Chunks may be sent in any order; a chunk whose range is already stored gets a 409 "
+                "reporting the file's received offset.",
+    request={"application/octet-stream": {"type": "string", "format": "binary"}},
+    responses={200: dict},
+)
+class ChunkedMediaUploadChunkView(APIView):
+    def put(self, request, upload_uuid, index):
+        upload = _get_upload(request, upload_uuid, for_update=True)
+        upload_file = get_object_or_404(upload.files, index=index)
+        upload_file.upload = upload
+        stream = request.stream  # read directly; request.data would buffer the body
+        if stream is None:
+            return fail(error="Empty chunk.", message="Upload error")
+        try:
+            received = write_chunk(
+                upload_file, request.headers.get("Content-Range"), stream, request.headers.get("X-Chunk-SHA256")
+            )
+        except UploadError as exc:
+            return _upload_error(exc)
+        return ok(
+            data={"index": upload_file.index, "received": received, "size": upload_file.size},
+            message="Chunk received."
+        )
+
+
+@extend_schema(
+    tags=["Events"],
+    summary="Complete a chunked media upload",
+    description="Verifies every file (size and optional SHA-256), stores them and bulk-creates the EventMedia rows.",
+    request=None,
+    responses={200: dict},
+)
+class ChunkedMediaUploadCompleteView(APIView):
+    def post(self, request, upload_uuid):
+        upload = _get_upload(request, upload_uuid, for_update=True)
+        try:
+            result = complete_upload(upload)
+        except UploadError as exc:
+            return _upload_error(exc)
+        return ok(
+            message="Media uploaded successfully.",
+            data=result
+        )
+
+
 @extend_schema(
         tags=["Events"],
         responses={201: EventMediaSerializer(many=True)},
@@ -364,6 +542,7 @@ class EventMediaViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description', 'media_info', 'media_type']
     ordering_fields = ['created_at']
+    pagination_class = CursorResultsSetPagination
 
     def get_serializer_class(self):
         return EventMediaSerializer
@@ -0,0 +1,154 @@
+"""
+Calendar queries and iCalendar feeds over EventOccurrence.
+
+``occurrences_between`` answers "what is on between A and B" with one indexed
+query. Category feeds are validated by an ETag derived from the category's
+latest event modification, so an unchanged feed costs one aggregate query
+(answered with 304 to conditional requests). When a feed does change, only
+events whose ``modified_at`` moved are re-rendered; the VEVENT blocks of the
+others come from the cache.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Event, EventOccurrence
+
+PRODID = "-//BMR//Events//EN"
+
+
+def published_events():
+    return Event.objects.filter(is_active=True, is_published=True)
+
+
+def occurrences_between(start, end, category=None):
+    """Occurrences of published events from ``start`` to ``end`` (inclusive), by date"""
+    qs = (
+        EventOccurrence.objects.filter(date__range=(start, end), event__is_active=True, event__is_published=True)
+        .select_related("event__category")
+        .order_by("date", "event__from_time", "event_id")
+    )
+    if category is not None:
+        qs = qs.filter(event__category=category)
+    return qs
+
+
+def feed_etag(category):
+    """ETag for a category feed: changes whenever the category or one of its published events is saved, added or removed"""
+    state = published_events().filter(category=category).aggregate(latest=Max("modified_at"), count=Count("id"))
+    latest = state["latest"].isoformat() if state["latest"] else ""
+    digest = hashlib.sha1(
+        f"{category.pk}:{category.modified_at.isoformat()}:{latest}:{state['count']}".encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _escape(value):
+    return (
+        str(value or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Fold a content line at 75 octets (RFC 5545 3.1)"""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1  # don't split a multi-byte character
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    return "\r\n ".join(parts)
+
+
+def _utc(day, at):
+    local = timezone.make_aware(datetime.combine(day, at), timezone.get_default_timezone())
+    return local.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_vevents(event, url, host):
+    """VEVENT blocks for every occurrence of ``event``"""
+    stamp = event.modified_at.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = []
+    for day in sorted(event.occurrence_dates):
+        lines += ["BEGIN:VEVENT", f"UID:event-{event.pk}-{day:%Y%m%d}@{host}", f"DTSTAMP:{stamp}"]
+        if event.from_time:
+            end_time = event.to_time if event.to_time and event.to_time > event.from_time else None
+            end = _utc(day, end_time) if end_time else _utc(day, event.from_time)
+            lines += [f"DTSTART:{_utc(day, event.from_time)}", f"DTEND:{end}"]
+        else:
+            lines += [f"DTSTART;VALUE=DATE:{day:%Y%m%d}", f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}"]
+        lines.append(f"SUMMARY:{_escape(event.title)}")
+        if event.location:
+            lines.append(f"LOCATION:{_escape(event.location)}")
+        if event.short_description:
+            lines.append(f"DESCRIPTION:{_escape(event.short_description)}")
+        if url:
+            lines.append(f"URL:{url}")
+        lines.append("END:VEVENT")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def build_feed(category, url, host):
+    """iCalendar document for a category; unchanged events are served from their cached VEVENT blocks"""
+    timeout = getattr(settings, "EVENT_FEED_CACHE_TIMEOUT", 86400)
+    events = list(
+        published_events().filter(category=category)
+        .only("id", "title", "location", "short_description", "from_time", "to_time", "modified_at")
+        .order_by("id")
+    )
+    keys = {
+        event.pk: f"events:ics:vevent:{host}:{category.pk}:{category.modified_at.timestamp()}:"
+                  f"{event.pk}:{event.modified_at.timestamp()}"
+        for event in events
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = [event for event in events if keys[event.pk] not in cached]
+    if missing:
+        dates = {}
+        for event_id, day in EventOccurrence.objects.filter(event__in=missing).values_list("event_id", "date"):
+            dates.setdefault(event_id, []).append(day)
+        rendered = {}
+        for event in missing:
+            event.occurrence_dates = dates.get(event.pk, [])
+            rendered[keys[event.pk]] = render_vevents(event, url, host)
+        cache.set_many(rendered, timeout=timeout)
+        cached.update(rendered)
+
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(category.title)}",
+    ]
+    return (
+        "".join(_fold(line) + "\r\n" for line in header)
+        + "".join(cached[keys[event.pk]] for event in events)
+        + "END:VCALENDAR\r\n"
+    )
+
+
+def get_feed(category, etag, url, host):
+    """Feed body for ``etag`` (from ``feed_etag``), cached until the category's events change"""
+    key = f"events:ics:feed:{host}:{category.pk}:{etag}"
+    body = cache.get(key)
+    if body is None:
+        body = build_feed(category, url, host)
+        cache.set(key, body, timeout=getattr(settings, "EVENT_FEED_CACHE_TIMEOUT", 86400))
+    return body
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from events.models import EventMediaUpload
+from events.uploads import abort_upload
+
+
+class Command(BaseCommand):
+    help = "Abort chunked media uploads left unfinished and delete their part files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24,
+                            help="Abort uploads started more than this many hours ago")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        if opts["hours"] < 1:
+            raise CommandError("--hours must be positive")
+
+        cutoff = timezone.now() - timedelta(hours=opts["hours"])
+        stale = EventMediaUpload.objects.filter(
+            status=EventMediaUpload.STATUS_UPLOADING, created_at__lt=cutoff
+        ).order_by("pk")
+
+        if opts["dry_run"]:
+            self.stdout.write(f"{stale.count()} stale uploads would be aborted")
+            return
+
+        aborted = 0
+        for upload in stale.iterator():
+            abort_upload(upload)
+            aborted += 1
+        self.stdout.write(self.style.SUCCESS(f"Aborted {aborted} stale uploads"))
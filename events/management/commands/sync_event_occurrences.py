@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event, EventOccurrence, parse_event_dates
+
+FIELDS = ["first_event_date", "last_event_date"]
+
+
+class Command(BaseCommand):
+    help = "Backfill EventOccurrence rows and Event first/last dates from Event.event_dates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        qs = Event.objects.order_by("pk").only("pk", "event_dates", "modified_at", *FIELDS)
+
+        last_pk = 0
+        synced = occurrences = 0
+        while True:
+            batch = list(qs.filter(pk__gt=last_pk)[:opts["batch_size"]])
+            if not batch:
+                break
+
+            existing = {}
+            for event_id, day in EventOccurrence.objects.filter(event__in=batch).values_list("event_id", "date"):
+                existing.setdefault(event_id, set()).add(day)
+
+            rows = []
+            now = timezone.now()
+            for event in batch:
+                dates = parse_event_dates(event.event_dates)
+                event.first_event_date = dates[0] if dates else None
+                event.last_event_date = dates[-1] if dates else None
+                if set(dates) != existing.get(event.pk, set()):
+                    # Calendar feed ETags are derived from modified_at (events.calendar.feed_etag)
+                    event.modified_at = now
+                rows += [EventOccurrence(event_id=event.pk, date=day) for day in dates]
+
+            with transaction.atomic():
+                Event.objects.bulk_update(batch, [*FIELDS, "modified_at"])
+                EventOccurrence.objects.filter(event_id__in=[event.pk for event in batch]).delete()
+                EventOccurrence.objects.bulk_create(rows, batch_size=1000)
+
+            synced += len(batch)
+            occurrences += len(rows)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Synced {synced} events (last pk {last_pk})")
+
+        self.stdout.write(self.style.SUCCESS(f"{occurrences} occurrences for {synced} events"))
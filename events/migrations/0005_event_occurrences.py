@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_from_time_event_to_time_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='first_event_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='last_event_date',
+            field=models.DateField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='EventOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='events.event')),
+            ],
+            options={
+                'ordering': ['date', 'event_id'],
+                'indexes': [models.Index(fields=['date', 'event'], name='event_occurrence_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventoccurrence',
+            constraint=models.UniqueConstraint(fields=('event', 'date'), name='uniq_event_occurrence_date'),
+        ),
+    ]
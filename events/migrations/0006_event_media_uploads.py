@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:21
+
+import core.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('events', '0005_event_occurrences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventMediaUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('media_title', models.CharField(max_length=500)),
+                ('media_date', models.DateTimeField(blank=True, null=True)),
+                ('media_location', models.CharField(blank=True, max_length=1500)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete'), ('aborted', 'Aborted')], db_index=True, default='uploading', max_length=20)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s_set', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to='events.event')),
+                ('modified_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='modified_%(class)s_set', to=settings.AUTH_USER_MODEL)),
+                ('sub_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to='events.eventsubcategory')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(core.models.FieldTrackerMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='EventMediaUploadFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField()),
+                ('filename', models.CharField(max_length=500)),
+                ('size', models.BigIntegerField()),
+                ('checksum', models.CharField(blank=True, help_text='Expected SHA-256 (hex) of the whole file', max_length=64)),
+                ('received', models.BigIntegerField(default=0)),
+                ('upload', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='events.eventmediaupload')),
+            ],
+            options={
+                'ordering': ['upload_id', 'index'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventmediauploadfile',
+            constraint=models.UniqueConstraint(fields=('upload', 'index'), name='uniq_event_media_upload_file'),
+        ),
+    ]
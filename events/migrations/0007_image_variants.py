@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_media_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='eventmedia',
+            name='media_file_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
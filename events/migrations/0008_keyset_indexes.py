@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventmedia',
+            index=models.Index(fields=['created_at', 'id'], name='events_even_created_03aaa8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventmediainfo',
+            index=models.Index(fields=['created_at', 'id'], name='events_even_created_00dfd3_idx'),
+        ),
+    ]
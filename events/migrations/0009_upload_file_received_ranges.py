@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:53
+
+from django.db import migrations, models
+
+
+def backfill_received_ranges(apps, schema_editor):
+    # Files uploaded so far were written in order: everything below `received` is stored
+    EventMediaUploadFile = apps.get_model('events', 'EventMediaUploadFile')
+    batch = []
+    for upload_file in EventMediaUploadFile.objects.filter(received__gt=0).only('id', 'received').iterator():
+        upload_file.received_ranges = [[0, upload_file.received]]
+        batch.append(upload_file)
+    EventMediaUploadFile.objects.bulk_update(batch, ['received_ranges'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventmediauploadfile',
+            name='received_ranges',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_received_ranges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:05
+
+from django.db import migrations
+
+from events.models import parse_event_dates
+
+BATCH_SIZE = 500
+
+
+def backfill_event_occurrences(apps, schema_editor):
+    # Events saved before 0005 have no occurrences and no first/last date; same rows as Event.sync_occurrences
+    Event = apps.get_model('events', 'Event')
+    EventOccurrence = apps.get_model('events', 'EventOccurrence')
+    qs = Event.objects.order_by('pk').only('pk', 'event_dates', 'first_event_date', 'last_event_date')
+    last_pk = 0
+    while True:
+        batch = list(qs.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        rows = []
+        for event in batch:
+            dates = parse_event_dates(event.event_dates)
+            event.first_event_date = dates[0] if dates else None
+            event.last_event_date = dates[-1] if dates else None
+            rows += [EventOccurrence(event_id=event.pk, date=day) for day in dates]
+        Event.objects.bulk_update(batch, ['first_event_date', 'last_event_date'])
+        EventOccurrence.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_upload_file_received_ranges'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_event_occurrences, migrations.RunPython.noop),
+    ]
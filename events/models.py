@@ -1,4 +1,6 @@
 import os
+from datetime import date
+
 from django.conf import settings
 from django.db import models
 from django.urls import reverse
@@ -23,6 +25,17 @@ def event_media_path(instance, filename):
 
     return os.path.join("event", "media", event_folder, sub_folder, filename)
 
+
+def parse_event_dates(values):
+    """Sorted unique dates from an ``event_dates`` JSON list; unparseable entries are skipped"""
+    parsed = set()
+    for value in values or []:
+        try:
+            parsed.add(date.fromisoformat(str(value)))
+        except (ValueError, TypeError):
+            continue
+    return sorted(parsed)
+
 class EventCategory(AuditModel):
     title = models.CharField(max_length=250, unique=True)
     title_others = models.CharField(max_length=250, unique=True, blank=True)
@@ -57,6 +70,8 @@ class Event(AuditModel):
     location = models.CharField(blank=True, max_length=1500)
     feature_image = models.CharField(blank=True, max_length=1500)
     cover_image = models.ImageField(upload_to=event_image_path, blank=True)
+    # Resized copies, filled in by the image derivatives job (core.utils.images)
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     event_dates = models.JSONField(default=list, blank=True, null=True)
     need_registration = models.BooleanField(default=False)
     is_short_course = models.BooleanField(default=False)
@@ -83,6 +98,9 @@ class Event(AuditModel):
         blank=True,
     )
     media_sent_count = models.IntegerField(default=0)
+    # Derived from event_dates on save (see EventOccurrence)
+    first_event_date = models.DateField(blank=True, null=True, db_index=True, editable=False)
+    last_event_date = models.DateField(blank=True, null=True, db_index=True, editable=False)
 
     def __str__(self):
         return self.title.encode("utf-8", "ignore").decode("utf-8")
@@ -90,6 +108,49 @@ class Event(AuditModel):
     def get_absolute_url(self):
         return reverse('article_details', args=[str(self.id)])
 
+    def save(self, *args, **kwargs):
+        dates_changed = "event_dates" not in self.get_deferred_fields() and self.has_changed("event_dates")
+        if dates_changed:
+            dates = parse_event_dates(self.event_dates)
+            self.first_event_date = dates[0] if dates else None
+            self.last_event_date = dates[-1] if dates else None
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "event_dates" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "first_event_date", "last_event_date"}
+        super().save(*args, **kwargs)
+        if dates_changed:
+            self.sync_occurrences()
+
+    def sync_occurrences(self):
+        """Make the EventOccurrence rows match event_dates (and first/last date)"""
+        dates = set(parse_event_dates(self.event_dates))
+        existing = set(self.occurrences.values_list("date", flat=True))
+        if existing - dates:
+            self.occurrences.filter(date__in=existing - dates).delete()
+        if dates - existing:
+            EventOccurrence.objects.bulk_create(
+                [EventOccurrence(event=self, date=day) for day in sorted(dates - existing)],
+                ignore_conflicts=True,
+            )
+
+
+class EventOccurrence(models.Model):
+    """One row per date in ``Event.event_dates``, for date-range queries in SQL"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="occurrences")
+    date = models.DateField()
+
+    class Meta:
+        ordering = ["date", "event_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["event", "date"], name="uniq_event_occurrence_date"),
+        ]
+        indexes = [
+            models.Index(fields=["date", "event"], name="event_occurrence_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} on {self.date}"
+
 
 # class EventDate(AuditModel):
 #     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="event_dates", null=True)
@@ -105,6 +166,10 @@ class EventMediaInfo(AuditModel):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="event_media_info", null=True)
     sub_category = models.ForeignKey(EventSubCategory, on_delete=models.CASCADE, related_name="event_media_info", null=True)
 
+    class Meta:
+        # Keyset pagination (core.utils.pagination.CursorResultsSetPagination)
+        indexes = [models.Index(fields=["created_at", "id"])]
+
     def __str__(self):
         return f"{self.event.title} on {self.sub_category.title}"
 
@@ -118,10 +183,61 @@ class EventMedia(AuditModel):
     file_type = models.CharField(max_length=50, blank=True, null=True, help_text="live video, home video, image, mp3, etc.")
     media_date = models.DateTimeField(blank=True, null=True)
     media_file = models.FileField(upload_to=event_media_path, blank=True, null=True)
+    # Resized copies, filled in by the image derivatives job (core.utils.images)
+    media_file_variants = models.JSONField(default=dict, blank=True, editable=False)
     embed_url = models.URLField(blank=True, null=True)
     downloaded_count = models.IntegerField(default=0)
 
+    class Meta:
+        # Keyset pagination (core.utils.pagination.CursorResultsSetPagination)
+        indexes = [models.Index(fields=["created_at", "id"])]
+
     def __str__(self):
         return f"{self.media_type} on {self.title}"
 
 
+class EventMediaUpload(AuditModel):
+    """A chunked, resumable batch upload that becomes EventMedia rows on completion"""
+    STATUS_UPLOADING = "uploading"
+    STATUS_COMPLETE = "complete"
+    STATUS_ABORTED = "aborted"
+    STATUS_CHOICES = (
+        (STATUS_UPLOADING, "Uploading"),
+        (STATUS_COMPLETE, "Complete"),
+        (STATUS_ABORTED, "Aborted"),
+    )
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="media_uploads")
+    sub_category = models.ForeignKey(EventSubCategory, on_delete=models.CASCADE, related_name="media_uploads")
+    media_title = models.CharField(max_length=500)
+    media_date = models.DateTimeField(blank=True, null=True)
+    media_location = models.CharField(blank=True, max_length=1500)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_UPLOADING, db_index=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.media_title} ({self.status})"
+
+
+class EventMediaUploadFile(models.Model):
+    """
+    One file of an EventMediaUpload. ``received_ranges`` lists the stored byte
+    ranges as merged ``[start, end)`` pairs; ``received`` is the end of the
+    range starting at 0, i.e. the next byte offset the server expects.
+    """
+    upload = models.ForeignKey(EventMediaUpload, on_delete=models.CASCADE, related_name="files")
+    index = models.PositiveIntegerField()
+    filename = models.CharField(max_length=500)
+    size = models.BigIntegerField()
+    checksum = models.CharField(max_length=64, blank=True, help_text="Expected SHA-256 (hex) of the whole file")
+    received = models.BigIntegerField(default=0)
+    received_ranges = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ["upload_id", "index"]
+        constraints = [
+            models.UniqueConstraint(fields=["upload", "index"], name="uniq_event_media_upload_file"),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
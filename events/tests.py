@@ -1,3 +1,199 @@
-from django.test import TestCase
+import hashlib
+import importlib
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from events.api.serializers import EventMediaUploadFileSerializer
+from events.calendar import feed_etag
+from events.models import (
+    Event, EventCategory, EventMedia, EventMediaInfo, EventMediaUpload, EventMediaUploadFile, EventOccurrence,
+    EventSubCategory
+)
+from events.uploads import UploadError, complete_upload, part_path, upload_dir, write_chunk
+
+
+class SyncEventOccurrencesTests(TestCase):
+    def setUp(self):
+        self.category = EventCategory.objects.create(title="Talks", title_others="talks")
+        self.event = Event.objects.create(
+            title="Talk", title_others="talk", category=self.category, is_published=True,
+            event_dates=["2026-01-10", "2026-01-11"],
+        )
+
+    def sync(self):
+        call_command("sync_event_occurrences", stdout=StringIO())
+
+    def test_changed_occurrences_change_feed_etag(self):
+        self.sync()
+        before = feed_etag(self.category)
+        # Dates edited without signals (e.g. an import using update())
+        Event.objects.filter(pk=self.event.pk).update(
+            event_dates=["2026-01-10", "2026-01-12"],
+            modified_at=Event.objects.get(pk=self.event.pk).modified_at - timedelta(minutes=1),
+        )
+        self.sync()
+        self.assertEqual(
+            set(EventOccurrence.objects.filter(event=self.event).values_list("date", flat=True)),
+            {date(2026, 1, 10), date(2026, 1, 12)},
+        )
+        self.assertNotEqual(feed_etag(self.category), before)
+
+    def test_unchanged_occurrences_keep_modified_at(self):
+        self.sync()
+        modified_at = Event.objects.get(pk=self.event.pk).modified_at
+        self.sync()
+        self.assertEqual(Event.objects.get(pk=self.event.pk).modified_at, modified_at)
+
+    def test_migration_backfills_existing_events(self):
+        # An event saved before the occurrence columns existed
+        EventOccurrence.objects.all().delete()
+        Event.objects.update(first_event_date=None, last_event_date=None)
+        migration = importlib.import_module("events.migrations.0010_backfill_event_occurrences")
+        migration.backfill_event_occurrences(apps, None)
+        event = Event.objects.get(pk=self.event.pk)
+        self.assertEqual((event.first_event_date, event.last_event_date), (date(2026, 1, 10), date(2026, 1, 11)))
+        self.assertEqual(EventOccurrence.objects.filter(event=event).count(), 2)
+
+
+class ChunkedUploadTests(TestCase):
+    data = bytes(range(256)) * 4
+
+    def setUp(self):
+        self.upload_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.upload_root, ignore_errors=True)
+        settings_override = override_settings(CHUNKED_UPLOAD_DIR=self.upload_root, MEDIA_ROOT=self.upload_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        category = EventCategory.objects.create(title="Talks", title_others="talks")
+        event = Event.objects.create(title="Talk", title_others="talk", category=category)
+        sub_category = EventSubCategory.objects.create(title="Photos", title_others="photos", event_category=category)
+        self.upload = EventMediaUpload.objects.create(event=event, sub_category=sub_category, media_title="Photos")
+        self.upload_file = EventMediaUploadFile.objects.create(
+            upload=self.upload, index=0, filename="a.jpg", size=len(self.data)
+        )
+
+    def put(self, start, end, data=None, checksum=None):
+        chunk = self.data[start:end + 1] if data is None else data
+        return write_chunk(self.upload_file, f"bytes {start}-{end}/{len(self.data)}", BytesIO(chunk), checksum)
+
+    def stored(self):
+        return part_path(self.upload_file).read_bytes()
+
+    def test_out_of_order_chunks(self):
+        self.assertEqual(self.put(512, 1023), 0)
+        self.assertEqual(self.put(0, 511), 1024)
+        self.assertEqual(self.stored(), self.data)
+        self.assertEqual(EventMediaUploadFile.objects.get().received_ranges, [[0, 1024]])
+
+    def test_retried_chunk_keeps_stored_bytes(self):
+        self.put(0, 511)
+        self.put(512, 1023)
+        with self.assertRaises(UploadError) as ctx:
+            self.put(0, 511)
+        self.assertEqual(ctx.exception.status, 409)
+        self.assertEqual(ctx.exception.received, 1024)
+        self.assertEqual(self.stored(), self.data)
+
+    def test_rejected_chunk_does_not_touch_stored_bytes(self):
+        self.put(0, 511)
+        with self.assertRaises(UploadError):
+            self.put(256, 767, data=b"x" * 512, checksum=hashlib.sha256(b"other").hexdigest())
+        with self.assertRaises(UploadError):
+            self.put(256, 767, data=b"x" * 100)
+        self.assertEqual(self.stored(), self.data[:512])
+        self.assertEqual(EventMediaUploadFile.objects.get().received, 512)
+
+    def test_complete_assembles_media_file(self):
+        self.put(512, 1023)
+        self.put(0, 511)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = complete_upload(self.upload)
+        self.assertEqual((result["created_count"], result["media_info_created"]), (1, True))
+        media = EventMedia.objects.get(media_info_id=result["media_info_id"])
+        self.assertEqual((media.filename, media.title), ("a.jpg", "Photos"))
+        with media.media_file.open("rb") as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertEqual(EventMediaUpload.objects.get().status, EventMediaUpload.STATUS_COMPLETE)
+        self.assertFalse(upload_dir(self.upload).exists())
+
+        with self.assertRaises(UploadError) as ctx:
+            complete_upload(self.upload)
+        self.assertEqual(ctx.exception.status, 409)
+        self.assertEqual(EventMedia.objects.count(), 1)
+
+    def test_complete_with_missing_range_rejected(self):
+        self.put(0, 255)
+        self.put(512, 1023)  # bytes 256-511 never arrived
+        with self.assertRaises(UploadError) as ctx:
+            complete_upload(self.upload)
+        self.assertEqual(ctx.exception.status, 409)
+        self.assertFalse(EventMedia.objects.exists())
+        self.assertEqual(EventMediaUpload.objects.get().status, EventMediaUpload.STATUS_UPLOADING)
+
+    def test_filename_validated_on_create(self):
+        serializer = EventMediaUploadFileSerializer(data={"filename": "../my photo.jpg", "size": 10})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["filename"], "..my_photo.jpg")
+        serializer = EventMediaUploadFileSerializer(data={"filename": "..", "size": 10})
+        self.assertFalse(serializer.is_valid())
+
+
+class CursorOrderingTests(TestCase):
+    url = "/api/events/event-media-info/"
+
+    def setUp(self):
+        category = EventCategory.objects.create(title="Talks", title_others="talks")
+        event = Event.objects.create(title="Talk", title_others="talk", category=category)
+        sub_category = EventSubCategory.objects.create(title="Photos", title_others="photos", event_category=category)
+        start = timezone.now()
+        self.ids = []
+        for offset in range(5):
+            info = EventMediaInfo.objects.create(event=event, sub_category=sub_category)
+            EventMediaInfo.objects.filter(pk=info.pk).update(created_at=start + timedelta(minutes=offset))
+            self.ids.append(info.pk)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(email="staff@example.com", username="staff"))
+
+    def walk(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = {"per_page": 2, **params, "cursor": cursor or ""}
+            data = self.client.get(self.url, query).data["data"]
+            ids += [row["id"] for row in data["results"]]
+            cursor = data["pagination"]["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_default_newest_first(self):
+        self.assertEqual(self.walk(), self.ids[::-1])
+
+    def test_requested_ordering_used_for_cursor(self):
+        self.assertEqual(self.walk(ordering="created_at"), self.ids)
+        self.assertEqual(self.walk(ordering="-created_at"), self.ids[::-1])
+
+    def test_cursor_from_other_ordering_rejected(self):
+        data = self.client.get(self.url, {"per_page": 2, "ordering": "created_at", "cursor": ""}).data["data"]
+        response = self.client.get(self.url, {"cursor": data["pagination"]["next_cursor"]})
+        self.assertEqual(response.status_code, 404)
+
+    def test_several_ordering_fields_rejected(self):
+        response = self.client.get(self.url, {"ordering": "created_at,-created_at", "cursor": ""})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_numbers_by_default(self):
+        pagination = self.client.get(self.url, {"per_page": 2}).data["data"]["pagination"]
+        self.assertEqual(
+            (pagination["current_page"], pagination["total_pages"], pagination["total_count"], pagination["next_page"]),
+            (1, 3, 5, 2),
+        )
+        self.assertNotIn("next_cursor", pagination)
@@ -0,0 +1,219 @@
+"""
+Chunked, resumable event media uploads.
+
+Protocol (see events.api.views): initiate a batch, PUT each file's bytes
+with ``Content-Range`` (optionally ``X-Chunk-SHA256``), then complete.
+Chunks are streamed from the request into a staging file in fixed-size
+blocks, so memory per request is one block whatever the file size, and only
+a verified chunk is written into the per-file part file, at its offset and
+never truncating it. Each file records the byte ranges it has stored; chunks
+may arrive in any order, and a chunk whose range is already stored is
+refused. After an interruption the client reads ``received`` (and the ranges)
+back and resumes. On completion each part file is verified and moved into
+media storage, and the EventMedia rows are bulk-created.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from core.utils.images import queue_derivatives
+
+from .models import EventMedia, EventMediaInfo, EventMediaUpload, EventMediaUploadFile
+
+BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class PartFile(File):
+    """A finished part file; FileSystemStorage moves it into place instead of copying"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class UploadError(Exception):
+    """Rejected chunk or completion; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400, received=None):
+        super().__init__(message)
+        self.status = status
+        self.received = received
+
+
+def max_chunk_size():
+    return getattr(settings, "EVENT_MEDIA_CHUNK_SIZE", 8 * 1024 * 1024)
+
+
+def upload_dir(upload):
+    return Path(settings.CHUNKED_UPLOAD_DIR) / str(upload.uuid)
+
+
+def part_path(upload_file):
+    return upload_dir(upload_file.upload) / f"{upload_file.index}.part"
+
+
+def parse_content_range(header):
+    """``bytes start-end/total`` -> (start, end inclusive, total)"""
+    match = CONTENT_RANGE.match(header or "")
+    if not match:
+        raise UploadError("Content-Range must be 'bytes <start>-<end>/<total>'.")
+    start, end, total = (int(value) for value in match.groups())
+    if end < start or end >= total:
+        raise UploadError("Invalid Content-Range.")
+    return start, end, total
+
+
+def merge_range(ranges, start, end):
+    """Add ``[start, end)`` to sorted, non-overlapping ``[start, end)`` pairs, merging neighbours"""
+    merged = []
+    for low, high in sorted([*ranges, [start, end]]):
+        if merged and low <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return merged
+
+
+def covered(ranges, start, end):
+    return any(low <= start and end <= high for low, high in ranges)
+
+
+def _stage_chunk(directory, stream, length, checksum):
+    """Stream the chunk into a temporary file, verifying length and checksum; returns its path"""
+    digest = hashlib.sha256()
+    written = 0
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".chunk", delete=False) as staged:
+        while written < length:
+            block = stream.read(min(BLOCK_SIZE, length - written))
+            if not block:
+                break
+            staged.write(block)
+            digest.update(block)
+            written += len(block)
+    if written != length or (checksum and digest.hexdigest() != checksum.lower()):
+        os.unlink(staged.name)
+        if written != length:
+            raise UploadError(f"Expected {length} bytes, received {written}.")
+        raise UploadError("Chunk checksum mismatch.")
+    return staged.name
+
+
+def write_chunk(upload_file, content_range, stream, checksum=None):
+    """
+    Store one chunk read from ``stream`` at its offset in the file's part file
+    and record its range. Returns the new ``received`` offset. The chunk is
+    staged and verified first (length, optional ``checksum``), so a short or
+    corrupt chunk never touches bytes already stored.
+    """
+    start, end, total = parse_content_range(content_range)
+    length = end - start + 1
+    if total != upload_file.size:
+        raise UploadError(f"Total size {total} does not match the declared size {upload_file.size}.")
+    if length > max_chunk_size():
+        raise UploadError(f"Chunks may be at most {max_chunk_size()} bytes.", status=413)
+    if covered(upload_file.received_ranges, start, end + 1):
+        raise UploadError("Chunk was already received.", status=409, received=upload_file.received)
+
+    path = part_path(upload_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        staged = _stage_chunk(path.parent, stream, length, checksum)
+    except UploadError as exc:
+        exc.received = upload_file.received
+        raise
+    try:
+        # O_CREAT without O_TRUNC: concurrent writers of other ranges share the file safely
+        with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b") as part, open(staged, "rb") as chunk:
+            part.seek(start)
+            shutil.copyfileobj(chunk, part, BLOCK_SIZE)
+    finally:
+        os.unlink(staged)
+
+    with transaction.atomic():
+        row = EventMediaUploadFile.objects.select_for_update().only("received_ranges").get(pk=upload_file.pk)
+        ranges = merge_range(row.received_ranges, start, end + 1)
+        received = ranges[0][1] if ranges[0][0] == 0 else 0
+        EventMediaUploadFile.objects.filter(pk=upload_file.pk).update(received_ranges=ranges, received=received)
+    upload_file.received_ranges = ranges
+    upload_file.received = received
+    return received
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete_upload(upload):
+    """Verify every file, move them into media storage and bulk-create the EventMedia rows"""
+    files = list(upload.files.all())
+    incomplete = [f.filename for f in files if f.received != f.size]
+    if incomplete:
+        raise UploadError(f"Incomplete files: {', '.join(incomplete)}", status=409)
+    for upload_file in files:
+        if upload_file.checksum and _file_sha256(part_path(upload_file)) != upload_file.checksum.lower():
+            raise UploadError(f"Checksum mismatch for {upload_file.filename}.")
+
+    with transaction.atomic():
+        # Claim the session first, so a repeated "complete" can't create the rows twice
+        claimed = EventMediaUpload.objects.filter(
+            pk=upload.pk, status=EventMediaUpload.STATUS_UPLOADING
+        ).update(status=EventMediaUpload.STATUS_COMPLETE, completed_at=timezone.now(), modified_at=timezone.now())
+        if not claimed:
+            upload.refresh_from_db(fields=["status"])
+            raise UploadError(f"Upload is already {upload.status}.", status=409)
+
+        media_info, created = EventMediaInfo.objects.get_or_create(
+            event_id=upload.event_id,
+            sub_category_id=upload.sub_category_id,
+        )
+        media_objs = []
+        handles = []
+        try:
+            for upload_file in files:
+                handle = open(part_path(upload_file), "rb")
+                handles.append(handle)
+                media_objs.append(EventMedia(
+                    media_info=media_info,
+                    media_type='file',
+                    title=upload.media_title,
+                    media_location=upload.media_location,
+                    filename=upload_file.filename,
+                    media_date=upload.media_date,
+                    # Saved to storage (moved, or copied in chunks) as the row is inserted
+                    media_file=PartFile(handle, name=upload_file.filename),
+                ))
+            EventMedia.objects.bulk_create(media_objs)
+            queue_derivatives(media_objs, "media_file")
+        finally:
+            for handle in handles:
+                handle.close()
+
+        transaction.on_commit(lambda: discard_parts(upload))
+
+    return {
+        'media_info_id': media_info.id,
+        'created_count': len(media_objs),
+        'media_info_created': created,
+    }
+
+
+def discard_parts(upload):
+    shutil.rmtree(upload_dir(upload), ignore_errors=True)
+
+
+def abort_upload(upload):
+    upload.status = EventMediaUpload.STATUS_ABORTED
+    upload.save(update_fields=["status", "modified_at"])
+    discard_parts(upload)
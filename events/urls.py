@@ -27,7 +27,9 @@ public_urls = [
     path('dhamma_class/', views.event_medias, name='event_medias'),
 
     path('dhamma_class/list/', views.public_event_list, name='public_events'),
+    path('dhamma_class/media/<int:pk>/', views.event_media_file, name='event_media_file'),
     path('dhamma_class/<str:title_others>/', views.event_details, name='event_details'),
+    path('dhamma_class/<str:title_others>/calendar.ics', views.event_category_feed, name='event_category_feed'),
 ]
 
 urlpatterns = [
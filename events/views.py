@@ -1,14 +1,19 @@
 import json
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.core.paginator import Paginator
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
 from datetime import date
 from django.utils.safestring import mark_safe
-from django.views.decorators.http import require_POST
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
 from django.views import View
-from .models import EventCategory, EventSubCategory, Event
+from core.utils.download_counts import record_download
+from core.utils.media_delivery import serve_file
+from .models import EventCategory, EventSubCategory, Event, EventMedia
+from .calendar import feed_etag, get_feed
 from .forms import EventCategoryForm, EventSubCategoryForm
 from django.conf import settings
 
@@ -183,35 +188,53 @@ def event_details(request, title_others):
     return render(request, 'public/events/event-details.html', context)
 
 
+@require_GET
+def event_media_file(request, pk):
+    """Serve an event media file with Range/conditional support; downloads are counted in batches"""
+    media = get_object_or_404(
+        EventMedia.objects.only("id", "media_file", "filename"),
+        pk=pk, is_active=True, media_type='file',
+    )
+    if not media.media_file:
+        raise Http404("No file")
+    return serve_file(
+        request,
+        media.media_file,
+        download_name=media.filename or None,
+        as_attachment=request.GET.get('download') == '1',
+        on_download=lambda: record_download(media),
+    )
+
+
+@require_GET
+def event_category_feed(request, title_others):
+    """iCalendar feed of a category's published events, for members' calendar apps"""
+    category = get_object_or_404(EventCategory, title_others=title_others, is_active=True)
+    etag = feed_etag(category)
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        url = request.build_absolute_uri(reverse('event_details', args=[category.title_others]))
+        body = get_feed(category, etag, url, request.get_host())
+        response = HttpResponse(body, content_type="text/calendar; charset=utf-8")
+        response["Content-Disposition"] = f'inline; filename="{category.title_others}.ics"'
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, "EVENT_FEED_MAX_AGE", 300))
+    return response
+
+
 def public_event_list(request):
     filter_key = request.GET.get('filter', 'all').lower()
     today = date.today()
 
-    base_qs = Event.objects.filter(is_active=True, is_published=True).order_by('-published_at', '-created_at')
-
-    filtered = []
-    for ev in base_qs:
-        parsed_dates = []
-        for d in ev.event_dates or []:
-            try:
-                parsed_dates.append(date.fromisoformat(str(d)))
-            except (ValueError, TypeError):
-                continue
-
-        ev.first_event_date = min(parsed_dates) if parsed_dates else None
-        ev.last_event_date = max(parsed_dates) if parsed_dates else None
-        ev._parsed_dates = parsed_dates 
-
-        if filter_key == 'upcoming':
-            if parsed_dates and any(d >= today for d in parsed_dates):
-                filtered.append(ev)
-        elif filter_key == 'completed':
-            if parsed_dates and all(d < today for d in parsed_dates):
-                filtered.append(ev)
-        else:
-            filtered.append(ev)
-
-    paginator = Paginator(filtered, 10)  # Show 10 events per page
+    # first/last_event_date are maintained from event_dates on save (indexed)
+    events = Event.objects.filter(is_active=True, is_published=True).order_by('-published_at', '-created_at')
+    if filter_key == 'upcoming':
+        events = events.filter(last_event_date__gte=today)
+    elif filter_key == 'completed':
+        events = events.filter(last_event_date__lt=today)
+
+    paginator = Paginator(events, 10)  # Show 10 events per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -13,5 +13,6 @@ admin.site.register(WorkInfo)
 admin.site.register(WorkflowLog)
 admin.site.register(MembershipPayment)
 admin.site.register(PaymentLog)
+admin.site.register(WebhookEvent)
 
 
@@ -1,6 +1,7 @@
 # memberships/api/routers.py
 from rest_framework.routers import DefaultRouter
 from django.urls import path
+from .streams import payment_status_stream
 from .views import (
     MembershipViewSet, 
     EducationLevelListAPIView, 
@@ -26,6 +27,7 @@ urlpatterns = [
     # Webhooks
     path("payments/webhooks/hitpay/", HitPayWebhookView.as_view(), name="hitpay-webhook"),
     path("payments/<str:external_id>/status/", PaymentStatusView.as_view(), name="payment-status"),
+    path("payments/<uuid:payment_uuid>/stream/", payment_status_stream, name="payment-status-stream"),
 ]
 
 urlpatterns += router.urls
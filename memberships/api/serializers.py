@@ -12,6 +12,10 @@ from memberships.models import (
     PersonalInfo, ContactInfo, WorkInfo, EducationInfo, Membership, MembershipPayment
 )
 from memberships.services.payments import HitPayClient
+from memberships.services.decryption import prime_membership_decryption
+from memberships import workflow
+from core.utils.images import ImageVariantsField
+from core.utils.status_registry import registry as status_registry
 
 # from memberships.services.payments import create_hitpay_payment, PaymentCreateError
 
@@ -139,6 +143,16 @@ class StatusSerializer(serializers.ModelSerializer):
                   "status_code")
 
 
+class MembershipReadListSerializer(serializers.ListSerializer):
+    """Decrypts the whole page of contact/work info in one batch before rendering rows."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        iterable = list(iterable)
+        prime_membership_decryption(iterable)
+        return super().to_representation(iterable)
+
+
 class MembershipReadSerializer(serializers.ModelSerializer):
     user = serializers.CharField(source="user.username", read_only=True)
     membership_type_name = serializers.CharField(source="membership_type.name", read_only=True)
@@ -152,11 +166,12 @@ class MembershipReadSerializer(serializers.ModelSerializer):
     workflow_status = StatusSerializer(read_only=True)
     can_edit = serializers.SerializerMethodField()
     payments = serializers.SerializerMethodField()
+    profile_picture_variants = ImageVariantsField(image_field="profile_picture")
 
     class Meta:
         model = Membership
         fields = (
-            "uuid", "reference_no", "user", "profile_picture", "applied_date",
+            "uuid", "reference_no", "user", "profile_picture", "profile_picture_variants", "applied_date",
             "membership_type", "membership_type_name", "membership_number", "profile_info", "contact_info",
             "education_info", "work_info", "workflow_status", "workflow_status_name", "reason",
             "is_profile_completed", "is_contact_completed", "is_education_completed",
@@ -165,14 +180,24 @@ class MembershipReadSerializer(serializers.ModelSerializer):
         )
 
         read_only_fields = ("uuid", "reference_no", "user", "membership_type_name")
+        list_serializer_class = MembershipReadListSerializer
 
     def get_can_edit(self, obj):
         return obj.can_edit()
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # List callers can leave payments out (?include=-payments)
+        if not self.context.get("include_payments", True):
+            fields.pop("payments", None)
+        return fields
+
     def get_payments(self, obj):
-        payments_qs = obj.payments.filter(is_active=True).order_by('-created_at')
-        from .serializers import PaymentReadSerializer  # avoid circular import at top
-        return PaymentReadSerializer(payments_qs, many=True, context=self.context).data
+        # Use the Prefetch(to_attr="active_payments") cache when the view provided it
+        payments = getattr(obj, "active_payments", None)
+        if payments is None:
+            payments = obj.payments.filter(is_active=True).order_by('-created_at')
+        return PaymentReadSerializer(payments, many=True, context=self.context).data
 
 
 # Write serializers for creating/updating
@@ -340,6 +365,10 @@ class MembershipPage2Serializer(serializers.Serializer):
         if not (membership.is_profile_completed and membership.is_contact_completed):
             raise serializers.ValidationError("Please complete Page 1 (Profile & Contact Info) first")
 
+        # Checked here as well as in save() so nothing is written for a submission that can't move on
+        if not workflow.can_transition(workflow.status_code(membership), workflow.PENDING_PAYMENT):
+            raise serializers.ValidationError("Cannot submit the application from its current status")
+
         # If there's already a pending/created payment, skip creating another
         attrs['skip_payment'] = membership.payments.filter(status__in=["pending", "created"]).exists()
         return attrs
@@ -378,11 +407,13 @@ class MembershipPage2Serializer(serializers.Serializer):
         membership.submitted_at = timezone.now()
 
         # Set to pending payment status (status code 11)
-        pending_payment_status, _ = Status.objects.get_or_create(
-            status_code="11",
-            defaults={"internal_status": "Pending Payment", "external_status": "Pending Payment"}
+        status_registry.ensure(
+            workflow.PENDING_PAYMENT, internal_status="Pending Payment", external_status="Pending Payment"
         )
-        membership.workflow_status = pending_payment_status
+        try:
+            membership.transition(workflow.PENDING_PAYMENT, save_membership=False)
+        except workflow.InvalidTransition as exc:
+            raise serializers.ValidationError(str(exc))
         membership.save()
 
         # Generate HitPay payment if not already generated
@@ -401,11 +432,10 @@ class MembershipPage2Serializer(serializers.Serializer):
             self.context['payment'] = payment
         elif self.validated_data.get('skip_payment'):
             # If skipping payment creation and already at status 13, bump to 12 (approved/pending confirmation)
-            current_status = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
-            if current_status == "13":
-                approved_status, _ = Status.objects.get_or_create(
-                    status_code="12",
-                    defaults={"internal_status": "Pending Approval", "external_status": "Pending Approval"}
+            current_status = workflow.status_code(membership)
+            if current_status == workflow.REVISE:
+                approved_status = status_registry.ensure(
+                    workflow.PENDING_APPROVAL, internal_status="Pending Approval", external_status="Pending Approval"
                 )
                 membership.workflow_status = approved_status
                 membership.save(update_fields=["workflow_status", "modified_at"])
@@ -629,14 +659,13 @@ class MembershipWorkflowDecisionSerializer(serializers.Serializer):
             "revise": ["Revision Requested", "REVISION_REQUESTED", "Revision_required", "Needs Revision"],
         }
         labels = label_map[action]
-        qs = Status.objects.filter(
-            models.Q(internal_status__in=labels) | models.Q(external_status__in=labels)
-        )
-        obj = qs.order_by("id").first()
+        obj = status_registry.find(labels)
         if not obj:
-            code_map = {"approve": "16", "reject": "14", "revise": "13"}
-            code = code_map[action]
-            obj = Status.objects.filter(status_code=str(code)).first()
+            code_map = {"approve": workflow.APPROVED, "reject": workflow.REJECTED, "revise": workflow.REVISE}
+            try:
+                obj = status_registry.get(code_map[action])
+            except Status.DoesNotExist:
+                obj = None
         if not obj:
             raise serializers.ValidationError(
                 f"Cannot resolve a Status for action '{action}'. "
@@ -649,13 +678,14 @@ class MembershipWorkflowDecisionSerializer(serializers.Serializer):
         status_obj = None
         if "status_id" in data and data["status_id"] is not None:
             try:
-                status_obj = Status.objects.get(pk=data["status_id"])
+                status_obj = status_registry.get_by_id(data["status_id"])
             except Status.DoesNotExist:
                 raise serializers.ValidationError({"status_id": "Invalid status_id."})
 
         if not status_obj and data.get("status_code"):
-            status_obj = Status.objects.filter(status_code=str(data["status_code"])).first()
-            if not status_obj:
+            try:
+                status_obj = status_registry.get(data["status_code"])
+            except Status.DoesNotExist:
                 raise serializers.ValidationError({"status_code": "Invalid status_code."})
 
         if not status_obj:
@@ -0,0 +1,176 @@
+"""
+Live payment status: one held connection per payment instead of polling.
+
+``GET payments/<uuid>/stream/`` with ``Accept: text/event-stream`` streams
+Server-Sent Events; any other Accept header gets a long-poll JSON response
+(``?since=<status>&timeout=<seconds>``). Async views: serve under ASGI
+(BMR/asgi.py) so idle connections don't hold a worker thread. Under WSGI an
+async iterator would be buffered until the stream ends, so the SSE stream
+falls back to a synchronous, database-polling generator there.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from memberships.models import MembershipPayment
+from memberships.services.payment_events import subscribe, unsubscribe
+
+TERMINAL_STATUSES = {"paid", "failed", "cancelled"}
+STATE_FIELDS = ("uuid", "status", "external_id", "paid_at")
+
+
+def _envelope(data=None, message="OK", error=None, status=200):
+    # Same shape as core.utils.responses.ok/fail for plain Django views
+    return JsonResponse(
+        {"success": error is None, "message": message, "error": error, "data": data}, status=status
+    )
+
+
+def _authenticate(request):
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError):
+        return None
+    return result[0] if result else None
+
+
+def _load_payment(payment_uuid, user):
+    qs = MembershipPayment.objects.filter(uuid=payment_uuid)
+    if not user.is_staff:
+        qs = qs.filter(membership__user=user)
+    return qs.values("pk", *STATE_FIELDS).first()
+
+
+def _format_state(row):
+    return {
+        "uuid": str(row["uuid"]),
+        "status": row["status"],
+        "external_id": row["external_id"],
+        "paid_at": row["paid_at"].isoformat() if row["paid_at"] else None,
+    }
+
+
+async def _state(pk):
+    return _format_state(await MembershipPayment.objects.filter(pk=pk).values(*STATE_FIELDS).afirst())
+
+
+def _state_sync(pk):
+    return _format_state(MembershipPayment.objects.filter(pk=pk).values(*STATE_FIELDS).first())
+
+
+async def _wait_for_change(pk, wake, last_status, timeout):
+    """Return the payment state once its status differs from ``last_status`` or ``timeout`` elapses"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    poll = getattr(settings, "PAYMENT_STREAM_POLL_INTERVAL", 2)
+    while True:
+        state = await _state(pk)
+        remaining = deadline - loop.time()
+        if state["status"] != last_status or remaining <= 0:
+            return state
+        try:
+            # Woken at once by saves in this process; the poll interval catches other processes
+            await asyncio.wait_for(wake.wait(), timeout=min(poll, remaining))
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _event_stream(pk, payment_uuid):
+    wake = subscribe(payment_uuid)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + getattr(settings, "PAYMENT_STREAM_MAX_SECONDS", 300)
+    heartbeat = getattr(settings, "PAYMENT_STREAM_HEARTBEAT", 15)
+    try:
+        state = await _state(pk)
+        yield "retry: 3000\n" + _sse("status", state)
+        while state["status"] not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                # Client reconnects (EventSource does this automatically) and gets a fresh stream
+                yield _sse("timeout", state)
+                return
+            new_state = await _wait_for_change(pk, wake, state["status"], min(heartbeat, remaining))
+            if new_state["status"] == state["status"]:
+                yield ": keep-alive\n\n"
+            else:
+                state = new_state
+                yield _sse("status", state)
+    finally:
+        unsubscribe(payment_uuid, wake)
+
+
+def _sync_event_stream(pk):
+    """
+    WSGI variant of ``_event_stream``: same events, but it re-reads the payment
+    every PAYMENT_STREAM_POLL_INTERVAL and holds a worker thread while open.
+    """
+    deadline = time.monotonic() + getattr(settings, "PAYMENT_STREAM_MAX_SECONDS", 300)
+    heartbeat = getattr(settings, "PAYMENT_STREAM_HEARTBEAT", 15)
+    poll = getattr(settings, "PAYMENT_STREAM_POLL_INTERVAL", 2)
+    state = _state_sync(pk)
+    yield "retry: 3000\n" + _sse("status", state)
+    last_sent = time.monotonic()
+    while state["status"] not in TERMINAL_STATUSES:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            yield _sse("timeout", state)
+            return
+        time.sleep(min(poll, remaining))
+        new_state = _state_sync(pk)
+        if new_state["status"] != state["status"]:
+            state = new_state
+            yield _sse("status", state)
+        elif time.monotonic() - last_sent < heartbeat:
+            continue
+        else:
+            yield ": keep-alive\n\n"
+        last_sent = time.monotonic()
+
+
+async def payment_status_stream(request, payment_uuid):
+    if request.method != "GET":
+        return _envelope(message="Method not allowed", error="GET only", status=405)
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return _envelope(message="Unauthorized", error="Authentication credentials were not provided.", status=401)
+
+    row = await sync_to_async(_load_payment)(payment_uuid, user)
+    if row is None:
+        return _envelope(message="Error", error="Payment not found", status=404)
+
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        if isinstance(request, ASGIRequest):
+            events = _event_stream(row["pk"], payment_uuid)
+        else:
+            events = _sync_event_stream(row["pk"])
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # let nginx flush events immediately
+        return response
+
+    # Long-poll fallback
+    try:
+        timeout = min(float(request.GET.get("timeout", 25)), 30)
+    except ValueError:
+        timeout = 25
+    wake = subscribe(payment_uuid)
+    try:
+        state = await _wait_for_change(row["pk"], wake, request.GET.get("since") or row["status"], timeout)
+    finally:
+        unsubscribe(payment_uuid, wake)
+    return _envelope(state, "Payment status")
@@ -9,13 +9,16 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from django.db.models import Prefetch
 from django.utils import timezone
 
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter
 from django.views import View
 from django.http import JsonResponse
 
-from core.utils.pagination import StandardResultsSetPagination
+from core.utils.encryption import nric_blind_index, phone_blind_index
+from core.utils.pagination import CursorResultsSetPagination
+from core.utils.profiling import ProfiledViewMixin
 from core.utils.responses import ok, fail
 from memberships.models import Membership, EducationLevel, Institution, MembershipType, MembershipPayment, PersonalInfo, \
     ContactInfo
@@ -34,9 +37,11 @@ from .serializers import (
     MembershipWorkflowDecisionSerializer,
 )
 from authentication.utils.permissions import IsManagementUser
-from ..services.payments import HitPayClient
-from memberships.utils.onesignal import send_payment_notification
+from ..services.payment_refresh import refresh_payment_status
+from memberships.services.webhooks import hitpay_signature_valid, record_hitpay_event
 from core.models import Status
+from core.utils.status_registry import registry as status_registry
+from memberships import workflow
 
 LOOKUP_PERMISSION = AllowAny
 
@@ -81,7 +86,41 @@ class MembershipMetaView(View):
         return JsonResponse(data, status=200)
 
 
-class MembershipViewSet(mixins.RetrieveModelMixin,
+class MembershipLookupMixin:
+    """
+    Exact-match search on the encrypted NRIC/FIN and primary contact through
+    their blind-index columns: one indexed query, no decryption of other rows.
+    """
+
+    @extend_schema(
+        tags=["Memberships"],
+        parameters=[
+            OpenApiParameter(name="nric_fin", type=str, required=False, description="Exact NRIC/FIN"),
+            OpenApiParameter(name="phone", type=str, required=False, description="Exact primary contact number"),
+        ],
+        responses={200: MembershipReadSerializer(many=True)},
+        summary="Find memberships by NRIC/FIN or phone"
+    )
+    @action(detail=False, methods=["GET"], url_path="lookup")
+    def identity_lookup(self, request):
+        nric_fin = (request.query_params.get("nric_fin") or "").strip()
+        phone = (request.query_params.get("phone") or "").strip()
+        if not nric_fin and not phone:
+            return fail("nric_fin or phone is required", status=400)
+
+        qs = self.get_queryset()
+        if nric_fin:
+            qs = qs.filter(contact_info__nric_fin_bidx=nric_blind_index(nric_fin))
+        if phone:
+            qs = qs.filter(contact_info__primary_contact_bidx=phone_blind_index(phone))
+
+        serializer = MembershipReadSerializer(qs, many=True, context={'request': request})
+        return ok(serializer.data, "Memberships found")
+
+
+class MembershipViewSet(ProfiledViewMixin,
+                        MembershipLookupMixin,
+                        mixins.RetrieveModelMixin,
                         mixins.ListModelMixin,
                         viewsets.GenericViewSet):
     """
@@ -92,15 +131,25 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
     serializer_class = MembershipReadSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CursorResultsSetPagination
+    # Oldest first, as the list has always been ordered by id
+    cursor_ordering = ("created_at", "id")
     ordering_fields = ["-created_at"]
     lookup_field = "uuid"
+    query_budgets = {"list": 5, "retrieve": 4, "identity_lookup": 4}
 
     def get_queryset(self):
         base_qs = Membership.objects.select_related(
-            "membership_type", "profile_info", "contact_info",
-            "education_info", "work_info", "workflow_status"
+            "user", "membership_type", "profile_info", "contact_info",
+            "education_info__education", "education_info__institution",
+            "work_info", "workflow_status"
         ).order_by('id')
+        if self.action != "list" or self._include_payments():
+            base_qs = base_qs.prefetch_related(Prefetch(
+                "payments",
+                queryset=MembershipPayment.objects.filter(is_active=True).order_by("-created_at"),
+                to_attr="active_payments",
+            ))
         # Management sees all
         if self.request.user.is_staff:  # or use IsManagementUser() logic
             # Allow filtering by status_code via query param (e.g. ?status_code=12)
@@ -111,6 +160,21 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
         # Public users see only their own
         return base_qs.filter(user=self.request.user)
 
+    def _include_payments(self):
+        """
+        ?include=payments embeds payments in list rows; they stay on by default
+        (existing clients read them), so ?include=-payments leaves them out.
+        """
+        if self.action != "list":
+            return True
+        include = self.request.query_params.get("include", "")
+        return "-payments" not in {part.strip() for part in include.split(",")}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_payments"] = self._include_payments()
+        return context
+
     def get_or_create_membership(self):
         """Get existing membership or create new draft"""
         membership, created = Membership.objects.get_or_create(
@@ -123,12 +187,9 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
 
     def _get_draft_status(self):
         """Get or create draft status"""
-        from core.models import Status
-        draft_status, _ = Status.objects.get_or_create(
-            status_code="10",
-            defaults={"internal_status": "Draft Application", "external_status": "Draft Application"}
+        return status_registry.ensure(
+            workflow.DRAFT, internal_status="Draft Application", external_status="Draft Application"
         )
-        return draft_status
 
     def _set_pending_approval_status(self, membership):
         """
@@ -136,19 +197,18 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
         """
         if not membership:
             return
-        current_status = getattr(getattr(membership, "workflow_status", None), "status_code", None)
-        if current_status == "12":
+        current_status = workflow.status_code(membership)
+        if current_status == workflow.PENDING_APPROVAL:
             return
-        from core.models import Status
         try:
             membership.transition(
-                "12",
+                workflow.PENDING_APPROVAL,
                 reason="Offline payment submitted by applicant.",
                 actor=getattr(self.request, "user", None),
                 save_membership=True,
             )
-        except Status.DoesNotExist:
-            # Pending approval status not configured; skip silently to avoid blocking payment capture.
+        except (Status.DoesNotExist, workflow.InvalidTransition):
+            # Status not configured or not reachable from the current stage; don't block payment capture.
             pass
 
     def _set_pending_payment_confirmation_status(self, membership):
@@ -157,23 +217,18 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
         """
         if not membership:
             return
-        current_status = getattr(getattr(membership, "workflow_status", None), "status_code", None)
-        if current_status == "17":
+        current_status = workflow.status_code(membership)
+        if current_status == workflow.PENDING_PAYMENT_CONFIRMATION:
             return
         try:
             membership.transition(
-                "17",
+                workflow.PENDING_PAYMENT_CONFIRMATION,
                 reason="Offline payment submitted; awaiting confirmation.",
                 actor=getattr(self.request, "user", None),
                 save_membership=True,
             )
-        except Status.DoesNotExist:
-            try:
-                pending_status = Status.objects.get(status_code="17")
-                membership.workflow_status = pending_status
-                membership.save(update_fields=["workflow_status", "modified_at"])
-            except Status.DoesNotExist:
-                pass
+        except (Status.DoesNotExist, workflow.InvalidTransition):
+            pass
 
     def _mark_offline_payments_paid(self, membership):
         """
@@ -236,7 +291,7 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
         try:
             membership = self.get_or_create_membership()
             # Prevent modification if membership is not in editable statuses
-            current_status = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
+            current_status = workflow.status_code(membership)
             # if current_status is None: #not in ("10", "11", "12", "13"):
             #     raise ValidationError({"detail": "Application cannot be modified at this stage."})
             serializer = MembershipPage1Serializer(
@@ -281,7 +336,7 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
         """Page 2: Submit Education Info, Work Info, and Generate HitPay Payment QR"""
         membership = self.get_or_create_membership()
         # Prevent modification if membership is not in editable statuses
-        current_status = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
+        current_status = workflow.status_code(membership)
         # if current_status is None: # not in ("10", "11", "12", "13"):
         #     raise ValidationError({"detail": "Application cannot be modified at this stage."})
 
@@ -334,14 +389,16 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
 
     @extend_schema(
         tags=["Memberships"],
+        parameters=[
+            OpenApiParameter(name="include", type=str, required=False,
+                             description="Comma-separated embedded fields: 'payments' (the default) embeds "
+                                         "payments, '-payments' leaves them out"),
+        ],
         responses={200: MembershipReadSerializer},
         summary="List my memberships (should be only one)"
     )
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        serializer = MembershipReadSerializer(qs, many=True, context={'request': request})
-        response = super().list(request, *args, **kwargs)
-        return response
+        return super().list(request, *args, **kwargs)
 
     @extend_schema(
         tags=["Payments"],
@@ -380,49 +437,11 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
         if not payment:
             return fail("Payment not found", status=404)
 
-        # If still not paid, try refreshing status from HitPay directly
-        try:
-            if payment.external_id and payment.status != "paid":
-                client = HitPayClient()
-                data = client.get_payment_request(payment.external_id)
-                status_val = (data.get("status") or "").lower()
-                status_mapping = {
-                    "succeeded": "paid",
-                    "completed": "paid",
-                    "pending": "created",
-                    "failed": "failed",
-                    "cancelled": "cancelled",
-                }
-                mapped_status = status_mapping.get(status_val, payment.status)
-                payment.status = mapped_status
-                payment.raw_response = data
-                if mapped_status == "paid" and not payment.paid_at:
-                    from django.utils import timezone
-                    payment.paid_at = timezone.now()
-                if mapped_status == "paid" and payment.membership:
-                    self._mark_membership_paid(payment)
-                payment.save(update_fields=["status", "raw_response", "paid_at", "modified_at"])
-        except Exception:
-            pass
+        # If still not paid, refresh from HitPay (one shared, rate-limited provider call per payment)
+        refresh_payment_status(payment)
 
         return ok(PaymentReadSerializer(payment).data, "Payment status")
 
-    def _mark_membership_paid(self, payment: MembershipPayment):
-        try:
-            membership = payment.membership
-            if not membership:
-                return
-            membership.is_payment_generated = True
-            # Transition to pending approval (12) if available
-            try:
-                membership.transition("12", reason="Payment completed via HitPay", actor=None, save_membership=True)
-            except Status.DoesNotExist:
-                membership.save(update_fields=["is_payment_generated", "modified_at"])
-            else:
-                membership.save(update_fields=["is_payment_generated", "workflow_status", "modified_at"])
-        except Exception:
-            pass
-
     @extend_schema(
         tags=["Payments"],
         request=CreateOfflinePaymentSerializer,
@@ -433,8 +452,8 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
     def create_offline_payment(self, request):
         membership = self.get_or_create_membership()
         # Prevent adding offline payment if membership is not editable
-        current_status = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
-        if current_status not in ("10", "11", "12", "13"):
+        current_status = workflow.status_code(membership)
+        if current_status not in workflow.OFFLINE_PAYMENT_ALLOWED:
             raise ValidationError({"detail": "Cannot record payment at this stage."})
         serializer = CreateOfflinePaymentSerializer(data=request.data, context={"membership": membership})
         serializer.is_valid(raise_exception=True)
@@ -454,8 +473,8 @@ class MembershipViewSet(mixins.RetrieveModelMixin,
             raise ValidationError({"receipt_image": "Payment slip image is required."})
         membership = self.get_or_create_membership()
         # Prevent uploading slip if membership is not editable
-        current_status = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
-        if current_status not in ("10", "11", "12"):
+        current_status = workflow.status_code(membership)
+        if current_status not in workflow.APPLICANT_EDITABLE:
             raise ValidationError({"detail": "Cannot upload payment slip at this stage."})
         data = request.data.copy()
         if "method" not in data or data["method"] not in {"cash", "bank_transfer"}:
@@ -531,61 +550,25 @@ class HitPayWebhookView(APIView):
         return super().dispatch(*args, **kwargs)
 
     def post(self, request):
+        body = request.body  # read before request.data so the raw bytes stay available
         payload = request.data
         ext_id = payload.get("id") or payload.get("payment_request_id")
-        status = (payload.get("status") or "").lower()
 
         if not ext_id:
             return fail("Missing payment ID.", status=400)
 
-        try:
-            payment = MembershipPayment.objects.get(external_id=ext_id, method="hitpay")
-        except MembershipPayment.DoesNotExist:
-            return fail("Payment not found.", status=404)
-
-        # Map provider status to our status
-        status_mapping = {
-            "succeeded": "paid",
-            "completed": "paid",
-            "pending": "created",
-            "failed": "failed",
-            "cancelled": "cancelled",
-        }
-
-        new_status = status_mapping.get(status, payment.status)
-        payment.status = new_status
-        payment.raw_response = payload
-
-        from django.utils import timezone
-        if new_status == "paid" and not payment.paid_at:
-            payment.paid_at = timezone.now()
-            self._mark_membership_paid(payment)
+        if not hitpay_signature_valid(payload, body, request.headers):
+            return fail("Invalid signature.", status=403)
 
-        payment.save()
-
-        # Send push notification via OneSignal if configured
-        try:
-            send_payment_notification(getattr(payment, "membership", None) and payment.membership.user, payment)
-        except Exception:
-            pass
+        # Unknown references are rejected before anything is stored
+        if not MembershipPayment.objects.filter(external_id=ext_id, method="hitpay").exists():
+            return fail("Payment not found.", status=404)
 
-        return ok(PaymentReadSerializer(payment).data, "Webhook processed successfully")
+        # Only record the delivery here; `manage.py process_webhooks` applies it.
+        # Retried deliveries are deduplicated on the event id and acknowledged the same way.
+        created = record_hitpay_event(payload, request.headers)
+        return ok({"duplicate": not created}, "Webhook received")
 
-    def _mark_membership_paid(self, payment: MembershipPayment):
-        try:
-            membership = payment.membership
-            if not membership:
-                return
-            membership.is_payment_generated = True
-            # Transition to pending approval (12) if available
-            try:
-                membership.transition("12", reason="Payment completed via HitPay", actor=None, save_membership=True)
-            except Status.DoesNotExist:
-                membership.save(update_fields=["is_payment_generated", "modified_at"])
-            else:
-                membership.save(update_fields=["is_payment_generated", "workflow_status", "modified_at"])
-        except Exception:
-            pass
 
 @extend_schema(tags=["Payments"], summary="HitPay payment status check")
 class PaymentStatusView(APIView):
@@ -612,7 +595,7 @@ from drf_spectacular.utils import (
         responses={200: MembershipReadSerializer},
         summary="Approve, Reject, or Revise a membership"
     )
-class ManagementMembershipViewSet(viewsets.GenericViewSet):
+class ManagementMembershipViewSet(ProfiledViewMixin, MembershipLookupMixin, viewsets.GenericViewSet):
     """
     Management-only actions on memberships.
     Kept separate from user-facing MembershipViewSet.
@@ -672,17 +655,20 @@ class ManagementMembershipViewSet(viewsets.GenericViewSet):
         target_status = serializer.validated_data["target_status"]
         comment = serializer.validated_data.get("comment", "")
 
-        membership.transition(
-            target_status,
-            reason=comment or "",
-            actor=request.user,
-            save_membership=True,
-        )
+        try:
+            membership.transition(
+                target_status,
+                reason=comment or "",
+                actor=request.user,
+                save_membership=True,
+            )
+        except workflow.InvalidTransition as exc:
+            raise ValidationError({"detail": str(exc)})
         membership.refresh_from_db()
 
-        if getattr(target_status, "status_code", None) == "12":
+        if getattr(target_status, "status_code", None) == workflow.PENDING_APPROVAL:
             self._mark_offline_payments_paid(membership)
-        elif getattr(target_status, "status_code", None) == "13":
+        elif getattr(target_status, "status_code", None) == workflow.REVISE:
             # If revised while in pending payment confirmation (17), mark payments failed and store reason
             self._mark_offline_payments_failed(membership, comment)
 
@@ -0,0 +1,7 @@
+from core.jobs import job
+from memberships.utils.onesignal import NOTIFICATION_JOB, deliver_notification
+
+
+@job(NOTIFICATION_JOB)
+def send_notification(payload):
+    deliver_notification(payload)
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from core.utils.encryption import decrypt_many, nric_blind_index, phone_blind_index
+from memberships.models import ContactInfo
+
+FIELDS = ["nric_fin_bidx", "primary_contact_bidx"]
+
+
+class Command(BaseCommand):
+    help = "Populate ContactInfo NRIC/FIN and phone blind indexes in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--all", action="store_true",
+                            help="Recompute every row (e.g. after changing BLIND_INDEX_KEY)")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        qs = ContactInfo.objects.all()
+        if not opts["all"]:
+            qs = qs.filter(
+                Q(nric_fin_bidx="", nric_fin_encrypted__gt="")
+                | Q(primary_contact_bidx="", primary_contact_encrypted__gt="")
+            )
+        qs = qs.order_by("pk").only("pk", "nric_fin_encrypted", "primary_contact_encrypted", *FIELDS)
+
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(qs.filter(pk__gt=last_pk)[:opts["batch_size"]])
+            if not batch:
+                break
+
+            nrics = decrypt_many(row.nric_fin_encrypted for row in batch)
+            phones = decrypt_many(row.primary_contact_encrypted for row in batch)
+            for row, nric_fin, phone in zip(batch, nrics, phones):
+                row.nric_fin_bidx = nric_blind_index(nric_fin)
+                row.primary_contact_bidx = phone_blind_index(phone)
+
+            with transaction.atomic():
+                ContactInfo.objects.bulk_update(batch, FIELDS)
+
+            updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"Indexed {updated} rows (last pk {last_pk})")
+
+        self.stdout.write(self.style.SUCCESS(f"Blind indexes populated for {updated} rows"))
@@ -0,0 +1,83 @@
+import time
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core.utils.encryption import encrypt_data, decrypt_data
+from memberships.models import ContactInfo, WorkInfo
+from memberships.services.decryption import prime_decryption
+
+# Property reads MembershipReadSerializer performs for a single membership row
+CONTACT_READS = (
+    "nric_fin", "nric_fin_masked",
+    "primary_contact", "primary_contact_masked",
+    "secondary_contact", "secondary_contact_masked",
+)
+WORK_READS = ("company_contact", "company_contact_masked")
+
+
+class Command(BaseCommand):
+    help = "Compare per-page decryption latency: per-property decrypt vs batched decrypt with plaintext cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Rows per page (default 100)")
+        parser.add_argument("--rounds", type=int, default=5, help="Pages to time; the best run is reported")
+
+    def handle(self, *args, **opts):
+        key = getattr(settings, "FERNET_KEY", "") or Fernet.generate_key().decode()
+        with override_settings(FERNET_KEY=key):
+            self._run(opts["rows"], opts["rounds"])
+
+    def _build_page(self, rows):
+        # Unsaved instances: only the encrypted columns matter here
+        page = []
+        for i in range(rows):
+            contact = ContactInfo(
+                nric_fin_encrypted=encrypt_data(f"S{i:07d}A"),
+                primary_contact_encrypted=encrypt_data(f"+6591{i:06d}"),
+                secondary_contact_encrypted=encrypt_data(f"+6597{i:06d}"),
+            )
+            work = WorkInfo(company_contact_encrypted=encrypt_data(f"+6566{i:06d}"))
+            page.append((contact, work))
+        return page
+
+    def _per_property(self, page):
+        # Old behaviour: every property read runs its own decrypt_data call
+        for contact, work in page:
+            for name in CONTACT_READS:
+                field = name.replace("_masked", "") + "_encrypted"
+                decrypt_data(getattr(contact, field))
+            for _ in WORK_READS:
+                decrypt_data(work.company_contact_encrypted)
+
+    def _batched(self, page):
+        prime_decryption([obj for pair in page for obj in pair])
+        for contact, work in page:
+            for name in CONTACT_READS:
+                getattr(contact, name)
+            for name in WORK_READS:
+                getattr(work, name)
+
+    def _time(self, fn, rows, rounds):
+        best = None
+        for _ in range(rounds):
+            page = self._build_page(rows)
+            started = time.perf_counter()
+            fn(page)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def _run(self, rows, rounds):
+        before = self._time(self._per_property, rows, rounds)
+        after = self._time(self._batched, rows, rounds)
+        decrypts_before = rows * (len(CONTACT_READS) + len(WORK_READS))
+        decrypts_after = rows * (len(ContactInfo.encrypted_fields) + len(WorkInfo.encrypted_fields))
+
+        self.stdout.write(f"Rows per page: {rows}")
+        self.stdout.write(f"Per-property decrypt: {before:.2f} ms/page ({decrypts_before} decryptions)")
+        self.stdout.write(f"Batched decrypt:      {after:.2f} ms/page ({decrypts_after} decryptions)")
+        if after:
+            self.stdout.write(self.style.SUCCESS(f"Speed-up: {before / after:.1f}x"))
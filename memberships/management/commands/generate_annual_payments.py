@@ -1,33 +1,81 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
-from memberships.models import Membership, MembershipPayment
+from memberships.models import Membership, MembershipPayment, PaymentLog
+
 
 class Command(BaseCommand):
-    help = "Generate yearly pending payments for all memberships"
+    help = (
+        "Generate yearly pending payments for all memberships. "
+        "Set-based: bulk inserts payments and their 'created' logs (model signals are not fired)."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("--year", type=int, default=timezone.now().year)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
 
     def handle(self, *args, **opts):
         year = opts["year"]
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        # Anti-join: active memberships with a priced type and no payment for the year
+        has_payment = MembershipPayment.objects.filter(membership=OuterRef("pk"), period_year=year)
+        qs = (
+            Membership.objects
+            .filter(is_active=True, membership_type__amount__isnull=False)
+            .filter(~Exists(has_payment))
+            .order_by("pk")
+            .values_list("pk", "membership_type__amount")
+        )
+
+        if opts["dry_run"]:
+            pending = qs.count()
+            self.stdout.write(self.style.SUCCESS(f"Would create {pending} payments for {year}"))
+            return
+
+        last_pk = 0
         created = 0
-        qs = Membership.objects.filter(is_active=True)
-        for m in qs:
-            amount = (m.membership_type.amount if m.membership_type and m.membership_type.amount is not None else None)
-            if amount is None:
-                continue  # or choose a default / log
-            # avoid duplicates for year
-            exists = MembershipPayment.objects.filter(membership=m, period_year=year).exists()
-            if exists:
-                continue
-            MembershipPayment.objects.create(
-                membership=m,
-                method="bank_transfer",    # generic pending invoice; user can switch to online later
-                status="pending",
-                amount=amount,
-                currency="SGD",
-                period_year=year,
-                description=f"Membership fee {year}",
-            )
-            created += 1
+        while True:
+            rows = list(qs.filter(pk__gt=last_pk)[:opts["batch_size"]])
+            if not rows:
+                break
+            created += self._create_batch(rows, year)
+            last_pk = rows[-1][0]
+            self.stdout.write(f"Created {created} payments (last membership pk {last_pk})")
+
         self.stdout.write(self.style.SUCCESS(f"Created {created} payments for {year}"))
+
+    def _create_batch(self, rows, year):
+        with transaction.atomic():
+            receipt_nos = MembershipPayment.allocate_receipt_nos(len(rows))
+            payments = [
+                MembershipPayment(
+                    membership_id=membership_id,
+                    method="bank_transfer",    # generic pending invoice; user can switch to online later
+                    status="pending",
+                    amount=amount,
+                    currency="SGD",
+                    period_year=year,
+                    description=f"Membership fee {year}",
+                    receipt_no=receipt_no,
+                )
+                for (membership_id, amount), receipt_no in zip(rows, receipt_nos)
+            ]
+            payments = MembershipPayment.objects.bulk_create(payments)
+
+            if any(payment.pk is None for payment in payments):
+                # Backends that can't return ids from bulk inserts
+                ids = dict(
+                    MembershipPayment.objects.filter(receipt_no__in=receipt_nos).values_list("receipt_no", "pk")
+                )
+                for payment in payments:
+                    payment.pk = ids[payment.receipt_no]
+
+            PaymentLog.objects.bulk_create(
+                PaymentLog(payment_id=payment.pk, old_status=None, new_status=payment.status, note="created")
+                for payment in payments
+            )
+        return len(payments)
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from memberships.services.webhooks import process_event_batch
+
+
+class Command(BaseCommand):
+    help = "Apply recorded HitPay webhook events in batches. Loops until interrupted unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the inbox once and exit")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the inbox is empty")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        try:
+            while True:
+                counts = process_event_batch(opts["batch_size"])
+                if counts:
+                    summary = ", ".join(f"{n} {state}" for state, n in sorted(counts.items()))
+                    self.stdout.write(f"Webhook events: {summary}")
+                elif opts["once"]:
+                    break
+                else:
+                    time.sleep(opts["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
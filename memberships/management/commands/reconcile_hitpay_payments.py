@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from memberships.models import MembershipPayment, PaymentLog
+from memberships.services.payments import HitPayClient
+from memberships.services.webhooks import HITPAY_STATUS_MAPPING, mark_membership_paid
+from memberships.utils.onesignal import queue_payment_notification
+
+FIELDS = ["status", "raw_response", "paid_at", "modified_at"]
+EXPIRED_NOTE = "expired after TTL"
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh created/pending HitPay payments from the provider with a bounded thread pool, "
+        "and cancel ones still unpaid after the TTL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent provider requests")
+        parser.add_argument("--ttl-hours", type=float, default=getattr(settings, "HITPAY_PAYMENT_TTL_HOURS", 48),
+                            help="Cancel payments still unpaid this long after creation")
+        parser.add_argument("--min-age", type=int, default=60,
+                            help="Skip payments created in the last N seconds (the payer may still be paying)")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1 or opts["workers"] < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+
+        now = timezone.now()
+        self.expire_before = now - timedelta(hours=opts["ttl_hours"])
+        self.client = HitPayClient()
+        qs = (
+            MembershipPayment.objects
+            .filter(method="hitpay", status__in=["created", "pending"], external_id__isnull=False,
+                    created_at__lte=now - timedelta(seconds=opts["min_age"]))
+            .exclude(external_id="")
+            .select_related("membership__user", "membership__workflow_status")
+            .order_by("pk")
+        )
+
+        totals = {"checked": 0, "updated": 0, "paid": 0, "expired": 0, "errors": 0}
+        last_pk = 0
+        with ThreadPoolExecutor(max_workers=opts["workers"]) as pool:
+            while True:
+                batch = list(qs.filter(pk__gt=last_pk)[:opts["batch_size"]])
+                if not batch:
+                    break
+                results = list(pool.map(self._fetch, batch))
+                counts = self._apply(batch, results, opts["dry_run"])
+                for key, value in counts.items():
+                    totals[key] += value
+                last_pk = batch[-1].pk
+                self.stdout.write(
+                    f"Checked {totals['checked']} payments (last pk {last_pk}): "
+                    f"{totals['updated']} updated, {totals['expired']} expired, {totals['errors']} errors"
+                )
+
+        verb = "Would update" if opts["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {totals['updated']} of {totals['checked']} payments "
+            f"({totals['paid']} paid, {totals['expired']} expired, {totals['errors']} provider errors)"
+        ))
+
+    def _fetch(self, payment):
+        # Runs in a worker thread: HTTP only, no database access
+        try:
+            return self.client.get_payment_request(payment.external_id), None
+        except Exception as exc:
+            return None, exc
+
+    def _decide(self, payment, data):
+        """Target status and log note for a payment given its provider state; None when unchanged"""
+        provider_status = (data.get("status") or "").lower()
+        new_status = HITPAY_STATUS_MAPPING.get(provider_status, payment.status)
+        note = f"reconciled ({provider_status or 'no status'})"
+        if new_status in ("created", "pending") and payment.created_at < self.expire_before:
+            new_status, note = "cancelled", EXPIRED_NOTE
+        if new_status == payment.status:
+            return None
+        return new_status, note
+
+    def _apply(self, batch, results, dry_run):
+        counts = {"checked": len(batch), "updated": 0, "paid": 0, "expired": 0, "errors": 0}
+        fetched = {}
+        for payment, (data, error) in zip(batch, results):
+            if error is not None:
+                # Never expire a payment whose provider state is unknown
+                counts["errors"] += 1
+            elif self._decide(payment, data) is not None:
+                fetched[payment.pk] = data
+
+        if dry_run:
+            for payment in batch:
+                if payment.pk in fetched:
+                    self._count(counts, *self._decide(payment, fetched[payment.pk]))
+            return counts
+        if not fetched:
+            return counts
+
+        now = timezone.now()
+        changed, logs, paid = [], [], []
+        with transaction.atomic():
+            # The batch was read before the provider round-trip; a webhook or poll may have
+            # settled some of these payments since. Lock the rows and decide on their current state.
+            locked = (
+                MembershipPayment.objects.select_for_update(of=("self",))
+                .filter(pk__in=list(fetched), status__in=["created", "pending"])
+                .select_related("membership__user", "membership__workflow_status")
+                .order_by("pk")
+            )
+            for payment in locked:
+                data = fetched[payment.pk]
+                decision = self._decide(payment, data)
+                if decision is None:
+                    continue
+                new_status, note = decision
+                self._count(counts, new_status, note)
+                old_status = payment.status
+                payment.status = new_status
+                payment.raw_response = data
+                payment.modified_at = now
+                if new_status == "paid":
+                    payment.paid_at = payment.paid_at or now
+                    paid.append(payment)
+                changed.append(payment)
+                logs.append(PaymentLog(payment=payment, old_status=old_status, new_status=new_status, note=note))
+
+            MembershipPayment.objects.bulk_update(changed, FIELDS)
+            PaymentLog.objects.bulk_create(logs)
+            # bulk_update skips the payment signals; advance memberships explicitly
+            for payment in paid:
+                mark_membership_paid(payment)
+                queue_payment_notification(payment.membership and payment.membership.user, payment)
+        return counts
+
+    @staticmethod
+    def _count(counts, new_status, note):
+        counts["updated"] += 1
+        if new_status == "paid":
+            counts["paid"] += 1
+        elif note == EXPIRED_NOTE:
+            counts["expired"] += 1
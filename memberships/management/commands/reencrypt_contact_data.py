@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.utils.encryption import is_current, reencrypt_data
+from memberships.models import ContactInfo, WorkInfo
+
+MODELS = {
+    "contact": ContactInfo,
+    "work": WorkInfo,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encrypt ContactInfo/WorkInfo columns under the primary FERNET key in the compact format. "
+        "Safe to interrupt: rerun with --start-after <last pk> to resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=["all", *MODELS], default="all")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--start-after", type=int, default=0,
+                            help="Resume after this primary key (only valid with a single --model)")
+        parser.add_argument("--force", action="store_true",
+                            help="Re-encrypt rows that are already current")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        if opts["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        if opts["start_after"] and opts["model"] == "all":
+            raise CommandError("--start-after requires --model contact or --model work")
+
+        names = list(MODELS) if opts["model"] == "all" else [opts["model"]]
+        for name in names:
+            self._reencrypt(name, MODELS[name], opts)
+
+    def _reencrypt(self, name, model, opts):
+        fields = list(model.encrypted_fields)
+        last_pk = opts["start_after"]
+        scanned = updated = 0
+
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", *fields)[:opts["batch_size"]]
+            )
+            if not batch:
+                break
+
+            changed = []
+            for row in batch:
+                dirty = False
+                for field in fields:
+                    value = getattr(row, field)
+                    if value and (opts["force"] or not is_current(value)):
+                        setattr(row, field, reencrypt_data(value))
+                        dirty = True
+                if dirty:
+                    changed.append(row)
+
+            if changed and not opts["dry_run"]:
+                with transaction.atomic():
+                    model.objects.bulk_update(changed, fields)
+
+            scanned += len(batch)
+            updated += len(changed)
+            last_pk = batch[-1].pk
+            self.stdout.write(f"{name}: scanned {scanned}, re-encrypted {updated} (last pk {last_pk})")
+
+        verb = "Would re-encrypt" if opts["dry_run"] else "Re-encrypted"
+        self.stdout.write(self.style.SUCCESS(f"{name}: {verb} {updated} of {scanned} rows"))
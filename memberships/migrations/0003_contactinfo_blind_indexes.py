@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0002_membershiptype_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactinfo',
+            name='nric_fin_bidx',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='contactinfo',
+            name='primary_contact_bidx',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0003_contactinfo_blind_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='membership',
+            name='reference_no',
+            field=models.CharField(blank=True, max_length=16, unique=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0004_membership_reference_no_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(default='hitpay', max_length=32)),
+                ('event_id', models.CharField(max_length=128)),
+                ('external_id', models.CharField(db_index=True, max_length=128)),
+                ('event_status', models.CharField(blank=True, max_length=32)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('received', 'Received'), ('processing', 'Processing'), ('processed', 'Processed'), ('coalesced', 'Coalesced'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='received', max_length=16)),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('result', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='memberships_status_0a951b_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='webhookevent',
+            constraint=models.UniqueConstraint(fields=('provider', 'event_id'), name='uniq_webhook_event'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0005_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0006_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['created_at', 'id'], name='memberships_created_d8e7f5_idx'),
+        ),
+    ]
@@ -5,10 +5,22 @@ from django.conf import settings
 from django.core.validators import RegexValidator
 from django.db import models, transaction
 from django.utils import timezone
-from core.models import AuditModel, Status
-from core.utils.encryption import encrypt_data, decrypt_data
-import random
-import string
+from core.models import AuditModel, Sequence, Status
+from core.utils.encryption import encrypt_data, decrypt_data, nric_blind_index, phone_blind_index
+from memberships.utils.reference import allocate_reference_nos
+from memberships import workflow
+from core.utils.status_registry import registry as status_registry
+
+
+def _highest_suffix(model, field, prefix):
+    """Largest numeric suffix already used for prefix (seeds a new Sequence)"""
+    highest = 0
+    values = model.objects.filter(**{f"{field}__startswith": prefix}).values_list(field, flat=True)
+    for value in values.iterator():
+        suffix = value[len(prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
 
 
 class EducationLevel(AuditModel):
@@ -74,7 +86,41 @@ class PersonalInfo(AuditModel):
         )
 
 
-class ContactInfo(AuditModel):
+class DecryptedFieldsMixin:
+    """
+    Memoizes decrypted ``*_encrypted`` columns on the instance, keyed by the
+    ciphertext, so each column is decrypted at most once per value.
+    """
+    encrypted_fields = ()
+
+    def _decrypted(self, field_name):
+        encrypted = getattr(self, field_name)
+        if not encrypted:
+            return None
+        cache = self.__dict__.setdefault("_decrypted_cache", {})
+        cached = cache.get(field_name)
+        if cached is None or cached[0] != encrypted:
+            cached = (encrypted, decrypt_data(encrypted))
+            cache[field_name] = cached
+        return cached[1]
+
+    def _set_encrypted(self, field_name, value):
+        """Encrypt value into field_name and remember the plaintext"""
+        if value:
+            encrypted = encrypt_data(value)
+            self.__dict__.setdefault("_decrypted_cache", {})[field_name] = (encrypted, value)
+        else:
+            encrypted = ""
+        setattr(self, field_name, encrypted)
+
+    def _prime_decrypted(self, field_name, plaintext):
+        """Store an already decrypted value (used by bulk decryption)"""
+        encrypted = getattr(self, field_name)
+        if encrypted:
+            self.__dict__.setdefault("_decrypted_cache", {})[field_name] = (encrypted, plaintext)
+
+
+class ContactInfo(DecryptedFieldsMixin, AuditModel):
     RESIDENTIAL_STATUS_CHOICES = [
         ('singaporean', 'Singaporean'),
         ('permanent_resident', 'Permanent Resident'),
@@ -92,6 +138,12 @@ class ContactInfo(AuditModel):
     primary_contact_encrypted = models.TextField()  # Encrypted primary contact
     secondary_contact_encrypted = models.TextField(blank=True, null=True)  # Encrypted secondary contact
 
+    encrypted_fields = ("nric_fin_encrypted", "primary_contact_encrypted", "secondary_contact_encrypted")
+
+    # Blind indexes (keyed HMAC of the normalized plaintext) for exact-match search
+    nric_fin_bidx = models.CharField(max_length=64, blank=True, default="", db_index=True, editable=False)
+    primary_contact_bidx = models.CharField(max_length=64, blank=True, default="", db_index=True, editable=False)
+
     residential_status = models.CharField(max_length=255, choices=RESIDENTIAL_STATUS_CHOICES, null=True, blank=True)
     postal_code = models.CharField(max_length=255, null=True, blank=True)
     address = models.TextField(null=True, blank=True)
@@ -106,17 +158,13 @@ class ContactInfo(AuditModel):
     @property
     def nric_fin(self):
         """Get decrypted NRIC/FIN"""
-        if self.nric_fin_encrypted:
-            return decrypt_data(self.nric_fin_encrypted)
-        return None
+        return self._decrypted("nric_fin_encrypted")
 
     @nric_fin.setter
     def nric_fin(self, value):
         """Set encrypted NRIC/FIN"""
-        if value:
-            self.nric_fin_encrypted = encrypt_data(value)
-        else:
-            self.nric_fin_encrypted = ""
+        self._set_encrypted("nric_fin_encrypted", value)
+        self.nric_fin_bidx = nric_blind_index(value) if value else ""
 
     @property
     def nric_fin_masked(self):
@@ -129,17 +177,13 @@ class ContactInfo(AuditModel):
     @property
     def primary_contact(self):
         """Get decrypted primary contact"""
-        if self.primary_contact_encrypted:
-            return decrypt_data(self.primary_contact_encrypted)
-        return None
+        return self._decrypted("primary_contact_encrypted")
 
     @primary_contact.setter
     def primary_contact(self, value):
         """Set encrypted primary contact"""
-        if value:
-            self.primary_contact_encrypted = encrypt_data(value)
-        else:
-            self.primary_contact_encrypted = ""
+        self._set_encrypted("primary_contact_encrypted", value)
+        self.primary_contact_bidx = phone_blind_index(value) if value else ""
 
     @property
     def primary_contact_masked(self):
@@ -152,17 +196,12 @@ class ContactInfo(AuditModel):
     @property
     def secondary_contact(self):
         """Get decrypted secondary contact"""
-        if self.secondary_contact_encrypted:
-            return decrypt_data(self.secondary_contact_encrypted)
-        return None
+        return self._decrypted("secondary_contact_encrypted")
 
     @secondary_contact.setter
     def secondary_contact(self, value):
         """Set encrypted secondary contact"""
-        if value:
-            self.secondary_contact_encrypted = encrypt_data(value)
-        else:
-            self.secondary_contact_encrypted = ""
+        self._set_encrypted("secondary_contact_encrypted", value)
 
     @property
     def secondary_contact_masked(self):
@@ -173,7 +212,7 @@ class ContactInfo(AuditModel):
         return decrypted
 
 
-class WorkInfo(AuditModel):
+class WorkInfo(DecryptedFieldsMixin, AuditModel):
     occupation = models.CharField(max_length=255, null=True, blank=True)
     company_name = models.CharField(max_length=255, null=True, blank=True)
     company_address = models.TextField(null=True, blank=True)
@@ -182,6 +221,8 @@ class WorkInfo(AuditModel):
     # Encrypted company contact
     company_contact_encrypted = models.TextField(blank=True, null=True)
 
+    encrypted_fields = ("company_contact_encrypted",)
+
     class Meta:
         verbose_name = "Work Info"
 
@@ -191,17 +232,12 @@ class WorkInfo(AuditModel):
     @property
     def company_contact(self):
         """Get decrypted company contact"""
-        if self.company_contact_encrypted:
-            return decrypt_data(self.company_contact_encrypted)
-        return None
+        return self._decrypted("company_contact_encrypted")
 
     @company_contact.setter
     def company_contact(self, value):
         """Set encrypted company contact"""
-        if value:
-            self.company_contact_encrypted = encrypt_data(value)
-        else:
-            self.company_contact_encrypted = ""
+        self._set_encrypted("company_contact_encrypted", value)
 
     @property
     def company_contact_masked(self):
@@ -230,8 +266,10 @@ class EducationInfo(AuditModel):
 
 class Membership(AuditModel):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True)
-    reference_no = models.CharField(max_length=12, unique=True, blank=True)
+    reference_no = models.CharField(max_length=16, unique=True, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', null=True, blank=True)
+    # Resized copies, filled in by the image derivatives job (core.utils.images)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     applied_date = models.DateField(auto_now_add=True)
     membership_type = models.ForeignKey(MembershipType, on_delete=models.SET_NULL, blank=True, null=True)
     membership_number = models.CharField(max_length=255, null=True, blank=True)
@@ -257,12 +295,13 @@ class Membership(AuditModel):
         super().save(*args, **kwargs)
 
     def generate_reference_no(self):
-        """Generate a unique reference number"""
-        while True:
-            number = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-            ref_no = f"BMR-{number}"
-            if not type(self).objects.filter(reference_no=ref_no).exists():
-                return ref_no
+        """Generate a unique reference number (see memberships.utils.reference)"""
+        return self.allocate_reference_nos(1)[0]
+
+    @staticmethod
+    def allocate_reference_nos(count):
+        """Reserve ``count`` reference numbers up front, e.g. for imports and bulk_create"""
+        return allocate_reference_nos(count)
 
     def generate_membership_number(self):
         """Generate membership number when approved"""
@@ -273,9 +312,11 @@ class Membership(AuditModel):
         type_code = getattr(self.membership_type, "code", None) or getattr(self.membership_type, "name", "")[:2].upper() or "GEN"
         prefix = f"{type_code}"
 
-        # Find next sequence for this type
-        existing = Membership.objects.filter(membership_number__startswith=prefix).count()
-        next_seq = existing + 1
+        # Next number from the per-prefix counter (seeded once from existing numbers)
+        next_seq = Sequence.next_value(
+            f"membership_number:{prefix}",
+            initial=lambda: _highest_suffix(Membership, "membership_number", f"{prefix}-"),
+        )
         self.membership_number = f"{prefix}-{next_seq:04d}"
         return self.membership_number
 
@@ -295,10 +336,9 @@ class Membership(AuditModel):
 
     def can_edit(self):
         """Check if membership can be edited"""
-        if not self.workflow_status:
-            return True
-        # Allow editing before approved & revise (status code 13)
-        return int(self.workflow_status.status_code) <= 13
+        code = workflow.status_code(self)
+        # Allow editing up to and including revise (status code 13)
+        return code is None or code in workflow.EDITABLE
 
     def is_all_sections_completed(self):
         """Check if all required sections are completed"""
@@ -308,15 +348,19 @@ class Membership(AuditModel):
                 self.is_work_completed)
 
     def transition(self, new_status, *, reason: str | None = None, actor=None, save_membership: bool = True):
-        """Transition to a new Status"""
+        """
+        Transition to a new Status (a Status or status code).
+        Raises Status.DoesNotExist for unknown codes and workflow.InvalidTransition
+        for moves the transition table does not allow.
+        """
         if isinstance(new_status, str):
-            new_status = Status.objects.get(status_code=new_status)
+            new_status = status_registry.get(new_status)
+        workflow.check_transition(workflow.status_code(self), new_status.status_code)
 
         with transaction.atomic():
-            old_status = self.workflow_status
 
-            # Generate membership number when approved (status code 12)
-            if new_status.status_code == "16" and not self.membership_number:
+            # Generate membership number when approved
+            if new_status.status_code == workflow.APPROVED and not self.membership_number:
                 self.generate_membership_number()
 
             self.workflow_status = new_status
@@ -337,6 +381,10 @@ class Membership(AuditModel):
             # )
         return self
 
+    class Meta:
+        # Keyset pagination (core.utils.pagination.CursorResultsSetPagination)
+        indexes = [models.Index(fields=["created_at", "id"])]
+
     def __str__(self):
         return f"{self.user.username} - {self.reference_no}"
 
@@ -383,17 +431,31 @@ class MembershipPayment(AuditModel):
     raw_response = models.JSONField(blank=True, null=True)
 
     def save(self, *args, **kwargs):
-        if not self.receipt_no:
+        if self.receipt_no:
+            return super().save(*args, **kwargs)
+        # Allocate the number in the same transaction as the insert so a failed save doesn't leave a gap
+        with transaction.atomic():
             self.receipt_no = self.generate_receipt_no()
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
 
-    def generate_receipt_no(self):
+    @staticmethod
+    def receipt_prefix():
         year = timezone.now().year % 100
-        prefix = f"BMR-{year:02d}-"
-        year_receipts = MembershipPayment.objects.filter(
-            receipt_no__startswith=prefix
-        ).count() + 1
-        return f"{prefix}{year_receipts:03d}"
+        return f"BMR-{year:02d}-"
+
+    @classmethod
+    def allocate_receipt_nos(cls, count):
+        """Reserve ``count`` consecutive receipt numbers for the current year"""
+        prefix = cls.receipt_prefix()
+        last = Sequence.next_value(
+            f"receipt_no:{prefix}",
+            count=count,
+            initial=lambda: _highest_suffix(cls, "receipt_no", prefix),
+        )
+        return [f"{prefix}{seq:03d}" for seq in range(last - count + 1, last + 1)]
+
+    def generate_receipt_no(self):
+        return self.allocate_receipt_nos(1)[0]
 
     def __str__(self):
         reference_no = ''
@@ -412,6 +474,42 @@ class PaymentLog(AuditModel):
         return f"{self.payment_id} {self.old_status} -> {self.new_status}"
 
 
+class WebhookEvent(models.Model):
+    """
+    Append-only inbox of provider webhook deliveries, unique per (provider, event_id).
+    Written by the webhook view and applied in batches by ``manage.py process_webhooks``.
+    """
+    STATUS_CHOICES = (
+        ("received", "Received"),
+        ("processing", "Processing"),
+        ("processed", "Processed"),
+        ("coalesced", "Coalesced"),
+        ("ignored", "Ignored"),
+        ("failed", "Failed"),
+    )
+
+    provider = models.CharField(max_length=32, default="hitpay")
+    event_id = models.CharField(max_length=128)
+    external_id = models.CharField(max_length=128, db_index=True)
+    event_status = models.CharField(max_length=32, blank=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default="received")
+    claim_token = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    result = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "event_id"], name="uniq_webhook_event"),
+        ]
+        indexes = [models.Index(fields=["status", "id"])]
+
+    def __str__(self):
+        return f"{self.provider} {self.event_id} ({self.status})"
+
+
 class WorkflowLog(AuditModel):
     membership = models.ForeignKey(Membership, on_delete=models.SET_NULL, null=True)
     old_status = models.ForeignKey(Status, on_delete=models.SET_NULL, blank=True, null=True,
@@ -1,27 +1,23 @@
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import post_save
+from django.db import transaction
 from django.dispatch import receiver
 
 from core.models import Status
+from core.utils.status_registry import registry as status_registry
+from memberships import workflow
 from memberships.models import MembershipPayment, PaymentLog
-
-@receiver(pre_save, sender=MembershipPayment)
-def _capture_payment_status(sender, instance: MembershipPayment, **kwargs):
-    if instance.pk:
-        try:
-            prev = MembershipPayment.objects.only("status").get(pk=instance.pk)
-            instance._prev_status = prev.status
-        except MembershipPayment.DoesNotExist:
-            instance._prev_status = None
-    else:
-        instance._prev_status = None
+from memberships.services.payment_events import publish
 
 @receiver(post_save, sender=MembershipPayment)
-def _log_payment_status(sender, instance: MembershipPayment, created: bool, **kwargs):
-    prev = getattr(instance, "_prev_status", None)
+def _log_payment_status(sender, instance: MembershipPayment, created: bool, update_fields=None, **kwargs):
+    if update_fields is not None and "status" not in update_fields:
+        return
     if created:
         PaymentLog.objects.create(payment=instance, old_status=None, new_status=instance.status, note="created")
-    elif prev != instance.status:
-        PaymentLog.objects.create(payment=instance, old_status=prev, new_status=instance.status)
+    elif instance.has_changed("status"):
+        PaymentLog.objects.create(payment=instance, old_status=instance.previous("status"), new_status=instance.status)
+        # Wake live status streams in this process once the change is visible to them
+        transaction.on_commit(lambda: publish(instance.uuid))
 
 
 @receiver(post_save, sender=MembershipPayment)
@@ -29,10 +25,14 @@ def _maybe_advance_membership(sender, instance: MembershipPayment, created: bool
     # when a payment turns paid, move membership to next status (e.g., "pending_approval": code "12")
     if instance.status == "paid":
         m = instance.membership
+        if m is None:
+            return
+        current = workflow.status_code(m)
+        # e.g. a renewal paid by an approved member must not reopen their application
+        if current == workflow.PENDING_APPROVAL or not workflow.can_transition(current, workflow.PENDING_APPROVAL):
+            return
         try:
-            next_status = Status.objects.get(status_code="12")  # adjust to your next step
+            m.workflow_status = status_registry.get(workflow.PENDING_APPROVAL)
         except Status.DoesNotExist:
             return
-        if not m.workflow_status or m.workflow_status.status_code != "12":
-            m.workflow_status = next_status
-            m.save()
\ No newline at end of file
+        m.save()
\ No newline at end of file
@@ -0,0 +1,33 @@
+from core.utils.encryption import decrypt_many
+
+
+def prime_decryption(instances):
+    """
+    Decrypt every encrypted column of the given ContactInfo / WorkInfo rows in
+    one pass and cache the plaintext on each instance, so later property reads
+    (``nric_fin``, ``primary_contact_masked``, ...) never hit Fernet again.
+    """
+    targets = []
+    for obj in instances:
+        if obj is None:
+            continue
+        for field_name in getattr(obj, "encrypted_fields", ()):
+            encrypted = getattr(obj, field_name)
+            if encrypted:
+                targets.append((obj, field_name, encrypted))
+
+    if not targets:
+        return
+
+    plaintexts = decrypt_many(encrypted for _, _, encrypted in targets)
+    for (obj, field_name, _), plaintext in zip(targets, plaintexts):
+        obj._prime_decrypted(field_name, plaintext)
+
+
+def prime_membership_decryption(memberships):
+    """Bulk-decrypt the contact and work info attached to a page of memberships"""
+    related = []
+    for membership in memberships:
+        related.append(membership.contact_info)
+        related.append(membership.work_info)
+    prime_decryption(related)
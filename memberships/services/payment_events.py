@@ -0,0 +1,44 @@
+"""
+In-process wake-ups for payment status streams.
+
+``publish`` runs after a payment save commits (see payment_signals) and wakes
+every stream in this process that is watching that payment. Changes made by
+other processes (webhook worker, reconciler) are picked up by the streams'
+periodic database check instead.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_subscribers = defaultdict(set)
+
+
+def subscribe(key):
+    """Return an asyncio.Event set whenever payment ``key`` is published (call from a running loop)"""
+    event = asyncio.Event()
+    with _lock:
+        _subscribers[str(key)].add((asyncio.get_running_loop(), event))
+    return event
+
+
+def unsubscribe(key, event):
+    key = str(key)
+    with _lock:
+        watchers = _subscribers.get(key)
+        if not watchers:
+            return
+        watchers.difference_update({item for item in watchers if item[1] is event})
+        if not watchers:
+            del _subscribers[key]
+
+
+def publish(key):
+    with _lock:
+        watchers = list(_subscribers.get(str(key), ()))
+    for loop, event in watchers:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # Loop already closed; the stream's finally block will unsubscribe
+            pass
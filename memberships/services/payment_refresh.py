@@ -0,0 +1,83 @@
+"""
+Provider refresh for polled HitPay payments.
+
+Polls for the same payment share one provider call: concurrent polls in a
+process wait for the in-flight call (single-flight), and for
+HITPAY_REFRESH_INTERVAL seconds afterwards every poll, in any process
+sharing the cache, is answered from the cached result.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.utils.profiling import counters
+from core.utils.singleflight import SingleFlight
+from memberships.services.payments import HitPayClient
+from memberships.services.webhooks import HITPAY_STATUS_MAPPING, mark_membership_paid
+
+logger = logging.getLogger(__name__)
+
+REFRESHED_FIELDS = ("status", "raw_response", "paid_at")
+
+_flight = SingleFlight()
+
+
+def _interval():
+    return getattr(settings, "HITPAY_REFRESH_INTERVAL", 5)
+
+
+def _fetch_and_apply(payment):
+    """Leader path: call HitPay at most once per interval; returns the refreshed field values"""
+    lock_key = f"hitpay:refresh:lock:{payment.external_id}"
+    result_key = f"hitpay:refresh:result:{payment.external_id}"
+
+    if not cache.add(lock_key, 1, timeout=_interval()):
+        counters.incr("hitpay.refresh.throttled")
+        return cache.get(result_key)
+
+    counters.incr("hitpay.refresh.provider_calls")
+    try:
+        data = HitPayClient().get_payment_request(payment.external_id)
+    except Exception as exc:
+        # Keep the lock: during a provider outage polls back off for the interval too
+        counters.incr("hitpay.refresh.provider_errors")
+        logger.warning("HitPay refresh failed for %s: %s", payment.external_id, exc)
+        return None
+
+    status_val = (data.get("status") or "").lower()
+    mapped_status = HITPAY_STATUS_MAPPING.get(status_val, payment.status)
+    payment.status = mapped_status
+    payment.raw_response = data
+    if mapped_status == "paid" and not payment.paid_at:
+        payment.paid_at = timezone.now()
+    if mapped_status == "paid" and payment.membership:
+        mark_membership_paid(payment)
+    payment.save(update_fields=[*REFRESHED_FIELDS, "modified_at"])
+
+    result = {field: getattr(payment, field) for field in REFRESHED_FIELDS}
+    cache.set(result_key, result, timeout=_interval())
+    return result
+
+
+def refresh_payment_status(payment):
+    """Refresh an unpaid HitPay payment from the provider (rate-limited); updates it in place"""
+    if payment.status == "paid" or not payment.external_id:
+        return payment
+
+    counters.incr("hitpay.refresh.requests")
+    try:
+        result, shared = _flight.do(
+            payment.external_id, lambda: _fetch_and_apply(payment), timeout=_interval() * 4
+        )
+    except Exception:
+        logger.exception("HitPay refresh failed for %s", payment.external_id)
+        return payment
+
+    if shared:
+        counters.incr("hitpay.refresh.shared")
+    if result:
+        for field, value in result.items():
+            setattr(payment, field, value)
+    return payment
@@ -1,6 +1,7 @@
-import requests
 from django.conf import settings
 
+from core.utils.http import get_client
+
 class HitPayClient:
     def __init__(self):
         self.api_key = settings.HITPAY_API_KEY
@@ -9,6 +10,7 @@ class HitPayClient:
             "X-BUSINESS-API-KEY": self.api_key,
             "Content-Type": "application/json",
         }
+        self.http = get_client("hitpay")
 
     def create_charge(self, amount, currency="sgd", **kwargs):
         url = f"{self.base_url}/charges"
@@ -18,13 +20,13 @@ class HitPayClient:
             # include other required fields per the docs...
             **kwargs
         }
-        resp = requests.post(url, json=data, headers=self.headers)
+        resp = self.http.post(url, json=data, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
     def get_webhook_event(self, event_id):
         url = f"{self.base_url}/webhook-events/{event_id}"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.http.get(url, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
@@ -33,7 +35,7 @@ class HitPayClient:
         Fetch a payment request status by its HitPay ID.
         """
         url = f"{self.base_url}/payment-requests/{payment_id}"
-        resp = requests.get(url, headers=self.headers)
+        resp = self.http.get(url, headers=self.headers)
         resp.raise_for_status()
         return resp.json()
 
@@ -85,7 +87,7 @@ class HitPayClient:
         if expiry_date:
             body["expiry_date"] = expiry_date
 
-        resp = requests.post(url, json=body, headers=self.headers)
+        resp = self.http.post(url, json=body, headers=self.headers)
         # print("resp", resp)
         resp.raise_for_status()
 
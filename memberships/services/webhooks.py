@@ -0,0 +1,208 @@
+"""
+HitPay webhook inbox: record deliveries fast, apply them later in batches.
+
+Deliveries are deduplicated on the provider event id (or a hash of the
+payload when the provider doesn't send one, so retried deliveries of the
+same body collapse). The worker coalesces all pending events for a payment
+into one state change.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Status
+from memberships import workflow
+from memberships.models import MembershipPayment, WebhookEvent
+from memberships.utils.onesignal import queue_payment_notification
+
+logger = logging.getLogger(__name__)
+
+# Map provider status to our status
+HITPAY_STATUS_MAPPING = {
+    "succeeded": "paid",
+    "completed": "paid",
+    "pending": "created",
+    "failed": "failed",
+    "cancelled": "cancelled",
+}
+
+
+def hitpay_event_id(payload, headers=None):
+    event_id = (headers or {}).get("Hitpay-Event-Id") or payload.get("event_id")
+    if event_id:
+        return str(event_id)
+    canonical = json.dumps(payload, sort_keys=True, default=str)
+    return "sha256:" + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def hitpay_signature_valid(payload, body=b"", headers=None):
+    """
+    Check a delivery against HITPAY_SALT: the Hitpay-Signature header (HMAC-SHA256
+    of the raw JSON body) or, for form-encoded deliveries, the ``hmac`` field
+    (HMAC-SHA256 of the key/value pairs sorted by key). True when no salt is configured.
+    """
+    salt = getattr(settings, "HITPAY_SALT", "")
+    if not salt:
+        return True
+    signature = (headers or {}).get("Hitpay-Signature")
+    if signature:
+        message = body
+    else:
+        signature = payload.get("hmac")
+        message = "".join(f"{key}{payload[key]}" for key in sorted(payload) if key != "hmac").encode()
+    if not signature:
+        return False
+    expected = hmac.new(salt.encode(), message, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, str(signature))
+
+
+def record_hitpay_event(payload, headers=None):
+    """
+    Insert the delivery into the inbox; returns False if it was already recorded.
+    A single INSERT, no reads.
+    """
+    payload = payload.dict() if hasattr(payload, "dict") else dict(payload)  # form-encoded QueryDict
+    ext_id = payload.get("id") or payload.get("payment_request_id")
+    event = WebhookEvent(
+        provider="hitpay",
+        event_id=hitpay_event_id(payload, headers),
+        external_id=str(ext_id),
+        event_status=(payload.get("status") or "").lower(),
+        payload=payload,
+    )
+    try:
+        with transaction.atomic():
+            event.save(force_insert=True)
+    except IntegrityError:
+        return False
+    return True
+
+
+def claim_events(limit):
+    """
+    Claim up to ``limit`` received events for this worker (oldest first).
+    Events left processing longer than WEBHOOK_LOCK_TIMEOUT (crashed worker)
+    are claimed again.
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "WEBHOOK_LOCK_TIMEOUT", 600))
+    claimable = Q(status="received") | Q(status="processing", locked_at__lt=stale) | Q(
+        status="processing", locked_at__isnull=True
+    )
+    ids = list(WebhookEvent.objects.filter(claimable).order_by("pk").values_list("pk", flat=True)[:limit])
+    if not ids:
+        return []
+    # Re-checking the claimable condition in the UPDATE keeps two workers off the same row
+    WebhookEvent.objects.filter(claimable, pk__in=ids).update(status="processing", claim_token=token, locked_at=now)
+    return list(WebhookEvent.objects.filter(claim_token=token, status="processing").order_by("pk"))
+
+
+def _coalesce(events):
+    """
+    Pick the event that decides the payment's state: the latest one, except
+    that a 'paid' event is never overridden by a later non-paid one.
+    """
+    decisive = events[-1]
+    for event in events:
+        if HITPAY_STATUS_MAPPING.get(event.event_status) == "paid":
+            decisive = event
+    return decisive
+
+
+def mark_membership_paid(payment: MembershipPayment):
+    membership = payment.membership
+    if not membership:
+        return
+    membership.is_payment_generated = True
+    fields = ["is_payment_generated", "modified_at"]
+    # Move to pending approval when the workflow allows it; never blocks recording the payment
+    try:
+        current = workflow.status_code(membership)
+        # e.g. a renewal paid by an approved member must not reopen their application
+        if current != workflow.PENDING_APPROVAL and workflow.can_transition(current, workflow.PENDING_APPROVAL):
+            membership.transition(workflow.PENDING_APPROVAL, reason="Payment completed via HitPay",
+                                  save_membership=False)
+            fields += ["workflow_status", "reason"]
+    except Status.DoesNotExist:
+        pass
+    membership.save(update_fields=fields)
+
+
+def _apply(payment, event):
+    """Apply the decisive event to its payment; returns a short result note"""
+    new_status = HITPAY_STATUS_MAPPING.get(event.event_status, payment.status)
+    if payment.status == "paid" and new_status != "paid":
+        return f"kept paid (ignored {event.event_status or 'empty status'})"
+
+    changed = new_status != payment.status
+    payment.status = new_status
+    payment.raw_response = event.payload
+    if new_status == "paid" and not payment.paid_at:
+        payment.paid_at = timezone.now()
+        mark_membership_paid(payment)
+    payment.save(update_fields=["status", "raw_response", "paid_at", "modified_at"])
+
+    if changed:
+        queue_payment_notification(payment.membership and payment.membership.user, payment)
+    return f"status {new_status}" if changed else "no change"
+
+
+def process_event_batch(limit=100):
+    """
+    Claim and apply one batch of inbox events.
+    Returns a dict of counts per resulting event status.
+    """
+    events = claim_events(limit)
+    if not events:
+        return {}
+
+    by_external_id = {}
+    for event in events:
+        by_external_id.setdefault(event.external_id, []).append(event)
+
+    payment_ids = dict(
+        MembershipPayment.objects
+        .filter(method="hitpay", external_id__in=list(by_external_id))
+        .values_list("external_id", "pk")
+    )
+    payments = MembershipPayment.objects.select_related("membership__user", "membership__workflow_status")
+
+    now = timezone.now()
+    for external_id, group in by_external_id.items():
+        payment_id = payment_ids.get(external_id)
+        decisive = _coalesce(group)
+        for event in group:
+            event.processed_at = now
+            if payment_id is None:
+                event.status, event.result = "ignored", "payment not found"
+            elif event is not decisive:
+                event.status, event.result = "coalesced", f"superseded by event {decisive.pk}"
+
+        if payment_id is None:
+            continue
+        try:
+            with transaction.atomic():
+                # Lock the row so the paid guard in _apply sees the current status, not one
+                # read before another worker, reclaimed event or reconcile run changed it
+                payment = payments.select_for_update(of=("self",)).get(pk=payment_id)
+                decisive.result = _apply(payment, decisive)
+            decisive.status = "processed"
+        except Exception as exc:
+            logger.exception("Failed to apply webhook event %s", decisive.pk)
+            decisive.status, decisive.result = "failed", repr(exc)
+
+    WebhookEvent.objects.bulk_update(events, ["status", "result", "processed_at"])
+
+    counts = {}
+    for event in events:
+        counts[event.status] = counts.get(event.status, 0) + 1
+    return counts
@@ -1,35 +1,26 @@
 # memberships/signals.py - FIXED VERSION
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 
 from core.middleware import get_current_user
+from memberships import workflow
 from memberships.models import Membership, WorkflowLog
 
 User = get_user_model()
 
-@receiver(pre_save, sender=Membership)
-def _capture_previous_status(sender, instance: Membership, **kwargs):
-    """
-    Before saving, capture the previous workflow_status_id so post_save can detect changes.
-    """
-    if instance.pk:
-        try:
-            prev = Membership.objects.only("workflow_status").get(pk=instance.pk)
-            instance._prev_workflow_status_id = prev.workflow_status_id
-        except Membership.DoesNotExist:
-            instance._prev_workflow_status_id = None
-    else:
-        instance._prev_workflow_status_id = None
-
-
 @receiver(post_save, sender=Membership)
-def _log_status_change(sender, instance: Membership, created: bool, **kwargs):
+def _log_status_change(sender, instance: Membership, created: bool, update_fields=None, **kwargs):
     """
     If workflow_status changed, insert a WorkflowLog entry.
     Uses CurrentUserMiddleware to attribute action_by when possible.
     """
-    prev_id = getattr(instance, "_prev_workflow_status_id", None)
+    # Nested saves of other columns (e.g. membership_number below) must not log again
+    if update_fields is not None and "workflow_status" not in update_fields:
+        return
+
+    # Loaded value from the model's field snapshot (None when just created); no query
+    prev_id = None if created else instance.previous("workflow_status")
     curr_id = instance.workflow_status_id
 
     # Only log when status actually changed (and not just created with no status)
@@ -41,26 +32,17 @@ def _log_status_change(sender, instance: Membership, created: bool, **kwargs):
     if actor and not getattr(actor, "is_authenticated", False):
         actor = None
 
-    # Get the previous status object if it exists
-    old_status = None
-    if prev_id:
-        try:
-            from core.models import Status
-            old_status = Status.objects.get(id=prev_id)
-        except Status.DoesNotExist:
-            old_status = None
-
     WorkflowLog.objects.create(
         membership=instance,
-        old_status=old_status,  # ForeignKey to Status
-        new_status=instance.workflow_status,  # ForeignKey to Status
+        old_status_id=prev_id,  # ForeignKey to Status
+        new_status_id=curr_id,  # ForeignKey to Status
         action_by=actor,
         reason=instance.reason,  # optional: copy membership.reason if you use it
     )
 
-    # If membership just moved to Approved (status_code == "13"), ensure membership_number exists
+    # If membership just moved to Revise for Review (status_code == "13"), ensure membership_number exists
     try:
-        if instance.workflow_status and getattr(instance.workflow_status, 'status_code', None) == "13":
+        if workflow.status_code(instance) == workflow.REVISE:
             if not instance.membership_number:
                 # generate_membership_number sets the field but does not persist by itself
                 instance.generate_membership_number()
@@ -1,3 +1,314 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from cryptography.fernet import Fernet
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from authentication.models import User
+from core.models import Status
+from memberships import workflow
+from memberships.management.commands.reconcile_hitpay_payments import Command as ReconcileCommand
+from memberships.models import (
+    ContactInfo, EducationInfo, Membership, MembershipPayment, PaymentLog, WebhookEvent, WorkInfo
+)
+from memberships.services import webhooks
+from memberships.utils import reference
+from memberships.services.webhooks import claim_events, mark_membership_paid, process_event_batch
+
+
+def create_membership(index, payments=2):
+    user = User.objects.create(email=f"member{index}@example.com", username=f"member{index}")
+    contact = ContactInfo(nric_fin="S7654321B", primary_contact="+6591234567")
+    contact.save()
+    work = WorkInfo(company_contact="+6566667777")
+    work.save()
+    membership = Membership.objects.create(
+        user=user, contact_info=contact, work_info=work, education_info=EducationInfo.objects.create()
+    )
+    for year in range(2024, 2024 + payments):
+        MembershipPayment.objects.create(membership=membership, method="cash", amount=1, period_year=year)
+    return membership
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="")
+class MembershipListQueryTests(TestCase):
+    url = "/api/membership/"
+
+    def setUp(self):
+        staff = User.objects.create(email="staff@example.com", username="staff", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(staff)
+
+    def list_queries(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_payments_included_by_default(self):
+        create_membership(0)
+        response, _ = self.list_queries()
+        row = response.data["data"]["results"][0]
+        self.assertEqual(len(row["payments"]), 2)
+
+    def test_include_payments(self):
+        create_membership(0)
+        response, _ = self.list_queries({"include": "payments"})
+        self.assertEqual(len(response.data["data"]["results"][0]["payments"]), 2)
+
+    def test_payments_left_out(self):
+        create_membership(0)
+        response, with_payments = self.list_queries()
+        response, without = self.list_queries({"include": "-payments"})
+        self.assertNotIn("payments", response.data["data"]["results"][0])
+        self.assertEqual(without, with_payments - 1)
+
+    def test_query_count_constant_in_number_of_memberships(self):
+        for index in range(2):
+            create_membership(index)
+        _, few = self.list_queries()
+        for index in range(2, 8):
+            create_membership(index)
+        response, many = self.list_queries()
+        self.assertEqual(len(response.data["data"]["results"]), 8)
+        self.assertEqual(few, many)
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="", HITPAY_SALT="test-salt")
+class HitPayWebhookTests(TestCase):
+    url = "/api/membership/payments/webhooks/hitpay/"
+
+    def setUp(self):
+        self.payment = MembershipPayment.objects.create(
+            membership=create_membership(0, payments=0), method="hitpay", amount=1, period_year=2025, external_id="pr-1"
+        )
+
+    def post_json(self, payload, signature=None):
+        body = json.dumps(payload).encode()
+        if signature is None:
+            signature = hmac.new(b"test-salt", body, hashlib.sha256).hexdigest()
+        return self.client.post(self.url, body, content_type="application/json", HTTP_HITPAY_SIGNATURE=signature)
+
+    def test_signed_delivery_recorded(self):
+        response = self.post_json({"id": "pr-1", "status": "completed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.get().external_id, "pr-1")
+
+    def test_form_delivery_with_hmac_field(self):
+        data = {"payment_request_id": "pr-1", "status": "completed", "amount": "1.00"}
+        message = "".join(f"{key}{data[key]}" for key in sorted(data)).encode()
+        data["hmac"] = hmac.new(b"test-salt", message, hashlib.sha256).hexdigest()
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+
+    def test_bad_signature_rejected(self):
+        response = self.post_json({"id": "pr-1", "status": "completed"}, signature="0" * 64)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_unknown_payment_not_stored(self):
+        response = self.post_json({"id": "unknown", "status": "completed"})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+
+class WebhookClaimTests(TestCase):
+    def make_event(self, event_id, **fields):
+        return WebhookEvent.objects.create(event_id=event_id, external_id="pr-1", **fields)
+
+    def test_stale_processing_events_reclaimed(self):
+        received = self.make_event("a")
+        stale = self.make_event("b", status="processing", locked_at=timezone.now() - timedelta(hours=1))
+        self.make_event("c", status="processing", locked_at=timezone.now())
+        claimed = claim_events(10)
+        self.assertEqual([event.pk for event in claimed], [received.pk, stale.pk])
+        self.assertTrue(all(event.locked_at for event in claimed))
+        self.assertEqual(claim_events(10), [])
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="")
+class WebhookProcessingTests(TestCase):
+    def setUp(self):
+        self.payment = MembershipPayment.objects.create(
+            membership=create_membership(0, payments=0), method="hitpay", amount=1, period_year=2025, external_id="pr-1"
+        )
+
+    def test_paid_status_set_concurrently_is_kept(self):
+        WebhookEvent.objects.create(event_id="a", external_id="pr-1", event_status="failed")
+        coalesce = webhooks._coalesce
+
+        def settle_then_coalesce(events):
+            # Another worker marks the payment paid after this batch looked the payment up
+            MembershipPayment.objects.filter(pk=self.payment.pk).update(status="paid")
+            return coalesce(events)
+
+        with mock.patch.object(webhooks, "_coalesce", settle_then_coalesce):
+            self.assertEqual(process_event_batch(), {"processed": 1})
+        self.assertEqual(MembershipPayment.objects.get().status, "paid")
+        self.assertTrue(WebhookEvent.objects.get().result.startswith("kept paid"))
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="")
+class PaymentStatusStreamTests(TestCase):
+    def setUp(self):
+        membership = create_membership(0, payments=0)
+        self.user = membership.user
+        self.payment = MembershipPayment.objects.create(
+            membership=membership, method="hitpay", amount=1, period_year=2025, external_id="pr-1"
+        )
+        self.url = f"/api/membership/payments/{self.payment.uuid}/stream/"
+
+    def test_wsgi_stream_sends_first_event_without_buffering(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertFalse(response.is_async)
+        first = next(iter(response.streaming_content)).decode()
+        self.assertIn('"status": "created"', first)
+        response.close()
+
+    async def test_long_poll_through_async_middleware(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(self.url, {"since": "paid", "timeout": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["status"], "created")
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="")
+class FieldTrackerDeferredFieldTests(TestCase):
+    def setUp(self):
+        self.pk = create_membership(0, payments=0).pk
+
+    def test_assigned_deferred_field_is_saved(self):
+        membership = Membership.objects.only("id", "reference_no").get(pk=self.pk)
+        membership.reason = "Documents missing"
+        self.assertIn("reason", membership.changed_fields())
+        membership.save()
+        self.assertEqual(Membership.objects.get(pk=self.pk).reason, "Documents missing")
+
+    def test_untouched_deferred_field_not_written(self):
+        membership = Membership.objects.only("id", "reference_no").get(pk=self.pk)
+        Membership.objects.filter(pk=self.pk).update(reason="set elsewhere")
+        self.assertFalse(membership.has_changed("reason"))
+        membership.save()
+        self.assertEqual(Membership.objects.get(pk=self.pk).reason, "set elsewhere")
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="")
+class ReconcilePaymentsTests(TestCase):
+    def setUp(self):
+        self.payment = MembershipPayment.objects.create(
+            membership=create_membership(0, payments=0), method="hitpay", amount=1, period_year=2025, external_id="pr-1"
+        )
+        self.command = ReconcileCommand()
+        self.command.expire_before = timezone.now() + timedelta(hours=1)  # everything is past the TTL
+
+    def read_batch(self):
+        return list(MembershipPayment.objects.filter(pk=self.payment.pk))
+
+    def apply(self, batch, data, dry_run=False):
+        return self.command._apply(batch, [(data, None)], dry_run)
+
+    def reconcile_logs(self):
+        return PaymentLog.objects.filter(payment=self.payment, old_status="created")
+
+    def test_unpaid_payment_expired(self):
+        counts = self.apply(self.read_batch(), {"status": "pending"})
+        self.assertEqual((counts["updated"], counts["expired"]), (1, 1))
+        self.assertEqual(MembershipPayment.objects.get().status, "cancelled")
+        self.assertEqual(self.reconcile_logs().get().note, "expired after TTL")
+
+    def test_payment_paid_during_round_trip_not_overwritten(self):
+        batch = self.read_batch()
+        # A webhook settles the payment while the provider request is in flight
+        MembershipPayment.objects.filter(pk=self.payment.pk).update(status="paid")
+        counts = self.apply(batch, {"status": "pending"})
+        self.assertEqual(counts["updated"], 0)
+        self.assertEqual(MembershipPayment.objects.get().status, "paid")
+        self.assertFalse(self.reconcile_logs().exists())
+
+    def test_dry_run_writes_nothing(self):
+        counts = self.apply(self.read_batch(), {"status": "completed"}, dry_run=True)
+        self.assertEqual((counts["updated"], counts["paid"]), (1, 1))
+        self.assertEqual(MembershipPayment.objects.get().status, "created")
+
+
+@override_settings(FERNET_KEY=Fernet.generate_key().decode(), FERNET_KEYS="")
+class MarkMembershipPaidTests(TestCase):
+    def setUp(self):
+        for code in (workflow.PENDING_PAYMENT, workflow.PENDING_APPROVAL, workflow.APPROVED):
+            Status.objects.create(status_code=code, internal_status=code, external_status=code)
+        self.membership = create_membership(0, payments=0)
+        self.payment = MembershipPayment(membership=self.membership, method="hitpay", amount=1, period_year=2025)
+
+    def set_status(self, code):
+        self.membership.workflow_status = Status.objects.get(status_code=code)
+        self.membership.save(update_fields=["workflow_status"])
+
+    def test_pending_payment_moves_to_pending_approval(self):
+        self.set_status(workflow.PENDING_PAYMENT)
+        mark_membership_paid(self.payment)
+        membership = Membership.objects.get(pk=self.membership.pk)
+        self.assertEqual(workflow.status_code(membership), workflow.PENDING_APPROVAL)
+        self.assertTrue(membership.is_payment_generated)
+
+    def test_approved_member_renewal_keeps_status(self):
+        self.set_status(workflow.APPROVED)
+        with self.assertNoLogs("memberships.services.webhooks"):
+            mark_membership_paid(self.payment)
+        membership = Membership.objects.get(pk=self.membership.pk)
+        self.assertEqual(workflow.status_code(membership), workflow.APPROVED)
+        self.assertTrue(membership.is_payment_generated)
+
+
+class ReferenceNumberTests(TestCase):
+    @staticmethod
+    def checks_out(reference_no):
+        body = reference_no[len(reference.PREFIX):]
+        return reference._check_char(body[:-1]) == body[-1]
+
+    def test_format(self):
+        reference_no = reference.encode_reference(1)
+        self.assertRegex(reference_no, r"^BMR-[0-9A-HJKMNP-TV-Z]{9}$")
+        self.assertTrue(self.checks_out(reference_no))
+        for value in (0, reference.MASK + 1):
+            with self.assertRaises(ValueError):
+                reference.encode_reference(value)
+
+    def test_unique_over_sequence_range(self):
+        values = list(range(1, 50001)) + list(range(reference.MASK - 1000, reference.MASK + 1))
+        self.assertEqual(len({reference.encode_reference(value) for value in values}), len(values))
+
+    def test_check_character_catches_single_character_errors(self):
+        reference_no = reference.encode_reference(12345)
+        for position in range(len(reference.PREFIX), len(reference_no)):
+            for char in reference.ALPHABET:
+                if char != reference_no[position]:
+                    typo = reference_no[:position] + char + reference_no[position + 1:]
+                    self.assertFalse(self.checks_out(typo), typo)
+
+    def test_check_character_catches_transpositions(self):
+        for value in range(1, 200):
+            reference_no = reference.encode_reference(value)
+            for position in range(len(reference.PREFIX), len(reference_no) - 1):
+                pair = reference_no[position:position + 2]
+                # Like decimal Luhn with 09/90, Luhn mod 32 cannot see the first and last symbols swapped
+                if pair[0] == pair[1] or set(pair) == {reference.ALPHABET[0], reference.ALPHABET[-1]}:
+                    continue
+                swapped = reference_no[:position] + pair[::-1] + reference_no[position + 2:]
+                self.assertFalse(self.checks_out(swapped), (reference_no, swapped))
+
+    def test_allocations_do_not_overlap(self):
+        first = reference.allocate_reference_nos(3)
+        second = reference.allocate_reference_nos(2)
+        self.assertEqual(len(set(first + second)), 5)
+        self.assertEqual(second[0], reference.encode_reference(4))
@@ -1,31 +1,32 @@
-import json
 import logging
-import requests
+import uuid
 from django.conf import settings
 
+from core.jobs import enqueue
+from core.utils.http import get_client
+
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATION_JOB = "onesignal.notification"
 
-def send_payment_notification(user, payment):
-    """
-    Send a OneSignal push notification when a payment is completed.
-    Uses external user id (user.id) if available; otherwise broadcasts.
-    """
-    app_id = getattr(settings, "ONESIGNAL_APP_ID", "")
-    api_key = getattr(settings, "ONESIGNAL_API_KEY", "")
 
-    if not app_id or not api_key:
-        logger.info("OneSignal not configured; skipping push notification.")
-        return
+def _configured():
+    return bool(getattr(settings, "ONESIGNAL_APP_ID", "") and getattr(settings, "ONESIGNAL_API_KEY", ""))
 
-    headers = {
-        "Authorization": f"Basic {api_key}",
-        "Content-Type": "application/json",
-    }
 
+def build_payment_notification(user, payment):
+    """
+    OneSignal payload for a completed payment.
+    Uses external user id (user.id) if available; otherwise broadcasts.
+    The idempotency key is derived from the payment, so OneSignal drops
+    repeats (HTTP or job retries, webhook and reconcile both queueing it).
+    """
+    payment_uuid = getattr(payment, "uuid", None)
+    key = uuid.uuid5(uuid.NAMESPACE_URL, f"payment-notification:{payment_uuid}") if payment_uuid else uuid.uuid4()
     data = {
-        "app_id": app_id,
+        "app_id": getattr(settings, "ONESIGNAL_APP_ID", ""),
+        "idempotency_key": str(key),
         "headings": {"en": "Payment received"},
         "contents": {"en": "Your membership payment was received. View your membership details."},
         "data": {
@@ -41,12 +42,32 @@ def send_payment_notification(user, payment):
     if user and getattr(user, "id", None):
         data["include_external_user_ids"] = [str(user.id)]
         data.pop("included_segments", None)
+    return data
+
+
+def queue_payment_notification(user, payment):
+    """
+    Queue a OneSignal push notification for a completed payment.
+    Delivery happens in the job worker (``manage.py run_jobs``), off the request path.
+    """
+    if not _configured():
+        logger.info("OneSignal not configured; skipping push notification.")
+        return None
+    return enqueue(NOTIFICATION_JOB, build_payment_notification(user, payment))
+
 
-    try:
-        resp = requests.post("https://api.onesignal.com/notifications", headers=headers, data=json.dumps(data))
-        resp.raise_for_status()
-    except Exception as exc:
-        logger.warning("Failed to send OneSignal notification: %s", exc)
+def deliver_notification(data):
+    """POST a notification to OneSignal; raises on failure so the job is retried"""
+    if not _configured():
+        logger.info("OneSignal not configured; dropping queued push notification.")
         return
 
-    logger.info("OneSignal notification sent for payment %s", getattr(payment, "uuid", None))
+    headers = {
+        "Authorization": f"Basic {settings.ONESIGNAL_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    url = getattr(settings, "ONESIGNAL_API_URL", "https://api.onesignal.com/notifications")
+    # Only safe to retry when OneSignal can de-duplicate the POST
+    resp = get_client("onesignal").post(url, headers=headers, json=data, retry="idempotency_key" in data)
+    resp.raise_for_status()
+    logger.info("OneSignal notification sent for payment %s", data.get("data", {}).get("payment_id"))
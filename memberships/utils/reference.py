@@ -0,0 +1,50 @@
+"""
+Membership reference numbers: ``BMR-`` + 8 Crockford base32 characters + 1
+check character (13 chars, so never equal to a legacy 12-char random value).
+
+The 8 data characters encode a value from the ``reference_no`` Sequence run
+through a fixed bijection on 40 bits, so distinct sequence values always give
+distinct references and consecutive members don't get consecutive-looking
+codes. No existence check is needed before inserting.
+"""
+from core.models import Sequence
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"  # Crockford base32 (no I, L, O, U)
+PREFIX = "BMR-"
+DATA_LENGTH = 8
+BITS = DATA_LENGTH * 5
+MASK = (1 << BITS) - 1
+
+# Odd multiplier => multiplication is invertible mod 2**40, hence a bijection
+_MULTIPLIER = 0x9E3779B97 | 1
+_OFFSET = 0x5DEECE66D & MASK
+SEQUENCE_KEY = "reference_no"
+
+
+def _check_char(data: str) -> str:
+    """Luhn mod 32 check character (catches any single-character typo)"""
+    factor = 2
+    total = 0
+    for char in reversed(data):
+        addend = factor * ALPHABET.index(char)
+        factor = 1 if factor == 2 else 2
+        total += addend // 32 + addend % 32
+    return ALPHABET[(32 - total % 32) % 32]
+
+
+def encode_reference(value: int) -> str:
+    if not 0 < value <= MASK:
+        raise ValueError("reference sequence value out of range")
+    scrambled = (value * _MULTIPLIER + _OFFSET) & MASK
+    chars = []
+    for _ in range(DATA_LENGTH):
+        chars.append(ALPHABET[scrambled & 31])
+        scrambled >>= 5
+    data = "".join(reversed(chars))
+    return f"{PREFIX}{data}{_check_char(data)}"
+
+
+def allocate_reference_nos(count=1):
+    """Reserve ``count`` unique reference numbers (one UPDATE regardless of count)"""
+    last = Sequence.next_value(SEQUENCE_KEY, count=count)
+    return [encode_reference(value) for value in range(last - count + 1, last + 1)]
@@ -5,6 +5,8 @@ from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from .models import *
+from . import workflow
+from core.utils.status_registry import registry as status_registry
 from .api.serializers import PaymentReadSerializer
 from events.models import Event
 
@@ -13,8 +15,7 @@ User = get_user_model()
 
 def membership_list(request):
     # Provide status options (parent_code = '1') to populate the Status filter dropdown
-    from core.models import Status
-    statuses = Status.objects.filter(parent_code='1').order_by('internal_status')
+    statuses = sorted(status_registry.children('1'), key=lambda s: s.internal_status)
     return render(request, 'private/memberships/list.html', {'statuses': statuses})
 
 
@@ -41,9 +42,9 @@ def member_reg_step_1(request):
     if request.user.is_authenticated:
         membership = Membership.objects.filter(user=request.user).order_by('-created_at').first()
         if membership:
-            status_code = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
+            status_code = workflow.status_code(membership)
             # editable only when status is Draft (10), Incomplete (11), or Pending Approval (12)
-            if status_code not in ("10", "11", "12"):
+            if status_code not in workflow.APPLICANT_EDITABLE:
                 return render(request, 'public/users/membership/submitted-readonly.html', {
                     'membership': membership,
                     'step': 1,
@@ -64,8 +65,8 @@ def edit_member_reg_step_1(request, reference_no):
     # For editing via reference, determine if membership is editable
     membership = Membership.objects.filter(reference_no=reference_no).order_by('-created_at').first()
     if membership:
-        status_code = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
-        if status_code not in ("10", "11", "12"):
+        status_code = workflow.status_code(membership)
+        if status_code not in workflow.APPLICANT_EDITABLE:
             return render(request, 'public/users/membership/submitted-readonly.html', {
                 'membership': membership,
                 'step': 1,
@@ -100,8 +101,8 @@ def member_reg_step_2(request):
     if request.user.is_authenticated:
         membership = Membership.objects.filter(user=request.user).order_by('-created_at').first()
         if membership:
-            status_code = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
-            if status_code not in ("10", "11", "12"):
+            status_code = workflow.status_code(membership)
+            if status_code not in workflow.APPLICANT_EDITABLE:
                 return render(request, 'public/users/membership/submitted-readonly.html', {
                     'membership': membership,
                     'step': 2,
@@ -146,8 +147,8 @@ def member_reg_step_3(request):
     if request.user.is_authenticated:
         membership = Membership.objects.filter(user=request.user).order_by('-created_at').first()
         if membership:
-            status_code = getattr(getattr(membership, 'workflow_status', None), 'status_code', None)
-            if status_code not in ("10", "11", "12"):
+            status_code = workflow.status_code(membership)
+            if status_code not in workflow.APPLICANT_EDITABLE:
                 return render(request, 'public/users/membership/submitted-readonly.html', {
                     'membership': membership,
                     'step': 3,
@@ -0,0 +1,61 @@
+"""
+Membership workflow: status codes, the allowed transitions between them, and
+the stage checks used by views and serializers. Statuses are resolved through
+the in-memory registry, so checks and transitions need no database reads.
+
+Codes (see ``manage.py seed_status``):
+    10 Draft Application        11 Pending Payment      12 Pending Approval
+    13 Revise for Review        14 Rejected             15 Terminated
+    16 Approved                 17 Pending Payment Confirmation
+"""
+from core.utils.status_registry import registry
+
+DRAFT = "10"
+PENDING_PAYMENT = "11"
+PENDING_APPROVAL = "12"
+REVISE = "13"
+REJECTED = "14"
+TERMINATED = "15"
+APPROVED = "16"
+PENDING_PAYMENT_CONFIRMATION = "17"
+
+# from -> allowed targets (staying in the same status is always allowed)
+TRANSITIONS = {
+    None: {DRAFT, PENDING_PAYMENT, PENDING_APPROVAL, REVISE, REJECTED, APPROVED, PENDING_PAYMENT_CONFIRMATION},
+    DRAFT: {PENDING_PAYMENT, PENDING_APPROVAL, REVISE, REJECTED, APPROVED, PENDING_PAYMENT_CONFIRMATION},
+    PENDING_PAYMENT: {PENDING_APPROVAL, REVISE, REJECTED, APPROVED, PENDING_PAYMENT_CONFIRMATION},
+    PENDING_APPROVAL: {PENDING_PAYMENT, REVISE, REJECTED, APPROVED, PENDING_PAYMENT_CONFIRMATION},
+    REVISE: {PENDING_PAYMENT, PENDING_APPROVAL, REJECTED, APPROVED, PENDING_PAYMENT_CONFIRMATION},
+    PENDING_PAYMENT_CONFIRMATION: {PENDING_PAYMENT, PENDING_APPROVAL, REVISE, REJECTED, APPROVED},
+    REJECTED: {REVISE},
+    TERMINATED: {REVISE},
+    APPROVED: {TERMINATED},
+}
+
+# Membership.can_edit
+EDITABLE = frozenset({DRAFT, PENDING_PAYMENT, PENDING_APPROVAL, REVISE})
+# Applicant form pages and payment slip upload
+APPLICANT_EDITABLE = frozenset({DRAFT, PENDING_PAYMENT, PENDING_APPROVAL})
+# Recording an offline payment
+OFFLINE_PAYMENT_ALLOWED = EDITABLE
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def status_code(membership):
+    """Current workflow status code of a membership (no query)"""
+    if membership is None:
+        return None
+    return registry.code_for_id(membership.workflow_status_id)
+
+
+def can_transition(from_code, to_code):
+    return from_code == to_code or to_code in TRANSITIONS.get(from_code, ())
+
+
+def check_transition(from_code, to_code):
+    if not can_transition(from_code, to_code):
+        raise InvalidTransition(f"Cannot move a membership from status {from_code} to {to_code}.")
+
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from core.utils.images import ImageVariantsField
 from ..models import PostCategory, Post
 
 
@@ -41,6 +43,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
     post_category_title = serializers.CharField(source='post_category.title', read_only=True)
     parent_title = serializers.CharField(source='parent.title', read_only=True)
     cover_image = serializers.ImageField(required=False, allow_null=True)
+    cover_image_variants = ImageVariantsField(image_field='cover_image')
     media = serializers.FileField(required=False, allow_null=True)
 
     class Meta:
@@ -58,6 +61,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
             'parent_title',
             'media',
             'cover_image',
+            'cover_image_variants',
             'set_banner',
             'banner_order',
             'published_at',
@@ -8,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
 from django_filters.rest_framework import DjangoFilterBackend
 
 from core.utils.pagination import StandardResultsSetPagination
+from core.utils.search import FullTextSearchFilter
 from ..models import PostCategory, Post
 from .serializers import PostCategorySerializer, PostSerializer, PostDetailSerializer
 from core.utils.responses import ok, fail
@@ -226,8 +227,8 @@ class PostRetrieveUpdateDestroyView(
 class PostListCreateView(generics.ListCreateAPIView):
     serializer_class = PostSerializer
     pagination_class = StandardResultsSetPagination
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    search_fields = ['title']
+    filter_backends = [FullTextSearchFilter, DjangoFilterBackend]
+    search_doc_type = 'post'
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -42,6 +42,8 @@ class Post(AuditModel):
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE)
     media = models.FileField(upload_to=post_file_path, null=True, blank=True)
     cover_image = models.ImageField(upload_to=post_image_path, null=True, blank=True)
+    # Resized copies, filled in by the image derivatives job (core.utils.images)
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     set_banner = models.BooleanField(default=False)
     banner_order = models.PositiveIntegerField(default=0)
 